@@ -43,10 +43,16 @@ class Audio(pykka.ThreadingActor):
         self._mixer_track = None
         self._software_mixing = False
         self._appsrc = None
+        self._output_pad = None
+
+        self._about_to_finish_callback = None
+        self._uri_set = False
+        self._stream_change_pending = False
 
         self._notify_source_signal_id = None
         self._about_to_finish_id = None
         self._message_signal_id = None
+        self._output_event_probe_id = None
 
     def on_start(self):
         try:
@@ -77,6 +83,19 @@ class Audio(pykka.ThreadingActor):
     def _on_about_to_finish(self, element):
         self._appsrc = None
 
+        if self._about_to_finish_callback is None:
+            return
+
+        # Called from a GStreamer streaming thread. If the callback sets the
+        # URI of the next track before returning, playbin2 will continue
+        # with it without a gap, and we report the change when its first
+        # data reaches the output.
+        self._uri_set = False
+        self._about_to_finish_callback()
+        if self._uri_set:
+            logger.debug('Next track queued for gapless playback')
+            self._stream_change_pending = True
+
     def _on_new_source(self, element, pad):
         uri = element.get_property('uri')
         if not uri or not uri.startswith('appsrc://'):
@@ -89,7 +108,8 @@ class Audio(pykka.ThreadingActor):
             b'rate=(int)44100')
         source = element.get_property('source')
         source.set_property('caps', default_caps)
-        source.set_property('format', b'time') # Gstreamer does not like unicode
+        # Gstreamer does not like unicode
+        source.set_property('format', b'time')
 
         self._appsrc = source
 
@@ -98,6 +118,8 @@ class Audio(pykka.ThreadingActor):
             self._playbin.disconnect(self._about_to_finish_id)
         if self._notify_source_signal_id:
             self._playbin.disconnect(self._notify_source_signal_id)
+        if self._output_event_probe_id:
+            self._output_pad.remove_event_probe(self._output_event_probe_id)
         self._playbin.set_state(gst.STATE_NULL)
 
     def _setup_output(self):
@@ -106,6 +128,9 @@ class Audio(pykka.ThreadingActor):
                 settings.OUTPUT, ghost_unconnected_pads=True)
             self._playbin.set_property('audio-sink', output)
             logger.info('Audio output set to "%s"', settings.OUTPUT)
+            self._output_pad = output.get_pad('sink')
+            self._output_event_probe_id = self._output_pad.add_event_probe(
+                self._on_output_event)
         except gobject.GError as ex:
             logger.error(
                 'Failed to create audio output "%s": %s', settings.OUTPUT, ex)
@@ -178,6 +203,13 @@ class Audio(pykka.ThreadingActor):
             bus.disconnect(self._message_signal_id)
             bus.remove_signal_watch()
 
+    def _on_output_event(self, pad, event):
+        if (event.type == gst.EVENT_NEWSEGMENT
+                and self._stream_change_pending):
+            self._stream_change_pending = False
+            self._on_stream_changed()
+        return True
+
     def _on_message(self, bus, message):
         if (message.type == gst.MESSAGE_STATE_CHANGED
                 and message.src == self._playbin):
@@ -226,16 +258,41 @@ class Audio(pykka.ThreadingActor):
         logger.debug('Triggering reached_end_of_stream event')
         AudioListener.send('reached_end_of_stream')
 
+    def _on_stream_changed(self):
+        logger.debug('Triggering stream_changed event')
+        AudioListener.send('stream_changed')
+
+    def set_about_to_finish_callback(self, callback):
+        """
+        Set the callback to call when the current track is about to finish.
+
+        The callback is called from a GStreamer thread, without arguments. To
+        get gapless playback, it should call :meth:`set_uri` with the URI of
+        the next track, and wait for the call to complete, before returning.
+        :meth:`prepare_change` must not be called in this case. When the next
+        track starts playing, the
+        :meth:`mopidy.audio.AudioListener.stream_changed` event is sent. If
+        the callback does not set a URI, playback ends with the usual
+        :meth:`mopidy.audio.AudioListener.reached_end_of_stream` event.
+
+        :param callback: the callback, or :class:`None` to remove it
+        :type callback: callable
+        """
+        self._about_to_finish_callback = callback
+
     def set_uri(self, uri):
         """
         Set URI of audio to be played.
 
-        You *MUST* call :meth:`prepare_change` before calling this method.
+        You *MUST* call :meth:`prepare_change` before calling this method,
+        except from the about-to-finish callback, see
+        :meth:`set_about_to_finish_callback`.
 
         :param uri: the URI to play
         :type uri: string
         """
         self._playbin.set_property('uri', uri)
+        self._uri_set = True
 
     def emit_data(self, buffer_):
         """
@@ -318,6 +375,7 @@ class Audio(pykka.ThreadingActor):
         is that GStreamer will reset all its state when it changes to
         :attr:`gst.STATE_READY`.
         """
+        self._stream_change_pending = False
         return self._set_state(gst.STATE_READY)
 
     def stop_playback(self):
@@ -326,6 +384,7 @@ class Audio(pykka.ThreadingActor):
 
         :rtype: :class:`True` if successfull, else :class:`False`
         """
+        self._stream_change_pending = False
         return self._set_state(gst.STATE_NULL)
 
     def _set_state(self, state):
@@ -29,6 +29,17 @@ class AudioListener(object):
         """
         pass
 
+    def stream_changed(self):
+        """
+        Called when playback has continued without a gap with the URI set from
+        the about-to-finish callback.
+
+        See :meth:`mopidy.audio.Audio.set_about_to_finish_callback`.
+
+        *MAY* be implemented by actor.
+        """
+        pass
+
     def state_changed(self, old_state, new_state):
         """
         Called after the playback state have changed.
@@ -53,6 +53,27 @@ class BaseLibraryProvider(object):
     def __init__(self, backend):
         self.backend = backend
 
+    def browse(self, uri=None):
+        """
+        See :meth:`mopidy.core.LibraryController.browse`.
+
+        *MAY be implemented by subclass.* The default implementation has no
+        directories.
+        """
+        if uri is None:
+            return ([], [])
+        return None
+
+    def count(self, **query):
+        """
+        See :meth:`mopidy.core.LibraryController.count`.
+
+        *MAY be reimplemented by subclass.* The default implementation counts
+        the tracks returned by :meth:`find_exact`.
+        """
+        tracks = self.find_exact(**query).tracks
+        return (len(tracks), sum(track.length or 0 for track in tracks))
+
     def find_exact(self, **query):
         """
         See :meth:`mopidy.core.LibraryController.find_exact`.
@@ -61,6 +82,39 @@ class BaseLibraryProvider(object):
         """
         raise NotImplementedError
 
+    def get_distinct(self, field, **query):
+        """
+        See :meth:`mopidy.core.LibraryController.get_distinct`.
+
+        *MAY be reimplemented by subclass.* The default implementation
+        collects the values from the tracks returned by :meth:`find_exact`.
+        """
+        tracks = self.find_exact(**query).tracks
+        if field == 'artist':
+            return set(
+                artist.name for track in tracks for artist in track.artists
+                if artist.name)
+        elif field == 'album':
+            return set(
+                track.album.name for track in tracks
+                if track.album is not None and track.album.name)
+        elif field == 'date':
+            return set(track.date for track in tracks if track.date)
+        else:
+            raise LookupError('Invalid lookup field: %s' % field)
+
+    def get_stats(self):
+        """
+        Get aggregates over the whole library, as computed when the library
+        was last refreshed.
+
+        *MAY be implemented by subclass.* Returns :class:`None` by default,
+        meaning that the aggregates are unknown.
+
+        :rtype: :class:`mopidy.models.LibraryStats` or :class:`None`
+        """
+        return None
+
     def lookup(self, uri):
         """
         See :meth:`mopidy.core.LibraryController.lookup`.
@@ -73,6 +127,15 @@ class BaseLibraryProvider(object):
         """
         See :meth:`mopidy.core.LibraryController.refresh`.
 
+        If ``uri`` has no URI scheme, it is a path, like MPD clients send,
+        which the provider should resolve in its own library, or ignore if it
+        does not know any such path.
+
+        May refresh the library in the background and return a
+        :class:`pykka.Future` that is completed when the refreshed library is
+        in use. Callers wait for the future before they consider the refresh
+        done. Any other return value means that the refresh is already done.
+
         *MUST be implemented by subclass.*
         """
         raise NotImplementedError
@@ -85,6 +148,24 @@ class BaseLibraryProvider(object):
         """
         raise NotImplementedError
 
+    def walk(self, uri=None):
+        """
+        See :meth:`mopidy.core.LibraryController.walk`.
+
+        *MAY be reimplemented by subclass.* The default implementation walks
+        the directories using :meth:`browse`.
+        """
+        if self.browse(uri) is None:
+            return None
+        result = []
+        pending = [uri]
+        while pending:
+            directory_uri = pending.pop()
+            (directories, tracks) = self.browse(directory_uri) or ([], [])
+            result.append((directory_uri, directories, tracks))
+            pending.extend(reversed(directories))
+        return result
+
 
 class BasePlaybackProvider(object):
     """
@@ -146,6 +227,24 @@ class BasePlaybackProvider(object):
         """
         return self.audio.set_position(time_position).get()
 
+    def change_track(self, track):
+        """
+        Queue the given track to be played without a gap when the current
+        track ends.
+
+        Called when the audio of the current track is about to finish. If
+        :class:`False` is returned, playback is stopped at the end of the
+        current track and then started again with the given track.
+
+        *MAY be reimplemented by subclass.*
+
+        :param track: the track to play next
+        :type track: :class:`mopidy.models.Track`
+        :rtype: :class:`True` if successful, else :class:`False`
+        """
+        self.audio.set_uri(track.uri).get()
+        return True
+
     def stop(self):
         """
         Stop playback.
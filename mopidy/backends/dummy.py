@@ -37,9 +37,15 @@ class DummyLibraryProvider(base.BaseLibraryProvider):
     def __init__(self, *args, **kwargs):
         super(DummyLibraryProvider, self).__init__(*args, **kwargs)
         self.dummy_library = []
+        self.dummy_directories = {None: ([], [])}
+        self.dummy_find_exact_result = Playlist()
+        self.dummy_search_result = Playlist()
+
+    def browse(self, uri=None):
+        return self.dummy_directories.get(uri)
 
     def find_exact(self, **query):
-        return Playlist()
+        return self.dummy_find_exact_result
 
     def lookup(self, uri):
         matches = filter(lambda t: uri == t.uri, self.dummy_library)
@@ -50,7 +56,7 @@ class DummyLibraryProvider(base.BaseLibraryProvider):
         pass
 
     def search(self, **query):
-        return Playlist()
+        return self.dummy_search_result
 
 
 class DummyPlaybackProvider(base.BasePlaybackProvider):
@@ -73,6 +79,10 @@ class DummyPlaybackProvider(base.BasePlaybackProvider):
         self._time_position = time_position
         return True
 
+    def change_track(self, track):
+        """Pass a track with URI 'dummy:error' to force failure"""
+        return track.uri != 'dummy:error'
+
     def stop(self):
         return True
 
@@ -1,9 +1,9 @@
 from __future__ import unicode_literals
 
-import pykka
+from mopidy.utils import events
 
 
-class BackendListener(object):
+class BackendListener(events.Listener):
     """
     Marker interface for recipients of events sent by the backend actors.
 
@@ -18,10 +18,13 @@ class BackendListener(object):
 
     @staticmethod
     def send(event, **kwargs):
-        """Helper to allow calling of backend listener events"""
-        listeners = pykka.ActorRegistry.get_by_class(BackendListener)
-        for listener in listeners:
-            getattr(listener.proxy(), event)(**kwargs)
+        """
+        Helper to allow calling of backend listener events.
+
+        The events are delivered asynchronously by a
+        :class:`mopidy.utils.events.EventBus`.
+        """
+        _bus.send(event, **kwargs)
 
     def playlists_loaded(self):
         """
@@ -30,3 +33,6 @@ class BackendListener(object):
         *MAY* be implemented by actor.
         """
         pass
+
+
+_bus = events.EventBus(BackendListener, coalesced_events=['playlists_loaded'])
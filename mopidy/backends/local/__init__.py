@@ -15,6 +15,7 @@ https://github.com/mopidy/mopidy/issues?labels=Local+backend
 
 **Settings:**
 
+- :attr:`mopidy.settings.LOCAL_LIBRARY_CACHE_FILE`
 - :attr:`mopidy.settings.LOCAL_MUSIC_PATH`
 - :attr:`mopidy.settings.LOCAL_PLAYLIST_PATH`
 - :attr:`mopidy.settings.LOCAL_TAG_CACHE_FILE`
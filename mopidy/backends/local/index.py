@@ -0,0 +1,289 @@
+from __future__ import unicode_literals
+
+import array
+import bisect
+
+
+#: Length of the n-grams used for substring search.
+NGRAM_LENGTH = 3
+
+FIELDS = ('track', 'album', 'artist', 'date', 'uri')
+
+#: Fields whose distinct values can be listed, with maps from the values of
+#: each of them to the values of the others.
+FACETS = ('album', 'artist', 'date')
+
+
+def _track_values(track, field):
+    if field == 'track':
+        return [track.name] if track.name else []
+    elif field == 'album':
+        if track.album is not None and track.album.name:
+            return [track.album.name]
+        return []
+    elif field == 'artist':
+        return [a.name for a in track.artists if a.name]
+    elif field == 'date':
+        return [track.date] if track.date else []
+    elif field == 'uri':
+        return [track.uri] if track.uri else []
+
+
+class FieldIndex(object):
+    """
+    Index of the values of one track field.
+
+    Exact lookups are served from a hash map of values to tracks, which also
+    keeps the total length of the tracks of each value. Substring lookups are
+    served from an n-gram index over the distinct lowercased values, so that
+    only values sharing the query's rarest n-gram are inspected.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._playtimes = {}
+        self._value_ids = {}
+        self._values = []
+        self._tracks = []
+        self._ngrams = {}
+
+    def __len__(self):
+        return len(self._exact)
+
+    def add(self, value, track):
+        tracks = self._exact.setdefault(value, set())
+        if track not in tracks:
+            tracks.add(track)
+            self._playtimes[value] = (
+                self._playtimes.get(value, 0) + (track.length or 0))
+
+        lowered = value.lower()
+        value_id = self._value_ids.get(lowered)
+        if value_id is None:
+            value_id = len(self._values)
+            self._value_ids[lowered] = value_id
+            self._values.append(lowered)
+            self._tracks.append(set())
+            for ngram in self._split(lowered):
+                postings = self._ngrams.get(ngram)
+                if postings is None:
+                    postings = self._ngrams[ngram] = array.array(b'L')
+                postings.append(value_id)
+        self._tracks[value_id].add(track)
+
+    def count(self, value):
+        return (len(self._exact.get(value, ())), self._playtimes.get(value, 0))
+
+    def find_exact(self, value):
+        return self._exact.get(value, set())
+
+    def values(self):
+        return self._exact.keys()
+
+    def search(self, value):
+        value = value.lower()
+        if len(value) < NGRAM_LENGTH:
+            candidates = xrange(len(self._values))
+        else:
+            postings = [
+                self._ngrams.get(ngram, ()) for ngram in self._split(value)]
+            candidates = min(postings, key=len)
+
+        result = set()
+        for value_id in candidates:
+            if value in self._values[value_id]:
+                result.update(self._tracks[value_id])
+        return result
+
+    def _split(self, value):
+        return set(
+            value[i:i + NGRAM_LENGTH]
+            for i in xrange(len(value) - NGRAM_LENGTH + 1))
+
+
+class LibraryIndex(object):
+    """
+    Inverted index over a collection of tracks, keyed on the fields supported
+    by :meth:`mopidy.core.LibraryController.find_exact` and
+    :meth:`mopidy.core.LibraryController.search`.
+
+    :param tracks: the tracks to index
+    :type tracks: iterable of :class:`mopidy.models.Track`
+    """
+
+    def __init__(self, tracks=None):
+        self._uri_mapping = {}
+        self._fields = dict((field, FieldIndex()) for field in FIELDS)
+        self._facets = dict(
+            ((field, other), {}) for field in FACETS for other in FACETS
+            if field != other)
+        self._playtime = 0
+        for track in tracks or []:
+            self.add(track)
+
+    def __len__(self):
+        return len(self._uri_mapping)
+
+    @property
+    def tracks(self):
+        return self._uri_mapping.values()
+
+    @property
+    def artists(self):
+        """The number of distinct artist names."""
+        return len(self._fields['artist'])
+
+    @property
+    def albums(self):
+        """The number of distinct album names."""
+        return len(self._fields['album'])
+
+    @property
+    def playtime(self):
+        """The total length of the tracks in milliseconds."""
+        return self._playtime
+
+    def add(self, track):
+        if track.uri not in self._uri_mapping:
+            self._playtime += track.length or 0
+        self._uri_mapping[track.uri] = track
+        values = dict(
+            (field, _track_values(track, field)) for field in FIELDS)
+        for field in FIELDS:
+            for value in values[field]:
+                self._fields[field].add(value, track)
+        for ((field, other), facet) in self._facets.iteritems():
+            if values[other]:
+                for value in values[field]:
+                    facet.setdefault(value, set()).update(values[other])
+
+    def lookup(self, uri):
+        return self._uri_mapping.get(uri)
+
+    def count(self, query):
+        """
+        Count the tracks matching the query exactly, and their total length.
+
+        Queries on a single value of a single field are answered from the
+        aggregates kept per value.
+
+        :rtype: two-tuple of number of tracks and total length in milliseconds
+        """
+        if len(query) == 1:
+            (field, values) = query.items()[0]
+            if not hasattr(values, '__iter__'):
+                values = [values]
+            if field in self._fields and len(values) == 1:
+                return self._fields[field].count(values[0].strip())
+        tracks = self.find_exact(query)
+        return (len(tracks), sum(track.length or 0 for track in tracks))
+
+    def find_exact(self, query):
+        return self._query(query, lambda index, q: index.find_exact(q))
+
+    def get_distinct(self, field, query=None):
+        """
+        Get the distinct values of a field of the tracks matching the query
+        exactly.
+
+        Queries on a single value of another field are answered from the maps
+        between the values of the fields in :data:`FACETS`.
+
+        :rtype: set of strings
+        """
+        if field not in self._fields:
+            raise LookupError('Invalid lookup field: %s' % field)
+        if not query:
+            return set(self._fields[field].values())
+        if len(query) == 1:
+            (other, values) = query.items()[0]
+            if not hasattr(values, '__iter__'):
+                values = [values]
+            if (other, field) in self._facets and len(values) == 1:
+                return set(
+                    self._facets[(other, field)].get(values[0].strip(), ()))
+        return set(
+            value for track in self.find_exact(query)
+            for value in _track_values(track, field))
+
+    def search(self, query):
+        return self._query(query, lambda index, q: index.search(q))
+
+    def _query(self, query, match):
+        result = None
+        for (field, values) in query.iteritems():
+            if not hasattr(values, '__iter__'):
+                values = [values]
+            if field == 'any':
+                indexes = self._fields.values()
+            elif field in self._fields:
+                indexes = [self._fields[field]]
+            else:
+                raise LookupError('Invalid lookup field: %s' % field)
+            for value in values:
+                q = value.strip()
+                tracks = set()
+                for index in indexes:
+                    tracks.update(match(index, q))
+                if result is None:
+                    result = tracks
+                else:
+                    result &= tracks
+        if result is None:
+            return self.tracks
+        return sorted(result, key=lambda t: t.uri)
+
+
+class DirectoryIndex(object):
+    """
+    Tree of the directories containing a collection of tracks, keyed on the
+    URI of each directory, for browsing the library without scanning it. The
+    subdirectories and tracks in each directory are kept sorted by URI.
+
+    :param root_uri: URI of the directory at the root of the tree
+    :type root_uri: string
+    :param tracks: the tracks to index, tracks outside the root directory are
+        left out
+    :type tracks: iterable of :class:`mopidy.models.Track`
+    """
+
+    def __init__(self, root_uri, tracks=None):
+        self.root_uri = root_uri.rstrip('/')
+        self._directories = {self.root_uri: ([], [], [])}
+        # Adding the tracks in order appends each of them to its directory
+        for track in sorted(tracks or [], key=lambda t: t.uri):
+            self.add(track)
+
+    def add(self, track):
+        if track.uri is None or not track.uri.startswith(self.root_uri + '/'):
+            return
+        directory_uri = track.uri.rsplit('/', 1)[0]
+        (_, track_uris, tracks) = self._get_or_create(directory_uri)
+        position = bisect.bisect_right(track_uris, track.uri)
+        track_uris.insert(position, track.uri)
+        tracks.insert(position, track)
+
+    def browse(self, uri=None):
+        """
+        Get the subdirectories and tracks directly in a directory.
+
+        :param uri: URI of the directory, or :class:`None` for the root
+        :type uri: string
+        :rtype: two-tuple of list of directory URIs and list of
+            :class:`mopidy.models.Track`, or :class:`None` if there is no
+            such directory
+        """
+        if uri is None:
+            uri = self.root_uri
+        entry = self._directories.get(uri.rstrip('/'))
+        if entry is None:
+            return None
+        (directories, _, tracks) = entry
+        return (list(directories), list(tracks))
+
+    def _get_or_create(self, uri):
+        entry = self._directories.get(uri)
+        if entry is None:
+            entry = self._directories[uri] = ([], [], [])
+            bisect.insort(self._get_or_create(uri.rsplit('/', 1)[0])[0], uri)
+        return entry
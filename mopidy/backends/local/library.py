@@ -1,11 +1,18 @@
 from __future__ import unicode_literals
 
 import logging
+import os
+import threading
+import urlparse
+
+import pykka
 
 from mopidy import settings
 from mopidy.backends import base
-from mopidy.models import Playlist, Album
+from mopidy.models import LibraryStats, Playlist
+from mopidy.utils.path import path_to_uri
 
+from .index import DirectoryIndex, LibraryIndex
 from .translator import parse_mpd_tag_cache
 
 logger = logging.getLogger('mopidy.backends.local')
@@ -14,94 +21,100 @@ logger = logging.getLogger('mopidy.backends.local')
 class LocalLibraryProvider(base.BaseLibraryProvider):
     def __init__(self, *args, **kwargs):
         super(LocalLibraryProvider, self).__init__(*args, **kwargs)
-        self._uri_mapping = {}
-        self.refresh()
+        self._refresh_lock = threading.Lock()
+        self._index = LibraryIndex()
+        self._directories = DirectoryIndex(
+            path_to_uri(settings.LOCAL_MUSIC_PATH))
+        self._stats = LibraryStats()
+        self._refresh()
 
     def refresh(self, uri=None):
-        tracks = parse_mpd_tag_cache(
-            settings.LOCAL_TAG_CACHE_FILE, settings.LOCAL_MUSIC_PATH)
-
-        logger.info(
-            'Loading tracks from %s using %s',
-            settings.LOCAL_MUSIC_PATH, settings.LOCAL_TAG_CACHE_FILE)
-
-        for track in tracks:
-            self._uri_mapping[track.uri] = track
+        """
+        Reload the tag cache in a background thread. Lookups and searches use
+        the current index until the new index replaces it.
+
+        If ``uri`` is given, only the tracks at or below it are replaced. This
+        is not incremental: the whole tag cache is still read, so it takes as
+        long as a full refresh.
+
+        A ``uri`` without an URI scheme is a path relative to
+        :attr:`mopidy.settings.LOCAL_MUSIC_PATH`.
+
+        :rtype: :class:`pykka.ThreadingFuture` completed when the new index
+            is in use
+        """
+        if uri is not None and not urlparse.urlparse(uri).scheme:
+            uri = path_to_uri(settings.LOCAL_MUSIC_PATH, uri.lstrip('/'))
+
+        future = pykka.ThreadingFuture()
+
+        def run():
+            try:
+                future.set(self._refresh(uri))
+            except Exception:
+                future.set_exception()
+
+        thread = threading.Thread(target=run, name='LocalLibraryRefresh')
+        thread.daemon = True
+        thread.start()
+        return future
+
+    def _refresh(self, uri=None):
+        with self._refresh_lock:
+            logger.info(
+                'Loading tracks from %s using %s',
+                settings.LOCAL_MUSIC_PATH, settings.LOCAL_TAG_CACHE_FILE)
+
+            tracks = parse_mpd_tag_cache(
+                settings.LOCAL_TAG_CACHE_FILE, settings.LOCAL_MUSIC_PATH,
+                settings.LOCAL_LIBRARY_CACHE_FILE)
+
+            if uri is not None:
+                tracks = [
+                    track for track in self._index.tracks
+                    if not _is_at_or_below(track.uri, uri)] + [
+                    track for track in tracks
+                    if _is_at_or_below(track.uri, uri)]
+
+            index = LibraryIndex(tracks)
+            try:
+                last_update = os.path.getmtime(settings.LOCAL_TAG_CACHE_FILE)
+            except OSError:
+                last_update = None
+            self._stats = LibraryStats(
+                artists=index.artists, albums=index.albums, songs=len(index),
+                playtime=index.playtime, last_update=last_update)
+            self._directories = DirectoryIndex(
+                path_to_uri(settings.LOCAL_MUSIC_PATH), index.tracks)
+            self._index = index
 
     def lookup(self, uri):
-        try:
-            return self._uri_mapping[uri]
-        except KeyError:
+        track = self._index.lookup(uri)
+        if track is None:
             logger.debug('Failed to lookup %r', uri)
-            return None
+        return track
+
+    def browse(self, uri=None):
+        return self._directories.browse(uri)
+
+    def count(self, **query):
+        self._validate_query(query)
+        return self._index.count(query)
 
     def find_exact(self, **query):
         self._validate_query(query)
-        result_tracks = self._uri_mapping.values()
+        return Playlist(tracks=self._index.find_exact(query))
 
-        for (field, values) in query.iteritems():
-            if not hasattr(values, '__iter__'):
-                values = [values]
-            # FIXME this is bound to be slow for large libraries
-            for value in values:
-                q = value.strip()
-
-                track_filter = lambda t: q == t.name
-                album_filter = lambda t: q == getattr(t, 'album', Album()).name
-                artist_filter = lambda t: filter(
-                    lambda a: q == a.name, t.artists)
-                uri_filter = lambda t: q == t.uri
-                any_filter = lambda t: (
-                    track_filter(t) or album_filter(t) or
-                    artist_filter(t) or uri_filter(t))
-
-                if field == 'track':
-                    result_tracks = filter(track_filter, result_tracks)
-                elif field == 'album':
-                    result_tracks = filter(album_filter, result_tracks)
-                elif field == 'artist':
-                    result_tracks = filter(artist_filter, result_tracks)
-                elif field == 'uri':
-                    result_tracks = filter(uri_filter, result_tracks)
-                elif field == 'any':
-                    result_tracks = filter(any_filter, result_tracks)
-                else:
-                    raise LookupError('Invalid lookup field: %s' % field)
-        return Playlist(tracks=result_tracks)
+    def get_distinct(self, field, **query):
+        self._validate_query(query)
+        return self._index.get_distinct(field, query)
+
+    def get_stats(self):
+        return self._stats
 
     def search(self, **query):
         self._validate_query(query)
-        result_tracks = self._uri_mapping.values()
-
-        for (field, values) in query.iteritems():
-            if not hasattr(values, '__iter__'):
-                values = [values]
-            # FIXME this is bound to be slow for large libraries
-            for value in values:
-                q = value.strip().lower()
-
-                track_filter = lambda t: q in t.name.lower()
-                album_filter = lambda t: q in getattr(
-                    t, 'album', Album()).name.lower()
-                artist_filter = lambda t: filter(
-                    lambda a: q in a.name.lower(), t.artists)
-                uri_filter = lambda t: q in t.uri.lower()
-                any_filter = lambda t: track_filter(t) or album_filter(t) or \
-                    artist_filter(t) or uri_filter(t)
-
-                if field == 'track':
-                    result_tracks = filter(track_filter, result_tracks)
-                elif field == 'album':
-                    result_tracks = filter(album_filter, result_tracks)
-                elif field == 'artist':
-                    result_tracks = filter(artist_filter, result_tracks)
-                elif field == 'uri':
-                    result_tracks = filter(uri_filter, result_tracks)
-                elif field == 'any':
-                    result_tracks = filter(any_filter, result_tracks)
-                else:
-                    raise LookupError('Invalid lookup field: %s' % field)
-        return Playlist(tracks=result_tracks)
+        return Playlist(tracks=self._index.search(query))
 
     def _validate_query(self, query):
         for (_, values) in query.iteritems():
@@ -110,3 +123,8 @@ class LocalLibraryProvider(base.BaseLibraryProvider):
             for value in values:
                 if not value:
                     raise LookupError('Missing query')
+
+
+def _is_at_or_below(uri, parent_uri):
+    parent_uri = parent_uri.rstrip('/')
+    return uri == parent_uri or uri.startswith(parent_uri + '/')
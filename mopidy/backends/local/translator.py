@@ -1,10 +1,12 @@
 from __future__ import unicode_literals
 
+import cPickle as pickle
 import logging
+import os
 
-from mopidy.models import Track, Artist, Album
+from mopidy.models import Track, Artist, Album, ModelInterner
 from mopidy.utils.encoding import locale_decode
-from mopidy.utils.path import path_to_uri
+from mopidy.utils.path import get_or_create_folder, path_to_uri
 
 logger = logging.getLogger('mopidy.backends.local')
 
@@ -54,48 +56,134 @@ def parse_m3u(file_path, music_folder):
     return uris
 
 
-def parse_mpd_tag_cache(tag_cache, music_dir=''):
+def parse_mpd_tag_cache(tag_cache, music_dir='', cache_file=None):
     """
     Converts a MPD tag_cache into a lists of tracks, artists and albums.
+
+    If ``cache_file`` is given, the parsed tracks are stored there together
+    with the size and modification time of the tag cache, and reused as long
+    as the tag cache is unchanged.
     """
-    tracks = set()
+    key = _get_cache_key(tag_cache, music_dir)
+
+    if cache_file and key is not None:
+        tracks = _read_library_cache(cache_file, key)
+        if tracks is not None:
+            return tracks
+
+    tracks = set(iter_mpd_tag_cache(tag_cache, music_dir))
+
+    if cache_file and key is not None:
+        _write_library_cache(cache_file, key, tracks)
+
+    return tracks
+
+
+def iter_mpd_tag_cache(tag_cache, music_dir=''):
+    """
+    Generator yielding the tracks of a MPD tag_cache one at a time, reading
+    the file line by line.
+    """
+    interner = ModelInterner()
+    for data in _iter_mpd_tag_cache_data(tag_cache):
+        yield _convert_mpd_data(data, music_dir, interner)
+
+
+def iter_mpd_tag_cache_mtimes(tag_cache, music_dir=''):
+    """
+    Like :func:`iter_mpd_tag_cache`, but yields two-tuples of each track and
+    the modification time of its file when the tag cache was made, or
+    :class:`None` if the tag cache does not record it.
+    """
+    interner = ModelInterner()
+    for data in _iter_mpd_tag_cache_data(tag_cache):
+        track = _convert_mpd_data(data, music_dir, interner)
+        try:
+            mtime = int(data['mtime'])
+        except (KeyError, ValueError):
+            mtime = None
+        yield (track, mtime)
+
 
+def _iter_mpd_tag_cache_data(tag_cache):
     try:
-        with open(tag_cache) as library:
-            contents = library.read()
+        library = open(tag_cache)
     except IOError as error:
         logger.error('Could not open tag cache: %s', locale_decode(error))
-        return tracks
+        return
 
     current = {}
     state = None
 
-    for line in contents.split(b'\n'):
-        if line == b'songList begin':
-            state = 'songs'
-            continue
-        elif line == b'songList end':
-            state = None
-            continue
-        elif not state:
-            continue
+    with library:
+        for line in library:
+            line = line.rstrip(b'\n')
 
-        key, value = line.split(b': ', 1)
+            if line == b'songList begin':
+                state = 'songs'
+                continue
+            elif line == b'songList end':
+                state = None
+                continue
+            elif not state:
+                continue
 
-        if key == b'key':
-            _convert_mpd_data(current, tracks, music_dir)
-            current.clear()
+            key, value = line.split(b': ', 1)
 
-        current[key.lower()] = value.decode('utf-8')
+            if key == b'key' and current:
+                yield current
+                current = {}
 
-    _convert_mpd_data(current, tracks, music_dir)
+            current[key.lower()] = value.decode('utf-8')
 
-    return tracks
+    if current:
+        yield current
 
 
-def _convert_mpd_data(data, tracks, music_dir):
-    if not data:
-        return
+LIBRARY_CACHE_VERSION = 2
+
+
+def _get_cache_key(tag_cache, music_dir):
+    try:
+        stat = os.stat(tag_cache)
+    except OSError:
+        return None
+    return (LIBRARY_CACHE_VERSION, stat.st_mtime, stat.st_size, music_dir)
+
+
+def _read_library_cache(cache_file, key):
+    try:
+        with open(cache_file, 'rb') as cache:
+            if pickle.load(cache) != key:
+                logger.debug('Library cache %s is outdated', cache_file)
+                return None
+            return pickle.load(cache)
+    except IOError:
+        return None
+    except Exception as error:
+        logger.warning(
+            'Could not read library cache %s: %s',
+            cache_file, locale_decode(error))
+        return None
+
+
+def _write_library_cache(cache_file, key, tracks):
+    temp_file = cache_file + '.tmp'
+    try:
+        get_or_create_folder(os.path.dirname(cache_file))
+        with open(temp_file, 'wb') as cache:
+            pickle.dump(key, cache, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(tracks, cache, pickle.HIGHEST_PROTOCOL)
+        os.rename(temp_file, cache_file)
+    except (IOError, OSError) as error:
+        logger.warning(
+            'Could not write library cache %s: %s',
+            cache_file, locale_decode(error))
+
+
+def _convert_mpd_data(data, music_dir, interner=None):
+    if interner is None:
+        interner = ModelInterner()
 
     track_kwargs = {}
     album_kwargs = {}
@@ -141,19 +229,18 @@ def _convert_mpd_data(data, tracks, music_dir):
         path = data['file']
 
     if artist_kwargs:
-        artist = Artist(**artist_kwargs)
+        artist = interner.intern(Artist(**artist_kwargs))
         track_kwargs['artists'] = [artist]
 
     if albumartist_kwargs:
-        albumartist = Artist(**albumartist_kwargs)
+        albumartist = interner.intern(Artist(**albumartist_kwargs))
         album_kwargs['artists'] = [albumartist]
 
     if album_kwargs:
-        album = Album(**album_kwargs)
+        album = interner.intern(Album(**album_kwargs))
         track_kwargs['album'] = album
 
     track_kwargs['uri'] = path_to_uri(music_dir, path)
     track_kwargs['length'] = int(data.get('time', 0)) * 1000
 
-    track = Track(**track_kwargs)
-    tracks.add(track)
+    return Track(**track_kwargs)
@@ -56,6 +56,11 @@ class SpotifyPlaybackProvider(base.BasePlaybackProvider):
         self._timer.seek(time_position)
         return True
 
+    def change_track(self, track):
+        # The audio is delivered by libspotify through appsrc, which cannot
+        # be queued up for gapless playback.
+        return False
+
     def stop(self):
         self.backend.spotify.session.play(0)
 
@@ -4,6 +4,6 @@ from __future__ import unicode_literals
 from .actor import Core
 from .library import LibraryController
 from .listener import CoreListener
-from .playback import PlaybackController, PlaybackState
+from .playback import PlaybackController, PlaybackState, PlaybackStatus
 from .playlists import PlaylistsController
 from .tracklist import TracklistController
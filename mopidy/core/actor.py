@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 
 import itertools
+import logging
 
 import pykka
 
@@ -14,6 +15,14 @@ from .playlists import PlaylistsController
 from .tracklist import TracklistController
 
 
+logger = logging.getLogger('mopidy.core')
+
+#: Max time in seconds to wait for the next track to be queued when the audio
+#: is about to finish. If the core actor is busy for longer, the next track is
+#: played after the current one has ended, with a gap.
+ABOUT_TO_FINISH_TIMEOUT = 1.0
+
+
 class Core(pykka.ThreadingActor, AudioListener, BackendListener):
     #: The library controller. An instance of
     # :class:`mopidy.core.LibraryController`.
@@ -46,6 +55,9 @@ class Core(pykka.ThreadingActor, AudioListener, BackendListener):
 
         self.tracklist = TracklistController(core=self)
 
+        if audio is not None:
+            audio.set_about_to_finish_callback(self._on_about_to_finish)
+
     @property
     def uri_schemes(self):
         """List of URI schemes we can handle"""
@@ -54,9 +66,27 @@ class Core(pykka.ThreadingActor, AudioListener, BackendListener):
         uri_schemes = itertools.chain(*results)
         return sorted(uri_schemes)
 
+    def _on_about_to_finish(self):
+        # Called by the audio actor from a GStreamer thread, so pass the call
+        # on to the core actor. A plain message is used, as building a proxy
+        # would read all public properties of the core from this thread.
+        try:
+            self.actor_ref.ask(
+                {'command': 'about_to_finish'},
+                timeout=ABOUT_TO_FINISH_TIMEOUT)
+        except pykka.Timeout:
+            logger.debug('Timed out queueing the next track for playback')
+
+    def on_receive(self, message):
+        if message.get('command') == 'about_to_finish':
+            self.playback.on_about_to_finish()
+
     def reached_end_of_stream(self):
         self.playback.on_end_of_track()
 
+    def stream_changed(self):
+        self.playback.on_stream_changed()
+
     def state_changed(self, old_state, new_state):
         # XXX: This is a temporary fix for issue #232 while we wait for a more
         # permanent solution with the implementation of issue #234. When the
@@ -1,11 +1,21 @@
 from __future__ import unicode_literals
 
+import collections
 import itertools
+import logging
+import threading
+import time
 import urlparse
 
 import pykka
 
-from mopidy.models import Playlist
+from mopidy import settings
+from mopidy.models import LibraryStats, SearchResult
+
+from . import listener
+
+
+logger = logging.getLogger('mopidy.core')
 
 
 class LibraryController(object):
@@ -15,10 +25,66 @@ class LibraryController(object):
         self.backends = backends
         self.core = core
 
+        self._update_lock = threading.Lock()
+        self._update_jobs = collections.deque()
+        self._update_thread = None
+        self._last_update_job = 0
+        self._current_update_job = None
+
     def _get_backend(self, uri):
         uri_scheme = urlparse.urlparse(uri).scheme
         return self.backends.with_library_by_uri_scheme.get(uri_scheme, None)
 
+    def browse(self, uri=None):
+        """
+        List the subdirectories and tracks directly in a directory. Without an
+        URI, the root directories and tracks of all backends are listed.
+
+        Returns :class:`None` if there is no such directory.
+
+        Without an URI, backends that have not answered within
+        :attr:`mopidy.settings.LIBRARY_SEARCH_TIMEOUT` seconds are left out.
+        With an URI, there is only one backend to wait for.
+
+        :param uri: directory URI
+        :type uri: string
+        :rtype: two-tuple of list of directory URIs and list of
+            :class:`mopidy.models.Track`, or :class:`None`
+        """
+        if uri is not None:
+            backend = self._get_backend(uri)
+            if backend:
+                return backend.library.browse(uri).get()
+            else:
+                return None
+        futures = [b.library.browse() for b in self.backends.with_library]
+        results = self._get_all_in_time(futures)[0]
+        return (
+            [d for (directories, _) in results for d in directories],
+            [t for (_, tracks) in results for t in tracks])
+
+    def count(self, **query):
+        """
+        Count the tracks where ``field`` is ``values``, like
+        :meth:`find_exact`, and their total length.
+
+        Examples::
+
+            # Returns the number and length of tracks by artist 'xyz'
+            count(artist=['xyz'])
+
+        :param query: one or more queries to search for
+        :type query: dict
+        :rtype: two-tuple of number of tracks and total length in
+            milliseconds
+        """
+        futures = [
+            b.library.count(**query) for b in self.backends.with_library]
+        results = pykka.get_all(futures)
+        return (
+            sum(songs for (songs, _) in results),
+            sum(playtime for (_, playtime) in results))
+
     def find_exact(self, **query):
         """
         Search the library for tracks where ``field`` is ``values``.
@@ -32,20 +98,79 @@ class LibraryController(object):
             # Returns results matching 'a' and 'b' and artist 'xyz'
             find_exact(any=['a', 'b'], artist=['xyz'])
 
+        Backends that have not answered within
+        :attr:`mopidy.settings.LIBRARY_SEARCH_TIMEOUT` seconds are left out of
+        the result, and listed in its ``timed_out`` field.
+
         :param query: one or more queries to search for
         :type query: dict
-        :rtype: :class:`mopidy.models.Playlist`
+        :rtype: :class:`mopidy.models.SearchResult`
         """
         futures = [b.library.find_exact(**query)
             for b in self.backends.with_library]
-        results = pykka.get_all(futures)
-        return Playlist(tracks=[
-            track for playlist in results for track in playlist.tracks])
+        (results, timed_out) = self._get_all_in_time(futures)
+        return SearchResult(
+            tracks=[
+                track for playlist in results for track in playlist.tracks],
+            timed_out=timed_out)
+
+    def _get_all_in_time(self, futures):
+        # The backends work on the query concurrently, so they share one
+        # deadline instead of each getting the full timeout in turn.
+        timeout = settings.LIBRARY_SEARCH_TIMEOUT
+        deadline = time.time() + timeout
+        results = []
+        timed_out = []
+        for (backend, future) in zip(self.backends.with_library, futures):
+            try:
+                results.append(
+                    future.get(timeout=max(0, deadline - time.time())))
+            except pykka.Timeout:
+                logger.warning(
+                    'Library query in %s timed out after %.1fs, leaving out '
+                    'its results', backend.actor_ref, timeout)
+                timed_out.extend(sorted(
+                    uri_scheme for (uri_scheme, b)
+                    in self.backends.with_library_by_uri_scheme.items()
+                    if b is backend))
+        return (results, timed_out)
+
+    def get_distinct(self, field, **query):
+        """
+        List the distinct values of ``field`` of the tracks where ``field``
+        is ``values``, like :meth:`find_exact`. Only the values are passed
+        from the backends, not the tracks.
+
+        Examples::
+
+            # Returns the names of all albums
+            get_distinct('album')
+            # Returns the names of the albums by artist 'xyz'
+            get_distinct('album', artist=['xyz'])
+
+        :param field: ``artist``, ``album`` or ``date``
+        :type field: string
+        Backends that have not answered within
+        :attr:`mopidy.settings.LIBRARY_SEARCH_TIMEOUT` seconds are left out.
+
+        :param query: one or more queries to search for
+        :type query: dict
+        :rtype: set of strings
+        """
+        futures = [
+            b.library.get_distinct(field, **query)
+            for b in self.backends.with_library]
+        results = self._get_all_in_time(futures)[0]
+        return set().union(*results)
 
     def lookup(self, uri):
         """
         Lookup track with given URI. Returns :class:`None` if not found.
 
+        There is only one backend to ask, so this waits for it to answer
+        instead of giving up after
+        :attr:`mopidy.settings.LIBRARY_SEARCH_TIMEOUT` seconds.
+
         :param uri: track URI
         :type uri: string
         :rtype: :class:`mopidy.models.Track` or :class:`None`
@@ -60,17 +185,90 @@ class LibraryController(object):
         """
         Refresh library. Limit to URI and below if an URI is given.
 
-        :param uri: directory or track URI
+        An URI without an URI scheme is a path, which is passed to all
+        backends, so that each of them can resolve it in its own library.
+
+        :param uri: directory or track URI, or path
         :type uri: string
         """
-        if uri is not None:
+        if uri is not None and urlparse.urlparse(uri).scheme:
             backend = self._get_backend(uri)
-            if backend:
-                backend.library.refresh(uri).get()
+            futures = [backend.library.refresh(uri)] if backend else []
         else:
             futures = [b.library.refresh(uri)
                 for b in self.backends.with_library]
-            pykka.get_all(futures)
+        results = pykka.get_all(futures)
+        # Providers refreshing in the background return a future completed
+        # when the refresh is done.
+        pykka.get_all([r for r in results if isinstance(r, pykka.Future)])
+
+    def update(self, uri=None):
+        """
+        Refresh the library in the background, like :meth:`refresh`.
+
+        Update jobs are run one at a time in the order they were started.
+        A ``library_update_started`` event is sent when a job starts, and a
+        ``library_update_finished`` event when it is done.
+
+        :param uri: directory or track URI, or path
+        :type uri: string
+        :rtype: int, a positive number identifying the update job
+        """
+        with self._update_lock:
+            self._last_update_job += 1
+            job = self._last_update_job
+            self._update_jobs.append((job, uri))
+            if self._update_thread is None:
+                self._update_thread = threading.Thread(
+                    target=self._run_update_jobs, name='LibraryUpdate')
+                self._update_thread.daemon = True
+                self._update_thread.start()
+        return job
+
+    @property
+    def updating(self):
+        """
+        The ID of the running update job, or :class:`None` if the library is
+        not being updated.
+        """
+        return self._current_update_job
+
+    def _run_update_jobs(self):
+        while True:
+            with self._update_lock:
+                if not self._update_jobs:
+                    self._current_update_job = None
+                    self._update_thread = None
+                    return
+                job, uri = self._update_jobs.popleft()
+                self._current_update_job = job
+
+            listener.CoreListener.send('library_update_started', job=job)
+            try:
+                self.refresh(uri)
+            except Exception:
+                logger.exception('Library update job %d failed', job)
+            listener.CoreListener.send('library_update_finished', job=job)
+
+    def get_stats(self):
+        """
+        Get aggregates over the libraries of all backends that know them, as
+        computed when the libraries were last refreshed.
+
+        Artists and albums found in several backends are counted once per
+        backend.
+
+        :rtype: :class:`mopidy.models.LibraryStats`
+        """
+        futures = [b.library.get_stats() for b in self.backends.with_library]
+        results = [r for r in pykka.get_all(futures) if r is not None]
+        updates = [r.last_update for r in results if r.last_update is not None]
+        return LibraryStats(
+            artists=sum(r.artists for r in results),
+            albums=sum(r.albums for r in results),
+            songs=sum(r.songs for r in results),
+            playtime=sum(r.playtime for r in results),
+            last_update=max(updates) if updates else None)
 
     def search(self, **query):
         """
@@ -85,13 +283,47 @@ class LibraryController(object):
             # Returns results matching 'a' and 'b' and artist 'xyz'
             search(any=['a', 'b'], artist=['xyz'])
 
+        Backends that have not answered within
+        :attr:`mopidy.settings.LIBRARY_SEARCH_TIMEOUT` seconds are left out of
+        the result, and listed in its ``timed_out`` field.
+
         :param query: one or more queries to search for
         :type query: dict
-        :rtype: :class:`mopidy.models.Playlist`
+        :rtype: :class:`mopidy.models.SearchResult`
         """
         futures = [b.library.search(**query)
             for b in self.backends.with_library]
-        results = pykka.get_all(futures)
+        (results, timed_out) = self._get_all_in_time(futures)
         track_lists = [playlist.tracks for playlist in results]
         tracks = list(itertools.chain(*track_lists))
-        return Playlist(tracks=tracks)
+        return SearchResult(tracks=tracks, timed_out=timed_out)
+
+    def walk(self, uri=None):
+        """
+        List a directory and everything below it, like :func:`os.walk`. Each
+        backend walks its own directories, so the whole subtree is passed in
+        one message per backend.
+
+        The first entry is the directory itself, followed by each
+        subdirectory before the directories below it. Returns :class:`None`
+        if there is no such directory.
+
+        :param uri: directory URI, or :class:`None` for the root directories of
+            all backends
+        :type uri: string
+        :rtype: list of three-tuples of directory URI, list of subdirectory
+            URIs and list of :class:`mopidy.models.Track`, or :class:`None`
+        """
+        if uri is not None:
+            backend = self._get_backend(uri)
+            if backend:
+                return backend.library.walk(uri).get()
+            else:
+                return None
+        futures = [b.library.walk() for b in self.backends.with_library]
+        results = pykka.get_all(futures)
+        return [(
+            None,
+            [d for result in results for d in result[0][1]],
+            [t for result in results for t in result[0][2]],
+        )] + [entry for result in results for entry in result[1:]]
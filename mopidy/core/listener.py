@@ -1,9 +1,9 @@
 from __future__ import unicode_literals
 
-import pykka
+from mopidy.utils import events
 
 
-class CoreListener(object):
+class CoreListener(events.Listener):
     """
     Marker interface for recipients of events sent by the core actor.
 
@@ -16,10 +16,13 @@ class CoreListener(object):
 
     @staticmethod
     def send(event, **kwargs):
-        """Helper to allow calling of core listener events"""
-        listeners = pykka.ActorRegistry.get_by_class(CoreListener)
-        for listener in listeners:
-            getattr(listener.proxy(), event)(**kwargs)
+        """
+        Helper to allow calling of core listener events.
+
+        The events are delivered asynchronously by a
+        :class:`mopidy.utils.events.EventBus`.
+        """
+        _bus.send(event, **kwargs)
 
     def track_playback_paused(self, track, time_position):
         """
@@ -138,3 +141,30 @@ class CoreListener(object):
         :type time_position: int
         """
         pass
+
+    def library_update_started(self, job):
+        """
+        Called whenever a library update job is started.
+
+        *MAY* be implemented by actor.
+
+        :param job: the ID of the update job
+        :type job: int
+        """
+        pass
+
+    def library_update_finished(self, job):
+        """
+        Called whenever a library update job is done, and the updated library
+        is in use.
+
+        *MAY* be implemented by actor.
+
+        :param job: the ID of the update job
+        :type job: int
+        """
+        pass
+
+
+_bus = events.EventBus(CoreListener, coalesced_events=[
+    'tracklist_changed', 'options_changed', 'volume_changed'])
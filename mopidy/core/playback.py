@@ -1,10 +1,13 @@
 from __future__ import unicode_literals
 
+import collections
 import logging
 import random
+import time
 import urlparse
 
 from mopidy.audio import PlaybackState
+from mopidy.models import ImmutableObject
 
 from . import listener
 
@@ -17,15 +20,221 @@ def option_wrapper(name, default):
         return getattr(self, name, default)
 
     def set_option(self, value):
-        if getattr(self, name, default) != value:
+        changed = getattr(self, name, default) != value
+        setattr(self, name, value)
+        if changed:
             # pylint: disable = W0212
             self._trigger_options_changed()
             # pylint: enable = W0212
-        return setattr(self, name, value)
 
     return property(get_option, set_option)
 
 
+class PlaybackStatus(ImmutableObject):
+    """
+    Snapshot of the playback status, as returned by
+    :meth:`PlaybackController.get_status`.
+
+    :param state: playback state
+    :type state: :class:`PlaybackState` value
+    :param current_tl_track: the current track
+    :type current_tl_track: :class:`mopidy.models.TlTrack` or :class:`None`
+    :param tracklist_position: position of the current track
+    :type tracklist_position: int or :class:`None`
+    :param tracklist_length: length of the tracklist
+    :type tracklist_length: int
+    :param tracklist_version: version of the tracklist
+    :type tracklist_version: int
+    :param time_position: time position in milliseconds at :attr:`timestamp`
+    :type time_position: int
+    :param timestamp: time the snapshot was taken, as returned by
+        :func:`time.time`
+    :type timestamp: float
+    """
+
+    #: The playback state. Read-only.
+    state = PlaybackState.STOPPED
+
+    #: The current track. Read-only.
+    current_tl_track = None
+
+    #: The position of the current track in the tracklist. Read-only.
+    tracklist_position = None
+
+    #: The length of the tracklist. Read-only.
+    tracklist_length = 0
+
+    #: The version of the tracklist. Read-only.
+    tracklist_version = 0
+
+    #: Value of :attr:`PlaybackController.consume`. Read-only.
+    consume = False
+
+    #: Value of :attr:`PlaybackController.random`. Read-only.
+    random = False
+
+    #: Value of :attr:`PlaybackController.repeat`. Read-only.
+    repeat = False
+
+    #: Value of :attr:`PlaybackController.single`. Read-only.
+    single = False
+
+    #: Time position in milliseconds when the snapshot was taken. Read-only.
+    time_position = 0
+
+    #: Time the snapshot was taken, in seconds since the epoch. Read-only.
+    timestamp = 0
+
+    def get_time_position(self, now=None):
+        """
+        Get the time position in milliseconds at the given time.
+
+        While playing, the time position is extrapolated from the one at
+        :attr:`timestamp`, without going past the end of the current track.
+
+        :param now: time in seconds since the epoch, defaults to now
+        :type now: float
+        :rtype: int
+        """
+        if self.state != PlaybackState.PLAYING:
+            return self.time_position
+        if now is None:
+            now = time.time()
+        elapsed = max(int((now - self.timestamp) * 1000), 0)
+        time_position = self.time_position + elapsed
+        if self.current_tl_track is not None:
+            length = self.current_tl_track.track.length
+            if length is not None:
+                time_position = min(time_position, length)
+        return time_position
+
+
+class ShuffleScheduler(object):
+    """
+    Picks the tracks to play in random mode.
+
+    Keeps a pool of the tracks that have not been played yet, and picks the
+    next track at random from it, so that every track is played once before
+    the pool is refilled. Tracks added to or removed from the tracklist are
+    added to or removed from the pool as they come, without reshuffling.
+    Picking, adding and removing a track are all constant time.
+
+    The last ``history_size`` played tracks are kept in a history, so that
+    :meth:`back` can step back through them.
+    """
+
+    def __init__(self, history_size=100):
+        self._pool = []
+        self._pool_positions = {}
+        self._next = None
+        self._filled = False
+        self._current = None
+        self._history = collections.deque(maxlen=history_size)
+
+    def reset(self):
+        """Forget all played tracks, and refill the pool when next needed."""
+        self._pool = []
+        self._pool_positions = {}
+        self._next = None
+        self._filled = False
+        self._current = None
+        self._history.clear()
+
+    def get_next(self, tl_tracks, refill):
+        """
+        Get the track to play next.
+
+        The same track is returned until it is played or removed.
+
+        :param tl_tracks: the tracklist
+        :type tl_tracks: list of :class:`mopidy.models.TlTrack`
+        :param refill: whether to refill the pool if all tracks have been
+            played
+        :type refill: boolean
+        :rtype: :class:`mopidy.models.TlTrack` or :class:`None` if all tracks
+            have been played
+        """
+        if self._next is None:
+            if not self._pool and (refill or not self._filled):
+                logger.debug('Shuffling tracks')
+                for tl_track in tl_tracks:
+                    self._add(tl_track)
+                self._filled = True
+            if self._pool:
+                self._next = self._pool[random.randrange(len(self._pool))]
+        return self._next
+
+    def add(self, tl_tracks):
+        """Add tracks that were added to the tracklist to the pool."""
+        if self._filled:
+            for tl_track in tl_tracks:
+                self._add(tl_track)
+
+    def remove(self, tl_tracks):
+        """
+        Remove tracks that were removed from the tracklist or can't be played
+        from the pool and the history.
+        """
+        tlids = set()
+        for tl_track in tl_tracks:
+            self._remove(tl_track)
+            tlids.add(tl_track.tlid)
+        if self._current is not None and self._current.tlid in tlids:
+            self._current = None
+        if tlids and self._history:
+            history = [t for t in self._history if t.tlid not in tlids]
+            self._history.clear()
+            self._history.extend(history)
+
+    def played(self, tl_track):
+        """
+        Remove a track that started playing from the pool, and push the
+        previously played track onto the history.
+        """
+        self._remove(tl_track)
+        if self._current is not None and self._current != tl_track:
+            self._history.append(self._current)
+        self._current = tl_track
+
+    def get_previous(self):
+        """
+        Get the track that was played before the current one.
+
+        :rtype: :class:`mopidy.models.TlTrack` or :class:`None` if the history
+            is empty
+        """
+        if self._history:
+            return self._history[-1]
+
+    def back(self):
+        """
+        Pop the track that was played before the current one off the history,
+        so that playing it again does not push the current track onto it.
+
+        :rtype: :class:`mopidy.models.TlTrack` or :class:`None` if the history
+            is empty
+        """
+        if self._history:
+            self._current = self._history.pop()
+            return self._current
+
+    def _add(self, tl_track):
+        if tl_track.tlid not in self._pool_positions:
+            self._pool_positions[tl_track.tlid] = len(self._pool)
+            self._pool.append(tl_track)
+
+    def _remove(self, tl_track):
+        position = self._pool_positions.pop(tl_track.tlid, None)
+        if position is None:
+            return
+        last = self._pool.pop()
+        if position < len(self._pool):
+            self._pool[position] = last
+            self._pool_positions[last.tlid] = position
+        if self._next is not None and self._next.tlid == tl_track.tlid:
+            self._next = None
+
+
 class PlaybackController(object):
     # pylint: disable = R0902
     # Too many instance attributes
@@ -38,12 +247,6 @@ class PlaybackController(object):
     #:     Tracks are not removed from the playlist.
     consume = option_wrapper('_consume', False)
 
-    #: The currently playing or selected track.
-    #:
-    #: A two-tuple of (TLID integer, :class:`mopidy.models.Track`) or
-    #: :class:`None`.
-    current_tl_track = None
-
     #: :class:`True`
     #:     Tracks are selected at random from the playlist.
     #: :class:`False`
@@ -69,15 +272,19 @@ class PlaybackController(object):
         self.backends = backends
         self.core = core
 
+        self._current_tl_track = None
         self._state = PlaybackState.STOPPED
-        self._shuffled = []
-        self._first_shuffle = True
+        self._shuffler = ShuffleScheduler()
+        self._queued_tl_track = None
         self._volume = None
+        self._status = PlaybackStatus()
 
-    def _get_backend(self):
-        if self.current_tl_track is None:
+    def _get_backend(self, tl_track=None):
+        if tl_track is None:
+            tl_track = self.current_tl_track
+        if tl_track is None:
             return None
-        uri = self.current_tl_track.track.uri
+        uri = tl_track.track.uri
         uri_scheme = urlparse.urlparse(uri).scheme
         return self.backends.with_playback_by_uri_scheme.get(uri_scheme, None)
 
@@ -91,6 +298,21 @@ class PlaybackController(object):
             return None
         return tl_track.track
 
+    @property
+    def current_tl_track(self):
+        """
+        The currently playing or selected track.
+
+        A two-tuple of (TLID integer, :class:`mopidy.models.Track`) or
+        :class:`None`.
+        """
+        return self._current_tl_track
+
+    @current_tl_track.setter  # noqa
+    def current_tl_track(self, tl_track):
+        self._current_tl_track = tl_track
+        self._update_status()
+
     @property
     def current_tlid(self):
         """
@@ -120,7 +342,7 @@ class PlaybackController(object):
         if self.current_tl_track is None:
             return None
         try:
-            return self.core.tracklist.tl_tracks.index(self.current_tl_track)
+            return self.core.tracklist.index(self.current_tl_track)
         except ValueError:
             return None
 
@@ -151,15 +373,8 @@ class PlaybackController(object):
         if not tl_tracks:
             return None
 
-        if self.random and not self._shuffled:
-            if self.repeat or self._first_shuffle:
-                logger.debug('Shuffling tracks')
-                self._shuffled = tl_tracks
-                random.shuffle(self._shuffled)
-                self._first_shuffle = False
-
-        if self.random and self._shuffled:
-            return self._shuffled[0]
+        if self.random:
+            return self._shuffler.get_next(tl_tracks, refill=self.repeat)
 
         if self.current_tl_track is None:
             return tl_tracks[0]
@@ -202,15 +417,8 @@ class PlaybackController(object):
         if not tl_tracks:
             return None
 
-        if self.random and not self._shuffled:
-            if self.repeat or self._first_shuffle:
-                logger.debug('Shuffling tracks')
-                self._shuffled = tl_tracks
-                random.shuffle(self._shuffled)
-                self._first_shuffle = False
-
-        if self.random and self._shuffled:
-            return self._shuffled[0]
+        if self.random:
+            return self._shuffler.get_next(tl_tracks, refill=self.repeat)
 
         if self.current_tl_track is None:
             return tl_tracks[0]
@@ -241,9 +449,15 @@ class PlaybackController(object):
         A two-tuple of (TLID integer, :class:`mopidy.models.Track`).
 
         For normal playback this is the previous track in the playlist. If
-        random and/or consume is enabled it should return the current track
-        instead.
+        random is enabled this is the previously played track. If there is no
+        such track, or repeat and/or consume is enabled, it should return the
+        current track instead.
         """
+        if self.random:
+            tl_track = self._shuffler.get_previous()
+            if tl_track is not None:
+                return tl_track
+
         if self.repeat or self.consume or self.random:
             return self.current_tl_track
 
@@ -275,6 +489,7 @@ class PlaybackController(object):
     @state.setter  # noqa
     def state(self, new_state):
         (old_state, self._state) = (self.state, new_state)
+        self._update_status()
         logger.debug('Changing state: %s -> %s', old_state, new_state)
 
         self._trigger_playback_state_changed(old_state, new_state)
@@ -288,6 +503,44 @@ class PlaybackController(object):
         else:
             return 0
 
+    def get_status(self):
+        """
+        Get a snapshot of the playback status, with the playback state, the
+        options, the current track and its position, and the tracklist length
+        and version.
+
+        The snapshot is updated whenever any of these change, so getting it
+        is cheap. Use :meth:`PlaybackStatus.get_time_position` to get an up
+        to date time position from it.
+
+        :rtype: :class:`PlaybackStatus`
+        """
+        return self._status
+
+    def _update_status(self, time_position=None):
+        # Unless the time position is given, it is carried over from the
+        # previous snapshot, or starts from zero on a new track.
+        now = time.time()
+        if self._state == PlaybackState.STOPPED:
+            time_position = 0
+        elif time_position is None:
+            if self._status.current_tl_track == self._current_tl_track:
+                time_position = self._status.get_time_position(now)
+            else:
+                time_position = 0
+        self._status = PlaybackStatus(
+            state=self._state,
+            current_tl_track=self._current_tl_track,
+            tracklist_position=self.tracklist_position,
+            tracklist_length=self.core.tracklist.length,
+            tracklist_version=self.core.tracklist.version,
+            consume=self.consume,
+            random=self.random,
+            repeat=self.repeat,
+            single=self.single,
+            time_position=time_position,
+            timestamp=now)
+
     @property
     def volume(self):
         """Volume as int in range [0..100] or :class:`None`"""
@@ -325,10 +578,61 @@ class PlaybackController(object):
         elif old_state == PlaybackState.PAUSED:
             self.pause()
 
+    def on_about_to_finish(self):
+        """
+        Tell the playback controller that the audio of the current track is
+        about to finish.
+
+        Queues :attr:`tl_track_at_eot` in the backend, so that it is played
+        without a gap after the current track. If the backend can't do that,
+        the track is played from :meth:`on_end_of_track` instead.
+        """
+        self._queued_tl_track = None
+        if self.state != PlaybackState.PLAYING:
+            return
+
+        tl_track = self.tl_track_at_eot
+        if tl_track is None:
+            return
+
+        backend = self._get_backend(tl_track)
+        if backend and backend.playback.change_track(tl_track.track).get():
+            self._queued_tl_track = tl_track
+
+    def on_stream_changed(self):
+        """
+        Tell the playback controller that the track queued by
+        :meth:`on_about_to_finish` has started playing.
+        """
+        (tl_track, self._queued_tl_track) = (self._queued_tl_track, None)
+        if tl_track is None or self.state == PlaybackState.STOPPED:
+            return
+
+        if tl_track not in self.core.tracklist.tl_tracks:
+            # The queued track was removed from the tracklist after it was
+            # queued, so fall back to what an end of track would do.
+            self.on_end_of_track()
+            return
+
+        original_tl_track = self.current_tl_track
+
+        # The queued track is already playing, so the position can no longer
+        # be read, but the previous track was played to its end.
+        self._trigger_track_playback_ended(
+            time_position=original_tl_track.track.length)
+        self.current_tl_track = tl_track
+        if self.random:
+            self._shuffler.played(tl_track)
+        self._trigger_track_playback_started()
+
+        if self.consume:
+            self.core.tracklist.remove(tlid=original_tl_track.tlid)
+
     def on_end_of_track(self):
         """
         Tell the playback controller that end of track is reached.
         """
+        self._queued_tl_track = None
         if self.state == PlaybackState.STOPPED:
             return
 
@@ -339,22 +643,31 @@ class PlaybackController(object):
             self.play(self.tl_track_at_eot)
         else:
             self.stop(clear_current_track=True)
+            self._shuffler.reset()
 
         if self.consume:
             self.core.tracklist.remove(tlid=original_tl_track.tlid)
 
-    def on_tracklist_change(self):
+    def on_tracklist_change(self, added=None, removed=None):
         """
         Tell the playback controller that the current playlist has changed.
 
-        Used by :class:`mopidy.core.CurrentPlaylistController`.
+        Used by :class:`mopidy.core.TracklistController`.
+
+        :param added: tracks added to the tracklist, if known
+        :type added: list of :class:`mopidy.models.TlTrack` or :class:`None`
+        :param removed: tracks removed from the tracklist, if known
+        :type removed: list of :class:`mopidy.models.TlTrack` or :class:`None`
         """
-        self._first_shuffle = True
-        self._shuffled = []
+        if added is None or removed is None:
+            self._shuffler.reset()
+        else:
+            self._shuffler.add(added)
+            self._shuffler.remove(removed)
+        self._update_status()
 
-        if (not self.core.tracklist.tl_tracks or
-                self.current_tl_track not in
-                self.core.tracklist.tl_tracks):
+        if (not self.core.tracklist.length or
+                self.tracklist_position is None):
             self.stop(clear_current_track=True)
 
     def next(self):
@@ -369,12 +682,14 @@ class PlaybackController(object):
             self.change_track(self.tl_track_at_next)
         else:
             self.stop(clear_current_track=True)
+            self._shuffler.reset()
 
     def pause(self):
         """Pause playback."""
         backend = self._get_backend()
         if not backend or backend.playback.pause().get():
             self.state = PlaybackState.PAUSED
+            self._update_status(time_position=self.time_position)
             self._trigger_track_playback_paused()
 
     def play(self, tl_track=None, on_error_step=1):
@@ -403,20 +718,23 @@ class PlaybackController(object):
                 tl_track = self.tl_track_at_previous
 
         if tl_track is not None:
+            self._queued_tl_track = None
             self.current_tl_track = tl_track
             self.state = PlaybackState.PLAYING
             backend = self._get_backend()
-            if not backend or not backend.playback.play(tl_track.track).get():
+            if backend and backend.playback.play(tl_track.track).get():
+                self._update_status(time_position=0)
+            else:
                 # Track is not playable
-                if self.random and self._shuffled:
-                    self._shuffled.remove(tl_track)
+                if self.random:
+                    self._shuffler.remove([tl_track])
                 if on_error_step == 1:
                     self.next()
                 elif on_error_step == -1:
                     self.previous()
 
-        if self.random and self.current_tl_track in self._shuffled:
-            self._shuffled.remove(self.current_tl_track)
+        if self.random and self.current_tl_track is not None:
+            self._shuffler.played(self.current_tl_track)
 
         self._trigger_track_playback_started()
 
@@ -428,7 +746,12 @@ class PlaybackController(object):
         will continue. If it was paused, it will still be paused, etc.
         """
         self._trigger_track_playback_ended()
-        self.change_track(self.tl_track_at_previous, on_error_step=-1)
+        tl_track = None
+        if self.random:
+            tl_track = self._shuffler.back()
+        if tl_track is None:
+            tl_track = self.tl_track_at_previous
+        self.change_track(tl_track, on_error_step=-1)
 
     def resume(self):
         """If paused, resume playing the current track."""
@@ -478,6 +801,7 @@ class PlaybackController(object):
             stopping
         :type clear_current_track: boolean
         """
+        self._queued_tl_track = None
         if self.state != PlaybackState.STOPPED:
             backend = self._get_backend()
             if not backend or backend.playback.stop().get():
@@ -509,13 +833,15 @@ class PlaybackController(object):
         listener.CoreListener.send(
             'track_playback_started', track=self.current_track)
 
-    def _trigger_track_playback_ended(self):
+    def _trigger_track_playback_ended(self, time_position=None):
         logger.debug('Triggering track playback ended event')
         if self.current_track is None:
             return
+        if time_position is None:
+            time_position = self.time_position
         listener.CoreListener.send(
             'track_playback_ended',
-            track=self.current_track, time_position=self.time_position)
+            track=self.current_track, time_position=time_position)
 
     def _trigger_playback_state_changed(self, old_state, new_state):
         logger.debug('Triggering playback state change event')
@@ -524,9 +850,11 @@ class PlaybackController(object):
             old_state=old_state, new_state=new_state)
 
     def _trigger_options_changed(self):
+        self._update_status()
         logger.debug('Triggering options changed event')
         listener.CoreListener.send('options_changed')
 
     def _trigger_seeked(self, time_position):
+        self._update_status(time_position=time_position)
         logger.debug('Triggering seeked event')
         listener.CoreListener.send('seeked', time_position=time_position)
@@ -1,5 +1,6 @@
 from __future__ import unicode_literals
 
+import collections
 import logging
 import random
 
@@ -10,6 +11,9 @@ from . import listener
 
 logger = logging.getLogger('mopidy.core')
 
+#: Number of tracklist versions to remember the changes of.
+JOURNAL_LENGTH = 1000
+
 
 class TracklistController(object):
     pykka_traversable = True
@@ -20,23 +24,52 @@ class TracklistController(object):
         self._tl_tracks = []
         self._version = 0
 
+        # TLID to TlTrack, for constant time lookups by TLID.
+        self._tlid_map = {}
+
+        # TLID to position in the tracklist. Only the positions of the first
+        # _valid_positions tracks are known to be correct. The rest are
+        # recalculated when needed.
+        self._positions = {}
+        self._valid_positions = 0
+
+        # The latest tracklist versions and the position ranges they changed,
+        # used to tell clients what has changed since a given version.
+        self._journal = collections.deque(maxlen=JOURNAL_LENGTH)
+        self._pending_changes = []
+
+        # Tracks added to and removed from the tracklist since the version was
+        # last increased, passed on to the playback controller.
+        self._pending_added = []
+        self._pending_removed = []
+
+        # Immutable snapshots of the tracklist, shared by all readers until
+        # the tracklist is changed.
+        self._tl_tracks_snapshot = None
+        self._tracks_snapshot = None
+
     @property
     def tl_tracks(self):
         """
-        List of two-tuples of (TLID integer, :class:`mopidy.models.Track`).
+        Tuple of two-tuples of (TLID integer, :class:`mopidy.models.Track`).
 
-        Read-only.
+        Read-only. The same tuple is returned until the tracklist is changed.
         """
-        return self._tl_tracks[:]
+        if self._tl_tracks_snapshot is None:
+            self._tl_tracks_snapshot = tuple(self._tl_tracks)
+        return self._tl_tracks_snapshot
 
     @property
     def tracks(self):
         """
-        List of :class:`mopidy.models.Track` in the tracklist.
+        Tuple of :class:`mopidy.models.Track` in the tracklist.
 
-        Read-only.
+        Read-only. The same tuple is returned until the tracklist is changed.
         """
-        return [tl_track.track for tl_track in self._tl_tracks]
+        if self._tracks_snapshot is None:
+            self._tracks_snapshot = tuple(
+                tl_track.track for tl_track in self._tl_tracks)
+        return self._tracks_snapshot
 
     @property
     def length(self):
@@ -56,7 +89,12 @@ class TracklistController(object):
     @version.setter  # noqa
     def version(self, version):
         self._version = version
-        self._core.playback.on_tracklist_change()
+        self._journal.append((version, self._pending_changes))
+        self._pending_changes = []
+        (added, removed) = (self._pending_added, self._pending_removed)
+        self._pending_added = []
+        self._pending_removed = []
+        self._core.playback.on_tracklist_change(added=added, removed=removed)
         self._trigger_tracklist_changed()
 
     def add(self, track, at_position=None, increase_version=True):
@@ -80,29 +118,54 @@ class TracklistController(object):
         tl_track = TlTrack(self._next_tlid, track)
         if at_position is not None:
             self._tl_tracks.insert(at_position, tl_track)
+            self._invalidate_positions(at_position)
+            self._mark_changed(at_position)
         else:
             self._tl_tracks.append(tl_track)
+            self._mark_changed(len(self._tl_tracks) - 1)
+        self._tlid_map[tl_track.tlid] = tl_track
+        self._pending_added.append(tl_track)
         if increase_version:
             self.version += 1
         self._next_tlid += 1
         return tl_track
 
-    def append(self, tracks):
+    def append(self, tracks, at_position=None):
         """
-        Append the given tracks to the tracklist.
+        Append the given tracks to the end of, or insert them at the given
+        position in the tracklist.
+
+        The tracklist version is only increased once, no matter how many
+        tracks are added.
 
         Triggers the :method:`mopidy.core.CoreListener.tracklist_changed`
         event.
 
         :param tracks: tracks to append
         :type tracks: list of :class:`mopidy.models.Track`
+        :param at_position: position in tracklist to add tracks
+        :type at_position: int or :class:`None`
         :rtype: list of class:`mopidy.models.TlTrack`
         """
+        assert at_position <= len(self._tl_tracks), \
+            'at_position can not be greater than tracklist length'
         tl_tracks = []
         for track in tracks:
-            tl_tracks.append(self.add(track, increase_version=False))
+            tl_track = TlTrack(self._next_tlid, track)
+            self._tlid_map[tl_track.tlid] = tl_track
+            self._next_tlid += 1
+            tl_tracks.append(tl_track)
 
-        if tracks:
+        if at_position is not None:
+            self._tl_tracks[at_position:at_position] = tl_tracks
+            self._invalidate_positions(at_position)
+            self._mark_changed(at_position)
+        else:
+            self._mark_changed(len(self._tl_tracks))
+            self._tl_tracks.extend(tl_tracks)
+        self._pending_added.extend(tl_tracks)
+
+        if tl_tracks:
             self.version += 1
 
         return tl_tracks
@@ -114,7 +177,12 @@ class TracklistController(object):
         Triggers the :method:`mopidy.core.CoreListener.tracklist_changed`
         event.
         """
+        self._pending_removed.extend(self._tl_tracks)
         self._tl_tracks = []
+        self._tlid_map = {}
+        self._positions = {}
+        self._valid_positions = 0
+        self._mark_changed(0)
         self.version += 1
 
     def get(self, **criteria):
@@ -134,11 +202,13 @@ class TracklistController(object):
         :type criteria: dict
         :rtype: two-tuple (TLID integer, :class:`mopidy.models.Track`)
         """
-        matches = self._tl_tracks
+        if 'tlid' in criteria:
+            tl_track = self._tlid_map.get(criteria['tlid'])
+            matches = [tl_track] if tl_track is not None else []
+        else:
+            matches = self._tl_tracks
         for (key, value) in criteria.iteritems():
-            if key == 'tlid':
-                matches = filter(lambda ct: ct.tlid == value, matches)
-            else:
+            if key != 'tlid':
                 matches = filter(
                     lambda ct: getattr(ct.track, key) == value, matches)
         if len(matches) == 1:
@@ -150,6 +220,46 @@ class TracklistController(object):
         else:
             raise LookupError('"%s" match multiple tracks' % criteria_string)
 
+    def get_changes(self, version):
+        """
+        Get the tracks that have been added, moved or changed since the given
+        tracklist version, together with their current positions.
+
+        Returns :class:`None` if the changes since the given version are no
+        longer known, in which case the entire tracklist should be considered
+        changed.
+
+        :param version: the tracklist version to get changes since
+        :type version: int
+        :rtype: list of two-tuples (position, :class:`mopidy.models.TlTrack`)
+            or :class:`None`
+        """
+        if version >= self._version:
+            return []
+
+        changes = []
+        expected_version = self._version
+        for (journal_version, journal_changes) in reversed(self._journal):
+            if journal_version <= version:
+                break
+            if journal_version != expected_version:
+                return None
+            changes.extend(journal_changes)
+            expected_version -= 1
+        if expected_version != version:
+            return None
+
+        length = len(self._tl_tracks)
+        open_start = min(
+            [start for (start, end) in changes if end is None] or [length])
+        positions = set(xrange(open_start, length))
+        for (start, end) in changes:
+            if end is not None:
+                positions.update(xrange(start, min(end, open_start)))
+        return [
+            (position, self._tl_tracks[position])
+            for position in sorted(positions)]
+
     def index(self, tl_track):
         """
         Get index of the given (TLID integer, :class:`mopidy.models.Track`)
@@ -161,7 +271,10 @@ class TracklistController(object):
         :type tl_track: two-tuple (TLID integer, :class:`mopidy.models.Track`)
         :rtype: int
         """
-        return self._tl_tracks.index(tl_track)
+        position = self._get_position(tl_track.tlid)
+        if position is None or self._tl_tracks[position] != tl_track:
+            raise ValueError('%r is not in the tracklist' % (tl_track,))
+        return position
 
     def move(self, start, end, to_position):
         """
@@ -190,11 +303,16 @@ class TracklistController(object):
         assert to_position <= len(tl_tracks), \
             'to_position can not be larger than tracklist length'
 
+        first_changed = min(start, to_position)
+        last_changed = max(end, to_position + end - start)
+
         new_tl_tracks = tl_tracks[:start] + tl_tracks[end:]
         for tl_track in tl_tracks[start:end]:
             new_tl_tracks.insert(to_position, tl_track)
             to_position += 1
         self._tl_tracks = new_tl_tracks
+        self._invalidate_positions(first_changed)
+        self._mark_changed(first_changed, last_changed)
         self.version += 1
 
     def remove(self, **criteria):
@@ -210,10 +328,56 @@ class TracklistController(object):
         :type criteria: dict
         """
         tl_track = self.get(**criteria)
-        position = self._tl_tracks.index(tl_track)
+        position = self.index(tl_track)
         del self._tl_tracks[position]
+        del self._tlid_map[tl_track.tlid]
+        del self._positions[tl_track.tlid]
+        self._pending_removed.append(tl_track)
+        self._invalidate_positions(position)
+        self._mark_changed(position)
         self.version += 1
 
+    def remove_many(self, tlids):
+        """
+        Remove the tracks with the given TLIDs from the tracklist.
+
+        The tracklist version is only increased once, no matter how many
+        tracks are removed.
+
+        Raises :exc:`LookupError` if any of the TLIDs are not in the
+        tracklist, in which case no tracks are removed.
+
+        Triggers the :method:`mopidy.core.CoreListener.tracklist_changed`
+        event.
+
+        :param tlids: TLIDs of the tracks to remove
+        :type tlids: list of int
+        :rtype: list of :class:`mopidy.models.TlTrack` that was removed
+        """
+        tlids = set(tlids)
+        missing = [tlid for tlid in tlids if tlid not in self._tlid_map]
+        if missing:
+            raise LookupError('"tlid=%s" match no tracks' % missing[0])
+        if not tlids:
+            return []
+
+        removed = []
+        remaining = []
+        for tl_track in self._tl_tracks:
+            if tl_track.tlid in tlids:
+                if not removed:
+                    self._invalidate_positions(len(remaining))
+                    self._mark_changed(len(remaining))
+                removed.append(tl_track)
+                del self._tlid_map[tl_track.tlid]
+                self._positions.pop(tl_track.tlid, None)
+            else:
+                remaining.append(tl_track)
+        self._tl_tracks = remaining
+        self._pending_removed.extend(removed)
+        self.version += 1
+        return removed
+
     def shuffle(self, start=None, end=None):
         """
         Shuffles the entire tracklist. If ``start`` and ``end`` is given only
@@ -244,6 +408,36 @@ class TracklistController(object):
         after = tl_tracks[end or len(tl_tracks):]
         random.shuffle(shuffled)
         self._tl_tracks = before + shuffled + after
+        self._invalidate_positions(start or 0)
+        self._mark_changed(start or 0, end)
+        self.version += 1
+
+    def swap(self, position1, position2):
+        """
+        Swap the positions of the tracks at ``position1`` and ``position2``.
+
+        The tracks keep their TLIDs.
+
+        Triggers the :method:`mopidy.core.CoreListener.tracklist_changed`
+        event.
+
+        :param position1: position of the first track
+        :type position1: int
+        :param position2: position of the second track
+        :type position2: int
+        """
+        tl_tracks = self._tl_tracks
+
+        assert 0 <= position1 < len(tl_tracks), \
+            'position1 must be within the tracklist'
+        assert 0 <= position2 < len(tl_tracks), \
+            'position2 must be within the tracklist'
+
+        tl_tracks[position1], tl_tracks[position2] = (
+            tl_tracks[position2], tl_tracks[position1])
+        self._invalidate_positions(min(position1, position2))
+        self._mark_changed(position1, position1 + 1)
+        self._mark_changed(position2, position2 + 1)
         self.version += 1
 
     def slice(self, start, end):
@@ -259,6 +453,26 @@ class TracklistController(object):
         """
         return self._tl_tracks[start:end]
 
+    def _get_position(self, tlid):
+        if tlid not in self._tlid_map:
+            return None
+        position = self._positions.get(tlid)
+        if position is None or position >= self._valid_positions:
+            for position in xrange(
+                    self._valid_positions, len(self._tl_tracks)):
+                self._positions[self._tl_tracks[position].tlid] = position
+            self._valid_positions = len(self._tl_tracks)
+            position = self._positions[tlid]
+        return position
+
+    def _mark_changed(self, start, end=None):
+        self._pending_changes.append((start, end))
+        self._tl_tracks_snapshot = None
+        self._tracks_snapshot = None
+
+    def _invalidate_positions(self, position):
+        self._valid_positions = min(self._valid_positions, position)
+
     def _trigger_tracklist_changed(self):
         logger.debug('Triggering event: tracklist_changed()')
         listener.CoreListener.send('tracklist_changed')
@@ -51,3 +51,10 @@ class MpdFrontend(pykka.ThreadingActor, CoreListener):
 
     def volume_changed(self):
         self.send_idle('mixer')
+
+    def library_update_started(self, job):
+        self.send_idle('update')
+
+    def library_update_finished(self, job):
+        self.send_idle('update')
+        self.send_idle('database')
@@ -1,7 +1,10 @@
 from __future__ import unicode_literals
 
+import functools
+import itertools
 import logging
 import re
+import types
 
 import pykka
 
@@ -31,8 +34,50 @@ class MpdDispatcher(object):
         self.context = MpdContext(self, session=session, core=core)
 
     def handle_request(self, request, current_command_list_index=None):
-        """Dispatch incoming requests to the correct handler."""
-        self.command_list_index = current_command_list_index
+        """
+        Dispatch incoming requests to the correct handler.
+
+        Returns the response lines as a list, or as an iterator if the handler
+        returned a generator, so that the response can be sent while it is
+        formatted. If the generator fails, the iterator ends with the ``ACK``.
+        """
+        return self._handle_request(
+            request, current_command_list_index, self._call_handler_filter)
+
+    def handle_command_list(self, command_list, command_list_ok=False):
+        """
+        Dispatch the requests of a command list, stopping at the first error.
+
+        Runs of consecutive requests for a command with a batch handler
+        registered with :func:`mopidy.frontends.mpd.protocol.handle_batch` are
+        passed to the batch handler together, so that they can share calls to
+        the core. Each request of a run still passes through the same filters
+        as any other request, the batch handler just produces the results.
+        """
+        response = []
+        index = 0
+        while index < len(command_list):
+            (batch_handler, batch) = self._find_batch(command_list, index)
+            if batch_handler is None:
+                call_filter = self._call_handler_filter
+                end = index + 1
+            else:
+                call_filter = functools.partial(
+                    self._call_batch_handler_filter,
+                    batch_handler(self.context, batch))
+                end = index + len(batch)
+            for index in xrange(index, end):
+                response.extend(self._handle_request(
+                    command_list[index], index, call_filter))
+                if self._has_error(response):
+                    return response
+                if command_list_ok:
+                    response.append('list_OK')
+            index = end
+        return response
+
+    def _handle_request(self, request, command_list_index, call_filter):
+        self.command_list_index = command_list_index
         response = []
         filter_chain = [
             self._catch_mpd_ack_errors_filter,
@@ -40,7 +85,7 @@ class MpdDispatcher(object):
             self._command_list_filter,
             self._idle_filter,
             self._add_ok_filter,
-            self._call_handler_filter,
+            call_filter,
         ]
         return self._call_next_filter(request, response, filter_chain)
 
@@ -70,12 +115,27 @@ class MpdDispatcher(object):
     ### Filter: catch MPD ACK errors
 
     def _catch_mpd_ack_errors_filter(self, request, response, filter_chain):
+        command_list_index = self.command_list_index
         try:
-            return self._call_next_filter(request, response, filter_chain)
+            response = self._call_next_filter(request, response, filter_chain)
         except exceptions.MpdAckError as mpd_ack_error:
-            if self.command_list_index is not None:
-                mpd_ack_error.index = self.command_list_index
-            return [mpd_ack_error.get_mpd_ack()]
+            return [self._get_mpd_ack(mpd_ack_error, command_list_index)]
+        if isinstance(response, list):
+            return response
+        return self._iter_catching_mpd_ack_errors(
+            response, command_list_index)
+
+    def _iter_catching_mpd_ack_errors(self, response, command_list_index):
+        try:
+            for line in response:
+                yield line
+        except exceptions.MpdAckError as mpd_ack_error:
+            yield self._get_mpd_ack(mpd_ack_error, command_list_index)
+
+    def _get_mpd_ack(self, mpd_ack_error, command_list_index):
+        if command_list_index is not None:
+            mpd_ack_error.index = command_list_index
+        return mpd_ack_error.get_mpd_ack()
 
     ### Filter: authenticate
 
@@ -87,10 +147,7 @@ class MpdDispatcher(object):
             return self._call_next_filter(request, response, filter_chain)
         else:
             command_name = request.split(' ')[0]
-            command_names_not_requiring_auth = [
-                command.name for command in protocol.mpd_commands
-                if not command.auth_required]
-            if command_name in command_names_not_requiring_auth:
+            if command_name in _get_command_names(auth_required=False):
                 return self._call_next_filter(request, response, filter_chain)
             else:
                 raise exceptions.MpdPermissionError(command=command_name)
@@ -105,6 +162,9 @@ class MpdDispatcher(object):
             response = self._call_next_filter(request, response, filter_chain)
             if (self._is_receiving_command_list(request) or
                     self._is_processing_command_list(request)):
+                # The responses in a command list are checked for errors
+                # before running the next request, so they are not streamed.
+                response = list(response)
                 if response and response[-1] == 'OK':
                     response = response[:-1]
             return response
@@ -145,6 +205,9 @@ class MpdDispatcher(object):
 
     def _add_ok_filter(self, request, response, filter_chain):
         response = self._call_next_filter(request, response, filter_chain)
+        if not isinstance(response, list):
+            # The OK is only reached if the response ends without an error
+            return itertools.chain(response, ['OK'])
         if not self._has_error(response):
             response.append('OK')
         return response
@@ -156,7 +219,11 @@ class MpdDispatcher(object):
 
     def _call_handler_filter(self, request, response, filter_chain):
         try:
-            response = self._format_response(self._call_handler(request))
+            result = self._call_handler(request)
+            if isinstance(result, types.GeneratorType):
+                response = self._iter_response(result)
+            else:
+                response = self._format_response(result)
             return self._call_next_filter(request, response, filter_chain)
         except pykka.ActorDeadError as e:
             logger.warning('Tried to communicate with dead actor.')
@@ -167,48 +234,88 @@ class MpdDispatcher(object):
         return handler(self.context, **kwargs)
 
     def _find_handler(self, request):
-        for pattern in protocol.request_handlers:
-            matches = re.match(pattern, request)
-            if matches is not None:
-                return (
-                    protocol.request_handlers[pattern], matches.groupdict())
+        result = protocol.request_handlers.find(request)
+        if result is not None:
+            return result
         command_name = request.split(' ')[0]
-        if command_name in [command.name for command in protocol.mpd_commands]:
+        if command_name in _get_command_names():
             raise exceptions.MpdArgError(
                 'incorrect arguments', command=command_name)
         raise exceptions.MpdUnknownCommand(command=command_name)
 
+    ### Batches of requests in command lists
+
+    def _find_batch(self, command_list, start):
+        result = protocol.request_handlers.find(command_list[start])
+        if result is None:
+            return (None, [])
+        (handler, kwargs) = result
+        batch_handler = protocol.batch_handlers.get(handler)
+        if batch_handler is None:
+            return (None, [])
+        batch = [kwargs]
+        for i in xrange(start + 1, len(command_list)):
+            result = protocol.request_handlers.find(command_list[i])
+            if result is None or result[0] is not handler:
+                break
+            batch.append(result[1])
+        return (batch_handler, batch)
+
+    def _call_batch_handler_filter(
+            self, results, request, response, filter_chain):
+        try:
+            response = self._format_response(next(results))
+            return self._call_next_filter(request, response, filter_chain)
+        except pykka.ActorDeadError as e:
+            logger.warning('Tried to communicate with dead actor.')
+            raise exceptions.MpdSystemError(e)
+
+    def _iter_response(self, result):
+        # Formats the elements of a handler's generator one at a time, as the
+        # response is sent.
+        try:
+            for element in result:
+                for line in self._format_response(element):
+                    yield line
+        except pykka.ActorDeadError as e:
+            logger.warning('Tried to communicate with dead actor.')
+            raise exceptions.MpdSystemError(e)
+
     def _format_response(self, response):
         formatted_response = []
-        for element in self._listify_result(response):
-            formatted_response.extend(self._format_lines(element))
+        if response is not None:
+            self._format_elements(response, formatted_response)
         return formatted_response
 
-    def _listify_result(self, result):
-        if result is None:
-            return []
-        if isinstance(result, set):
-            return self._flatten(list(result))
-        if not isinstance(result, list):
-            return [result]
-        return self._flatten(result)
-
-    def _flatten(self, the_list):
-        result = []
-        for element in the_list:
-            if isinstance(element, list):
-                result.extend(self._flatten(element))
-            else:
-                result.append(element)
-        return result
-
-    def _format_lines(self, line):
-        if isinstance(line, dict):
-            return ['%s: %s' % (key, value) for (key, value) in line.items()]
-        if isinstance(line, tuple):
-            (key, value) = line
-            return ['%s: %s' % (key, value)]
-        return [line]
+    def _format_elements(self, elements, formatted_response):
+        # Handlers may return nested lists, sets and generators of lines,
+        # dicts and two-tuples. They are formatted straight into the response
+        # without building any intermediate lists.
+        if isinstance(elements, (list, set, types.GeneratorType)):
+            for element in elements:
+                self._format_elements(element, formatted_response)
+        elif isinstance(elements, dict):
+            formatted_response.extend(
+                '%s: %s' % (key, value) for (key, value) in elements.items())
+        elif isinstance(elements, tuple):
+            formatted_response.append('%s: %s' % elements)
+        else:
+            formatted_response.append(elements)
+
+
+_command_names = {}
+
+
+def _get_command_names(auth_required=None):
+    # The set of commands only grows as handlers are registered, so the
+    # number of commands tells us if the cached names are still valid.
+    key = (auth_required, len(protocol.mpd_commands))
+    if key not in _command_names:
+        _command_names[key] = frozenset(
+            command.name for command in protocol.mpd_commands
+            if auth_required is None or
+            command.auth_required == auth_required)
+    return _command_names[key]
 
 
 class MpdContext(object):
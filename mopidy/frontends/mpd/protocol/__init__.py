@@ -26,11 +26,115 @@ VERSION = '0.16.0'
 
 MpdCommand = namedtuple('MpdCommand', ['name', 'auth_required'])
 
+
+class RequestHandlers(dict):
+    """
+    Map between request matchers and request handler functions.
+
+    The patterns are compiled and grouped by the command name they start
+    with, so that finding the handler for a request only needs to try the
+    few patterns for the request's command. The index is rebuilt whenever a
+    pattern is added or removed, through any of the dict's mutating
+    methods.
+    """
+
+    _command_name = re.compile(r'^\^([a-z_]+)(?:\$| |\( )')
+
+    def __init__(self, *args, **kwargs):
+        super(RequestHandlers, self).__init__(*args, **kwargs)
+        self._patterns = list(self.keys())
+        self._index = None
+
+    def __setitem__(self, pattern, handler):
+        if pattern not in self:
+            self._patterns.append(pattern)
+        super(RequestHandlers, self).__setitem__(pattern, handler)
+        self._index = None
+
+    def __delitem__(self, pattern):
+        super(RequestHandlers, self).__delitem__(pattern)
+        self._patterns.remove(pattern)
+        self._index = None
+
+    def update(self, *args, **kwargs):
+        for (pattern, handler) in dict(*args, **kwargs).iteritems():
+            self[pattern] = handler
+
+    def setdefault(self, pattern, handler=None):
+        if pattern not in self:
+            self[pattern] = handler
+        return self[pattern]
+
+    def pop(self, pattern, *default):
+        if pattern not in self and default:
+            return default[0]
+        handler = self[pattern]
+        del self[pattern]
+        return handler
+
+    def popitem(self):
+        if not self:
+            raise KeyError('popitem(): dictionary is empty')
+        pattern = self._patterns[-1]
+        return (pattern, self.pop(pattern))
+
+    def clear(self):
+        super(RequestHandlers, self).clear()
+        self._patterns = []
+        self._index = None
+
+    def find(self, request):
+        """
+        Find the handler for the given request.
+
+        :param request: the request
+        :type request: string
+        :rtype: two-tuple of (handler, dict of keyword arguments) or
+            :class:`None` if no handler matches
+        """
+        if self._index is None:
+            self._index = self._build_index()
+        (by_command_name, other) = self._index
+        command_name = request.split(' ', 1)[0]
+        for (regexp, handler) in by_command_name.get(command_name, other):
+            matches = regexp.match(request)
+            if matches is not None:
+                return (handler, matches.groupdict())
+        return None
+
+    def _build_index(self):
+        by_command_name = {}
+        other = []
+        for (i, pattern) in enumerate(self._patterns):
+            regexp = re.compile(pattern)
+            # Patterns with fewer groups are more specific, e.g. 'playlistinfo
+            # "-1"' must be tried before 'playlistinfo "(?P<songpos>-?\d+)"'.
+            # Patterns with the same number of groups are tried in the order
+            # they were added.
+            route = ((regexp.groups, i), regexp, self[pattern])
+            match = self._command_name.match(pattern)
+            if match is not None:
+                by_command_name.setdefault(match.group(1), []).append(route)
+            else:
+                other.append(route)
+        other = self._sorted(other)
+        by_command_name = dict(
+            (name, self._sorted(routes) + other)
+            for (name, routes) in by_command_name.iteritems())
+        return (by_command_name, other)
+
+    def _sorted(self, routes):
+        return [(regexp, handler) for (_, regexp, handler) in sorted(routes)]
+
+
 #: Set of all available commands, represented as :class:`MpdCommand` objects.
 mpd_commands = set()
 
 #: Map between request matchers and request handler functions.
-request_handlers = {}
+request_handlers = RequestHandlers()
+
+#: Map between request handler functions and their batch handler functions.
+batch_handlers = {}
 
 
 def handle_request(pattern, auth_required=True):
@@ -66,6 +170,38 @@ def handle_request(pattern, auth_required=True):
     return decorator
 
 
+def handle_batch(request_handler):
+    """
+    Decorator for connecting a batch handler to a command handler.
+
+    When a command list contains a run of consecutive requests for the same
+    command handler, the batch handler is called once for the whole run,
+    with the list of keyword arguments for each request. It must be a
+    generator yielding the result of each request in order, and it must
+    raise the request's :class:`mopidy.frontends.mpd.exceptions.MpdAckError`
+    instead of yielding if a request fails. The requests after the failed
+    one must not be executed.
+
+    For example::
+
+        @handle_batch(do)
+        def do_batch(context, requests):
+            for kwargs in requests:
+                yield do(context, **kwargs)
+
+    :param request_handler: the command handler to batch
+    :type request_handler: function
+    """
+    def decorator(func):
+        if request_handler in batch_handlers:
+            raise ValueError(
+                'Tried to redefine batch handler for %s with %s' % (
+                    request_handler, func))
+        batch_handlers[request_handler] = func
+        return func
+    return decorator
+
+
 def load_protocol_modules():
     """
     The protocol modules must be imported to get them registered in
@@ -36,17 +36,8 @@ def command_list_end(context):
         context.dispatcher.command_list, [])
     (command_list_ok, context.dispatcher.command_list_ok) = (
         context.dispatcher.command_list_ok, False)
-    command_list_response = []
-    for index, command in enumerate(command_list):
-        response = context.dispatcher.handle_request(
-            command, current_command_list_index=index)
-        command_list_response.extend(response)
-        if (command_list_response and
-                command_list_response[-1].startswith('ACK')):
-            return command_list_response
-        if command_list_ok:
-            command_list_response.append('list_OK')
-    return command_list_response
+    return context.dispatcher.handle_command_list(
+        command_list, command_list_ok)
 
 
 @handle_request(r'^command_list_ok_begin$')
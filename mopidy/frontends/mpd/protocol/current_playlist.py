@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 from mopidy.frontends.mpd import translator
 from mopidy.frontends.mpd.exceptions import (
     MpdArgError, MpdNoExistError, MpdNotImplemented)
-from mopidy.frontends.mpd.protocol import handle_request
+from mopidy.frontends.mpd.protocol import handle_batch, handle_request
 
 
 @handle_request(r'^add "(?P<uri>[^"]*)"$')
@@ -29,6 +29,36 @@ def add(context, uri):
     raise MpdNoExistError('directory or file not found', command='add')
 
 
+@handle_batch(add)
+def add_batch(context, requests):
+    """
+    Adds the tracks of consecutive ``add`` requests in a command list to the
+    tracklist at once.
+
+    All the library lookups are started before waiting for the first result.
+    """
+    futures = [
+        context.core.library.lookup(kwargs['uri']) if kwargs['uri'] else None
+        for kwargs in requests]
+    tracks = []
+    results = []
+    error = None
+    for future in futures:
+        if future is not None:
+            track = future.get()
+            if not track:
+                error = MpdNoExistError(
+                    'directory or file not found', command='add')
+                break
+            tracks.append(track)
+        results.append(None)
+    _append_tracks(context, tracks)
+    for result in results:
+        yield result
+    if error is not None:
+        raise error
+
+
 @handle_request(r'^addid "(?P<uri>[^"]*)"( "(?P<songpos>\d+)")*$')
 def addid(context, uri, songpos=None):
     """
@@ -61,6 +91,53 @@ def addid(context, uri, songpos=None):
     return ('Id', tl_track.tlid)
 
 
+@handle_batch(addid)
+def addid_batch(context, requests):
+    """
+    Adds the tracks of consecutive ``addid`` requests in a command list to the
+    tracklist, appending the tracks without a position at once.
+
+    All the library lookups are started before waiting for the first result.
+    """
+    futures = [
+        context.core.library.lookup(kwargs['uri']) if kwargs['uri'] else None
+        for kwargs in requests]
+    length = context.core.tracklist.length.get()
+    tlids = []
+    tracks_to_append = []
+    error = None
+    for (kwargs, future) in zip(requests, futures):
+        track = future.get() if future is not None else None
+        if track is None:
+            error = MpdNoExistError('No such song', command='addid')
+            break
+        if kwargs.get('songpos') is None:
+            tracks_to_append.append(track)
+        else:
+            songpos = int(kwargs['songpos'])
+            if songpos > length:
+                error = MpdArgError('Bad song index', command='addid')
+                break
+            tlids.extend(_append_tracks(context, tracks_to_append))
+            tracks_to_append = []
+            tl_track = context.core.tracklist.add(
+                track, at_position=songpos).get()
+            tlids.append(tl_track.tlid)
+        length += 1
+    tlids.extend(_append_tracks(context, tracks_to_append))
+    for tlid in tlids:
+        yield ('Id', tlid)
+    if error is not None:
+        raise error
+
+
+def _append_tracks(context, tracks):
+    if not tracks:
+        return []
+    tl_tracks = context.core.tracklist.append(tracks).get()
+    return [tl_track.tlid for tl_track in tl_tracks]
+
+
 @handle_request(r'^delete "(?P<start>\d+):(?P<end>\d+)*"$')
 def delete_range(context, start, end=None):
     """
@@ -78,8 +155,8 @@ def delete_range(context, start, end=None):
     tl_tracks = context.core.tracklist.slice(start, end).get()
     if not tl_tracks:
         raise MpdArgError('Bad song index', command='delete')
-    for (tlid, _) in tl_tracks:
-        context.core.tracklist.remove(tlid=tlid)
+    context.core.tracklist.remove_many(
+        [tl_track.tlid for tl_track in tl_tracks]).get()
 
 
 @handle_request(r'^delete "(?P<songpos>\d+)"$')
@@ -112,6 +189,41 @@ def deleteid(context, tlid):
         raise MpdNoExistError('No such song', command='deleteid')
 
 
+@handle_batch(deleteid)
+def deleteid_batch(context, requests):
+    """
+    Removes the tracks of consecutive ``deleteid`` requests in a command list
+    from the tracklist at once.
+
+    If the current track is to be removed, the requests are executed one by
+    one instead, to skip to the next track the same way as :meth:`deleteid`.
+    """
+    tlids = [int(kwargs['tlid']) for kwargs in requests]
+    current_tlid = context.core.playback.current_tlid.get()
+    if current_tlid in tlids:
+        for tlid in tlids:
+            yield deleteid(context, tlid)
+        return
+    existing_tlids = set(
+        tl_track.tlid for tl_track in context.core.tracklist.tl_tracks.get())
+    tlids_to_remove = []
+    for tlid in tlids:
+        if tlid not in existing_tlids:
+            break
+        existing_tlids.remove(tlid)
+        tlids_to_remove.append(tlid)
+    if tlids_to_remove:
+        try:
+            context.core.tracklist.remove_many(tlids_to_remove).get()
+        except LookupError:
+            # The tracklist was changed by someone else in the meantime
+            raise MpdNoExistError('No such song', command='deleteid')
+    for _ in tlids_to_remove:
+        yield None
+    if len(tlids_to_remove) < len(tlids):
+        raise MpdNoExistError('No such song', command='deleteid')
+
+
 @handle_request(r'^clear$')
 def clear(context):
     """
@@ -227,7 +339,7 @@ def playlistid(context, tlid=None):
         except LookupError:
             raise MpdNoExistError('No such song', command='playlistid')
     else:
-        return translator.tracks_to_mpd_format(
+        return translator.iter_tracks_to_mpd_format(
             context.core.tracklist.tl_tracks.get())
 
 
@@ -265,7 +377,7 @@ def playlistinfo(context, songpos=None, start=None, end=None):
             if end > context.core.tracklist.length.get():
                 end = None
         tl_tracks = context.core.tracklist.tl_tracks.get()
-        return translator.tracks_to_mpd_format(tl_tracks, start, end)
+        return translator.iter_tracks_to_mpd_format(tl_tracks, start, end)
 
 
 @handle_request(r'^playlistsearch "(?P<tag>[^"]+)" "(?P<needle>[^"]+)"$')
@@ -304,10 +416,13 @@ def plchanges(context, version):
 
     - Calls ``plchanges "-1"`` two times per second to get the entire playlist.
     """
-    # XXX Naive implementation that returns all tracks as changed
-    if int(version) < context.core.tracklist.version.get():
-        return translator.tracks_to_mpd_format(
+    changes = context.core.tracklist.get_changes(int(version)).get()
+    if changes is None:
+        return translator.iter_tracks_to_mpd_format(
             context.core.tracklist.tl_tracks.get())
+    return (
+        translator.track_to_mpd_format(tl_track, position=position)
+        for (position, tl_track) in changes)
 
 
 @handle_request(r'^plchangesposid "(?P<version>\d+)"$')
@@ -324,14 +439,14 @@ def plchangesposid(context, version):
         To detect songs that were deleted at the end of the playlist, use
         ``playlistlength`` returned by status command.
     """
-    # XXX Naive implementation that returns all tracks as changed
-    if int(version) != context.core.tracklist.version.get():
-        result = []
-        for (position, (tlid, _)) in enumerate(
-                context.core.tracklist.tl_tracks.get()):
-            result.append(('cpos', position))
-            result.append(('Id', tlid))
-        return result
+    changes = context.core.tracklist.get_changes(int(version)).get()
+    if changes is None:
+        changes = enumerate(context.core.tracklist.tl_tracks.get())
+    result = []
+    for (position, (tlid, _)) in changes:
+        result.append(('cpos', position))
+        result.append(('Id', tlid))
+    return result
 
 
 @handle_request(r'^shuffle$')
@@ -363,15 +478,7 @@ def swap(context, songpos1, songpos2):
     """
     songpos1 = int(songpos1)
     songpos2 = int(songpos2)
-    tracks = context.core.tracklist.tracks.get()
-    song1 = tracks[songpos1]
-    song2 = tracks[songpos2]
-    del tracks[songpos1]
-    tracks.insert(songpos1, song2)
-    del tracks[songpos2]
-    tracks.insert(songpos2, song1)
-    context.core.tracklist.clear()
-    context.core.tracklist.append(tracks)
+    context.core.tracklist.swap(songpos1, songpos2).get()
 
 
 @handle_request(r'^swapid "(?P<tlid1>\d+)" "(?P<tlid2>\d+)"$')
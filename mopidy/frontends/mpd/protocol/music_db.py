@@ -3,9 +3,13 @@ from __future__ import unicode_literals
 import re
 import shlex
 
-from mopidy.frontends.mpd.exceptions import MpdArgError, MpdNotImplemented
-from mopidy.frontends.mpd.protocol import handle_request, stored_playlists
-from mopidy.frontends.mpd.translator import playlist_to_mpd_format
+import pykka
+
+from mopidy.frontends.mpd.exceptions import MpdArgError, MpdNoExistError
+from mopidy.frontends.mpd.protocol import (
+    handle_batch, handle_request, stored_playlists)
+from mopidy.frontends.mpd.translator import (
+    playlist_to_mpd_format, track_to_mpd_format)
 
 
 def _build_query(mpd_query):
@@ -35,6 +39,18 @@ def _build_query(mpd_query):
     return query
 
 
+# Mopidy query fields for the MPD tags supported by count
+_COUNT_FIELDS = {
+    'album': 'album',
+    'any': 'any',
+    'artist': 'artist',
+    'date': 'date',
+    'file': 'uri',
+    'filename': 'uri',
+    'title': 'track',
+}
+
+
 @handle_request(r'^count "(?P<tag>[^"]+)" "(?P<needle>[^"]*)"$')
 def count(context, tag, needle):
     """
@@ -45,7 +61,15 @@ def count(context, tag, needle):
         Counts the number of songs and their total playtime in the db
         matching ``TAG`` exactly.
     """
-    return [('songs', 0), ('playtime', 0)]  # TODO
+    field = _COUNT_FIELDS.get(tag.lower())
+    if field is None:
+        raise MpdArgError('incorrect arguments', command='count')
+    if not needle:
+        return [('songs', 0), ('playtime', 0)]
+    field = str(field)  # Needed for kwargs keys on OS X and Windows
+    (songs, playtime) = context.core.library.count(
+        **{field: [needle]}).get()
+    return [('songs', songs), ('playtime', playtime // 1000)]
 
 
 @handle_request(
@@ -81,6 +105,19 @@ def find(context, mpd_query):
         context.core.library.find_exact(**query).get())
 
 
+@handle_batch(find)
+def find_batch(context, requests):
+    """
+    Runs the library lookups of consecutive ``find`` requests in a command
+    list concurrently.
+    """
+    futures = [
+        context.core.library.find_exact(**_build_query(kwargs['mpd_query']))
+        for kwargs in requests]
+    for result in pykka.get_all(futures):
+        yield playlist_to_mpd_format(result)
+
+
 @handle_request(
     r'^findadd '
     r'(?P<query>("?([Aa]lbum|[Aa]rtist|[Ff]ilename|[Tt]itle|[Aa]ny)"? '
@@ -186,14 +223,35 @@ def list_(context, field, mpd_query=None):
     """
     field = field.lower()
     query = _list_build_query(field, mpd_query)
-    if field == 'artist':
-        return _list_artist(context, query)
-    elif field == 'album':
-        return _list_album(context, query)
-    elif field == 'date':
-        return _list_date(context, query)
-    elif field == 'genre':
-        pass  # TODO We don't have genre in our internal data structures yet
+    future = _list_get_distinct(context, field, query)
+    if future is not None:
+        return _list_to_mpd_format(field, future.get())
+
+
+@handle_batch(list_)
+def list_batch(context, requests):
+    """
+    Runs the library lookups of consecutive ``list`` requests in a command
+    list concurrently.
+    """
+    fields_and_futures = []
+    error = None
+    for kwargs in requests:
+        field = kwargs['field'].lower()
+        try:
+            query = _list_build_query(field, kwargs.get('mpd_query'))
+        except MpdArgError as e:
+            error = e
+            break
+        fields_and_futures.append(
+            (field, _list_get_distinct(context, field, query)))
+    for (field, future) in fields_and_futures:
+        if future is not None:
+            yield _list_to_mpd_format(field, future.get())
+        else:
+            yield None
+    if error is not None:
+        raise error
 
 
 def _list_build_query(field, mpd_query):
@@ -233,47 +291,45 @@ def _list_build_query(field, mpd_query):
         raise MpdArgError('not able to parse args', command='list')
 
 
-def _list_artist(context, query):
-    artists = set()
-    playlist = context.core.library.find_exact(**query).get()
-    for track in playlist.tracks:
-        for artist in track.artists:
-            artists.add(('Artist', artist.name))
-    return artists
+# MPD tag names for the fields supported by list
+_LIST_TAGS = {
+    'album': 'Album',
+    'artist': 'Artist',
+    'date': 'Date',
+}
 
 
-def _list_album(context, query):
-    albums = set()
-    playlist = context.core.library.find_exact(**query).get()
-    for track in playlist.tracks:
-        if track.album is not None:
-            albums.add(('Album', track.album.name))
-    return albums
+def _list_get_distinct(context, field, query):
+    if field not in _LIST_TAGS:
+        return None  # TODO We don't have genre in our internal data structures
+    return context.core.library.get_distinct(field, **query)
 
 
-def _list_date(context, query):
-    dates = set()
-    playlist = context.core.library.find_exact(**query).get()
-    for track in playlist.tracks:
-        if track.date is not None:
-            dates.add(('Date', track.date))
-    return dates
+def _list_to_mpd_format(field, values):
+    return set((_LIST_TAGS[field], value) for value in values)
 
 
-@handle_request(r'^listall "(?P<uri>[^"]+)"')
-def listall(context, uri):
+@handle_request(r'^listall$')
+@handle_request(r'^listall "(?P<uri>[^"]*)"$')
+def listall(context, uri=None):
     """
     *musicpd.org, music database section:*
 
         ``listall [URI]``
 
         Lists all songs and directories in ``URI``.
+
+    *Mopidy:*
+
+    - Directories are listed by their URI, like the songs.
     """
-    raise MpdNotImplemented  # TODO
+    return _walk_to_mpd_format(
+        context, uri, 'listall', lambda track: ('file', track.uri))
 
 
-@handle_request(r'^listallinfo "(?P<uri>[^"]+)"')
-def listallinfo(context, uri):
+@handle_request(r'^listallinfo$')
+@handle_request(r'^listallinfo "(?P<uri>[^"]*)"$')
+def listallinfo(context, uri=None):
     """
     *musicpd.org, music database section:*
 
@@ -282,7 +338,25 @@ def listallinfo(context, uri):
         Same as ``listall``, except it also returns metadata info in the
         same format as ``lsinfo``.
     """
-    raise MpdNotImplemented  # TODO
+    return _walk_to_mpd_format(
+        context, uri, 'listallinfo', track_to_mpd_format)
+
+
+def _walk_to_mpd_format(context, uri, command, format_track):
+    if uri in ('', '/'):
+        uri = None
+    walk = context.core.library.walk(uri).get()
+    if walk is None:
+        raise MpdNoExistError('directory or file not found', command=command)
+    return _iter_walk_to_mpd_format(walk, format_track)
+
+
+def _iter_walk_to_mpd_format(walk, format_track):
+    for (i, (directory_uri, _, tracks)) in enumerate(walk):
+        if i > 0:
+            yield ('directory', directory_uri)
+        for track in tracks:
+            yield format_track(track)
 
 
 @handle_request(r'^lsinfo$')
@@ -302,10 +376,23 @@ def lsinfo(context, uri=None):
     MPD returns the same result, including both playlists and the files and
     directories located at the root level, for both ``lsinfo``, ``lsinfo
     ""``, and ``lsinfo "/"``.
+
+    *Mopidy:*
+
+    - Directories are listed by their URI, like the songs.
     """
     if uri is None or uri == '/' or uri == '':
-        return stored_playlists.listplaylists(context)
-    raise MpdNotImplemented  # TODO
+        result = stored_playlists.listplaylists(context)
+        uri = None
+    else:
+        result = []
+    entry = context.core.library.browse(uri).get()
+    if entry is None:
+        raise MpdNoExistError('directory or file not found', command='lsinfo')
+    (directories, tracks) = entry
+    result.extend(('directory', directory) for directory in directories)
+    result.extend(track_to_mpd_format(track) for track in tracks)
+    return result
 
 
 @handle_request(r'^rescan( "(?P<uri>[^"]+)")*$')
@@ -316,6 +403,11 @@ def rescan(context, uri=None):
         ``rescan [URI]``
 
         Same as ``update``, but also rescans unmodified files.
+
+    *Mopidy:*
+
+    - The backends do not know which files are unmodified, so this is the
+      same as ``update``.
     """
     return update(context, uri, rescan_unmodified_files=True)
 
@@ -356,6 +448,19 @@ def search(context, mpd_query):
         context.core.library.search(**query).get())
 
 
+@handle_batch(search)
+def search_batch(context, requests):
+    """
+    Runs the library searches of consecutive ``search`` requests in a command
+    list concurrently.
+    """
+    futures = [
+        context.core.library.search(**_build_query(kwargs['mpd_query']))
+        for kwargs in requests]
+    for result in pykka.get_all(futures):
+        yield playlist_to_mpd_format(result)
+
+
 @handle_request(r'^update( "(?P<uri>[^"]+)")*$')
 def update(context, uri=None, rescan_unmodified_files=False):
     """
@@ -372,5 +477,12 @@ def update(context, uri=None, rescan_unmodified_files=False):
         Prints ``updating_db: JOBID`` where ``JOBID`` is a positive number
         identifying the update job. You can read the current job id in the
         ``status`` response.
+
+    *Mopidy:*
+
+    - The library is refreshed in the background, and keeps serving
+      requests from the old library until the update is done.
+    - ``URI`` may also be a path relative to the music directory, like MPD
+      clients send. Each backend resolves it in its own library.
     """
-    return {'updating_db': 0}  # TODO
+    return {'updating_db': context.core.library.update(uri).get()}
@@ -1,7 +1,5 @@
 from __future__ import unicode_literals
 
-import pykka
-
 from mopidy.core import PlaybackState
 from mopidy.frontends.mpd.exceptions import MpdNotImplemented
 from mopidy.frontends.mpd.protocol import handle_request
@@ -36,10 +34,11 @@ def currentsong(context):
         Displays the song info of the current song (same song that is
         identified in status).
     """
-    current_tl_track = context.core.playback.current_tl_track.get()
-    if current_tl_track is not None:
-        position = context.core.playback.tracklist_position.get()
-        return track_to_mpd_format(current_tl_track, position=position)
+    playback_status = context.core.playback.get_status().get()
+    if playback_status.current_tl_track is not None:
+        return track_to_mpd_format(
+            playback_status.current_tl_track,
+            position=playback_status.tracklist_position)
 
 
 @handle_request(r'^idle$')
@@ -126,13 +125,14 @@ def stats(context):
         - ``db_update``: last db update in UNIX time
         - ``playtime``: time length of music played
     """
+    library_stats = context.core.library.get_stats().get()
     return {
-        'artists': 0,  # TODO
-        'albums': 0,  # TODO
-        'songs': 0,  # TODO
+        'artists': library_stats.artists,
+        'albums': library_stats.albums,
+        'songs': library_stats.songs,
         'uptime': 0,  # TODO
-        'db_playtime': 0,  # TODO
-        'db_update': 0,  # TODO
+        'db_playtime': library_stats.playtime // 1000,
+        'db_update': int(library_stats.last_update or 0),
         'playtime': 0,  # TODO
     }
 
@@ -174,90 +174,83 @@ def status(context):
         - ``elapsed``: Higher resolution means time in seconds with three
           decimal places for millisecond precision.
     """
-    futures = {
-        'tracklist.length': context.core.tracklist.length,
-        'tracklist.version': context.core.tracklist.version,
-        'playback.volume': context.core.playback.volume,
-        'playback.consume': context.core.playback.consume,
-        'playback.random': context.core.playback.random,
-        'playback.repeat': context.core.playback.repeat,
-        'playback.single': context.core.playback.single,
-        'playback.state': context.core.playback.state,
-        'playback.current_tl_track': context.core.playback.current_tl_track,
-        'playback.tracklist_position': (
-            context.core.playback.tracklist_position),
-        'playback.time_position': context.core.playback.time_position,
-    }
-    pykka.get_all(futures.values())
+    updating = context.core.library.updating
+    # The mixer may change the volume without telling the core, so it is not
+    # part of the playback status snapshot.
+    volume = context.core.playback.volume
+    playback_status = context.core.playback.get_status().get()
     result = [
-        ('volume', _status_volume(futures)),
-        ('repeat', _status_repeat(futures)),
-        ('random', _status_random(futures)),
-        ('single', _status_single(futures)),
-        ('consume', _status_consume(futures)),
-        ('playlist', _status_playlist_version(futures)),
-        ('playlistlength', _status_playlist_length(futures)),
-        ('xfade', _status_xfade(futures)),
-        ('state', _status_state(futures)),
+        ('volume', _status_volume(volume.get())),
+        ('repeat', _status_repeat(playback_status)),
+        ('random', _status_random(playback_status)),
+        ('single', _status_single(playback_status)),
+        ('consume', _status_consume(playback_status)),
+        ('playlist', _status_playlist_version(playback_status)),
+        ('playlistlength', _status_playlist_length(playback_status)),
+        ('xfade', _status_xfade(playback_status)),
+        ('state', _status_state(playback_status)),
     ]
-    if futures['playback.current_tl_track'].get() is not None:
-        result.append(('song', _status_songpos(futures)))
-        result.append(('songid', _status_songid(futures)))
-    if futures['playback.state'].get() in (
-            PlaybackState.PLAYING, PlaybackState.PAUSED):
-        result.append(('time', _status_time(futures)))
-        result.append(('elapsed', _status_time_elapsed(futures)))
-        result.append(('bitrate', _status_bitrate(futures)))
+    if playback_status.current_tl_track is not None:
+        result.append(('song', _status_songpos(playback_status)))
+        result.append(('songid', _status_songid(playback_status)))
+    if playback_status.state in (PlaybackState.PLAYING, PlaybackState.PAUSED):
+        time_position = playback_status.get_time_position()
+        result.append(('time', _status_time(playback_status, time_position)))
+        result.append(('elapsed', _status_time_elapsed(time_position)))
+        result.append(('bitrate', _status_bitrate(playback_status)))
+    updating = updating.get()
+    if updating is not None:
+        result.append(('updating_db', updating))
     return result
 
 
-def _status_bitrate(futures):
-    current_tl_track = futures['playback.current_tl_track'].get()
+def _status_bitrate(playback_status):
+    current_tl_track = playback_status.current_tl_track
     if current_tl_track is not None:
         return current_tl_track.track.bitrate
 
 
-def _status_consume(futures):
-    if futures['playback.consume'].get():
+def _status_consume(playback_status):
+    if playback_status.consume:
         return 1
     else:
         return 0
 
 
-def _status_playlist_length(futures):
-    return futures['tracklist.length'].get()
+def _status_playlist_length(playback_status):
+    return playback_status.tracklist_length
 
 
-def _status_playlist_version(futures):
-    return futures['tracklist.version'].get()
+def _status_playlist_version(playback_status):
+    return playback_status.tracklist_version
 
 
-def _status_random(futures):
-    return int(futures['playback.random'].get())
+def _status_random(playback_status):
+    return int(playback_status.random)
 
 
-def _status_repeat(futures):
-    return int(futures['playback.repeat'].get())
+def _status_repeat(playback_status):
+    return int(playback_status.repeat)
 
 
-def _status_single(futures):
-    return int(futures['playback.single'].get())
+def _status_single(playback_status):
+    return int(playback_status.single)
 
 
-def _status_songid(futures):
-    current_tl_track = futures['playback.current_tl_track'].get()
+def _status_songid(playback_status):
+    current_tl_track = playback_status.current_tl_track
     if current_tl_track is not None:
         return current_tl_track.tlid
     else:
-        return _status_songpos(futures)
+        return _status_songpos(playback_status)
 
 
-def _status_songpos(futures):
-    return futures['playback.tracklist_position'].get()
+def _status_songpos(playback_status):
+    return playback_status.tracklist_position
 
 
-def _status_state(futures):
-    state = futures['playback.state'].get()
+def _status_state(playback_status):
+    state = playback_status.state
     if state == PlaybackState.PLAYING:
         return 'play'
     elif state == PlaybackState.STOPPED:
@@ -266,18 +259,17 @@ def _status_state(futures):
         return 'pause'
 
 
-def _status_time(futures):
+def _status_time(playback_status, time_position):
     return '%d:%d' % (
-        futures['playback.time_position'].get() // 1000,
-        _status_time_total(futures) // 1000)
+        time_position // 1000, _status_time_total(playback_status) // 1000)
 
 
-def _status_time_elapsed(futures):
-    return '%.3f' % (futures['playback.time_position'].get() / 1000.0)
+def _status_time_elapsed(time_position):
+    return '%.3f' % (time_position / 1000.0)
 
 
-def _status_time_total(futures):
-    current_tl_track = futures['playback.current_tl_track'].get()
+def _status_time_total(playback_status):
+    current_tl_track = playback_status.current_tl_track
     if current_tl_track is None:
         return 0
     elif current_tl_track.track.length is None:
@@ -286,13 +278,12 @@ def _status_time_total(futures):
         return current_tl_track.track.length
 
 
-def _status_volume(futures):
-    volume = futures['playback.volume'].get()
+def _status_volume(volume):
     if volume is not None:
         return volume
     else:
         return -1
 
 
-def _status_xfade(futures):
+def _status_xfade(playback_status):
     return 0  # Not supported
@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 import datetime as dt
 
 from mopidy.frontends.mpd.exceptions import MpdNoExistError, MpdNotImplemented
-from mopidy.frontends.mpd.protocol import handle_request
+from mopidy.frontends.mpd.protocol import handle_batch, handle_request
 from mopidy.frontends.mpd.translator import playlist_to_mpd_format
 
 
@@ -30,6 +30,23 @@ def listplaylist(context, name):
         raise MpdNoExistError('No such playlist', command='listplaylist')
 
 
+@handle_batch(listplaylist)
+def listplaylist_batch(context, requests):
+    """
+    Looks up the playlists of consecutive ``listplaylist`` requests in a
+    command list concurrently.
+    """
+    futures = [
+        context.core.playlists.get(name=kwargs['name'])
+        for kwargs in requests]
+    for future in futures:
+        try:
+            playlist = future.get()
+        except LookupError:
+            raise MpdNoExistError('No such playlist', command='listplaylist')
+        yield ['file: %s' % t.uri for t in playlist.tracks]
+
+
 @handle_request(r'^listplaylistinfo (?P<name>\S+)$')
 @handle_request(r'^listplaylistinfo "(?P<name>[^"]+)"$')
 def listplaylistinfo(context, name):
@@ -52,6 +69,24 @@ def listplaylistinfo(context, name):
         raise MpdNoExistError('No such playlist', command='listplaylistinfo')
 
 
+@handle_batch(listplaylistinfo)
+def listplaylistinfo_batch(context, requests):
+    """
+    Looks up the playlists of consecutive ``listplaylistinfo`` requests in a
+    command list concurrently.
+    """
+    futures = [
+        context.core.playlists.get(name=kwargs['name'])
+        for kwargs in requests]
+    for future in futures:
+        try:
+            playlist = future.get()
+        except LookupError:
+            raise MpdNoExistError(
+                'No such playlist', command='listplaylistinfo')
+        yield playlist_to_mpd_format(playlist)
+
+
 @handle_request(r'^listplaylists$')
 def listplaylists(context):
     """
@@ -33,9 +33,12 @@ class MpdSession(network.LineProtocol):
         if not response:
             return
 
-        logger.debug(
-            'Response to [%s]:%s: %s', self.host, self.port,
-            formatting.indent(self.terminator.join(response)))
+        if logger.isEnabledFor(logging.DEBUG):
+            # Logging the response means holding all of it at once
+            response = list(response)
+            logger.debug(
+                'Response to [%s]:%s: %s', self.host, self.port,
+                formatting.indent(self.terminator.join(response)))
 
         self.send_lines(response)
 
@@ -5,10 +5,69 @@ import re
 
 from mopidy import settings
 from mopidy.frontends.mpd import protocol
-from mopidy.models import TlTrack
+from mopidy.models import TlTrack, Track
 from mopidy.utils.path import mtime as get_mtime, uri_to_path, split_path
 
 
+#: Maximum number of tracks to keep formatted in :data:`track_cache`.
+TRACK_CACHE_SIZE = 10000
+
+
+class TrackCache(object):
+    """
+    Cache of the formatted tags of recently formatted tracks.
+
+    The cache approximates least recently used eviction with two
+    generations of at most half of the tracks each, so that lookups are
+    plain dict lookups. Tracks are added to the recent generation. When it is
+    full, it replaces the old generation, evicting the tracks in there. Tracks
+    found in the old generation are moved back to the recent one if there is
+    room for them.
+
+    The cache is shared by all MPD sessions without locking. Concurrent
+    updates may lose an entry, which only costs formatting the track again.
+
+    :param size: maximum number of tracks to keep
+    :type size: int
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._recent = {}
+        self._old = {}
+
+    def __len__(self):
+        return len(self._recent) + len(self._old)
+
+    def get(self, track):
+        value = self._recent.get(track)
+        if value is None:
+            value = self._old.get(track)
+            if value is not None and not self._recent_is_full():
+                self._old.pop(track, None)
+                self._recent[track] = value
+        return value
+
+    def set(self, track, value):
+        self._old.pop(track, None)
+        if self._recent_is_full():
+            self._old = self._recent
+            self._recent = {}
+        self._recent[track] = value
+
+    def clear(self):
+        self._recent = {}
+        self._old = {}
+
+    def _recent_is_full(self):
+        return len(self._recent) >= max(self.size // 2, 1)
+
+
+#: The cache used by :func:`track_to_mpd_format`. As tracks are immutable,
+#: entries never have to be invalidated.
+track_cache = TrackCache(TRACK_CACHE_SIZE)
+
+
 def track_to_mpd_format(track, position=None):
     """
     Format track for output to MPD client.
@@ -27,7 +86,27 @@ def track_to_mpd_format(track, position=None):
         (tlid, track) = track
     else:
         (tlid, track) = (None, track)
-    result = [
+    if type(track) is Track:
+        formatted = track_cache.get(track)
+        if formatted is None:
+            formatted = _format_track(track)
+            track_cache.set(track, formatted)
+    else:
+        # Subclasses, like the proxies for Spotify tracks that are still
+        # loading, may change their tags, so they can't be cached.
+        formatted = _format_track(track)
+    (head, tail) = formatted
+    result = list(head)
+    if position is not None and tlid is not None:
+        result.append(('Pos', position))
+        result.append(('Id', tlid))
+    result.extend(tail)
+    return result
+
+
+def _format_track(track):
+    # Returns the tags that go before and after the optional Pos and Id
+    head = [
         ('file', track.uri or ''),
         ('Time', track.length and (track.length // 1000) or 0),
         ('Artist', artists_to_mpd_format(track.artists)),
@@ -36,33 +115,31 @@ def track_to_mpd_format(track, position=None):
         ('Date', track.date or ''),
     ]
     if track.album is not None and track.album.num_tracks != 0:
-        result.append(('Track', '%d/%d' % (
+        head.append(('Track', '%d/%d' % (
             track.track_no, track.album.num_tracks)))
     else:
-        result.append(('Track', track.track_no))
+        head.append(('Track', track.track_no))
     if track.album is not None and track.album.artists:
         artists = artists_to_mpd_format(track.album.artists)
-        result.append(('AlbumArtist', artists))
-    if position is not None and tlid is not None:
-        result.append(('Pos', position))
-        result.append(('Id', tlid))
+        head.append(('AlbumArtist', artists))
+    tail = []
     if track.album is not None and track.album.musicbrainz_id is not None:
-        result.append(('MUSICBRAINZ_ALBUMID', track.album.musicbrainz_id))
+        tail.append(('MUSICBRAINZ_ALBUMID', track.album.musicbrainz_id))
     # FIXME don't use first and best artist?
     # FIXME don't duplicate following code?
     if track.album is not None and track.album.artists:
         artists = filter(
             lambda a: a.musicbrainz_id is not None, track.album.artists)
         if artists:
-            result.append(
+            tail.append(
                 ('MUSICBRAINZ_ALBUMARTISTID', artists[0].musicbrainz_id))
     if track.artists:
         artists = filter(lambda a: a.musicbrainz_id is not None, track.artists)
         if artists:
-            result.append(('MUSICBRAINZ_ARTISTID', artists[0].musicbrainz_id))
+            tail.append(('MUSICBRAINZ_ARTISTID', artists[0].musicbrainz_id))
     if track.musicbrainz_id is not None:
-        result.append(('MUSICBRAINZ_TRACKID', track.musicbrainz_id))
-    return result
+        tail.append(('MUSICBRAINZ_TRACKID', track.musicbrainz_id))
+    return (tuple(head), tuple(tail))
 
 
 MPD_KEY_ORDER = '''
@@ -113,15 +190,22 @@ def tracks_to_mpd_format(tracks, start=0, end=None):
     :type end: int (positive or negative) or :class:`None` for end of list
     :rtype: list of lists of two-tuples
     """
+    return list(iter_tracks_to_mpd_format(tracks, start, end))
+
+
+def iter_tracks_to_mpd_format(tracks, start=0, end=None):
+    """
+    Like :func:`tracks_to_mpd_format`, but returns a generator, so that the
+    tracks are formatted one at a time while the response is being built.
+
+    :rtype: generator of lists of two-tuples
+    """
     if end is None:
         end = len(tracks)
     tracks = tracks[start:end]
-    positions = range(start, end)
-    assert len(tracks) == len(positions)
-    result = []
-    for track, position in zip(tracks, positions):
-        result.append(track_to_mpd_format(track, position))
-    return result
+    assert len(tracks) == len(xrange(start, end))
+    for position, track in enumerate(tracks, start):
+        yield track_to_mpd_format(track, position)
 
 
 def playlist_to_mpd_format(playlist, *args, **kwargs):
@@ -1,5 +1,40 @@
 from __future__ import unicode_literals
 
+import operator
+
+
+class ImmutableObjectMeta(type):
+    """
+    Metaclass for :class:`ImmutableObject`.
+
+    Turns the public class attributes of a model into ``__slots__``, and keeps
+    the attribute values as the field defaults. This way model instances have
+    no per-instance ``__dict__``, while the fields are still documented as
+    class attributes.
+    """
+
+    def __new__(mcs, name, bases, attrs):
+        fields = dict(
+            (key, value) for (key, value) in attrs.items()
+            if not key.startswith('_') and not callable(value)
+            and not isinstance(value, (property, classmethod, staticmethod)))
+        if fields and '__slots__' not in attrs:
+            for key in fields:
+                del attrs[key]
+            attrs['__slots__'] = tuple(fields)
+
+        cls = super(ImmutableObjectMeta, mcs).__new__(mcs, name, bases, attrs)
+
+        defaults = {}
+        for base in reversed(cls.__mro__[1:]):
+            defaults.update(getattr(base, '_defaults', {}))
+        defaults.update(fields)
+        cls._defaults = defaults
+        cls._fields = tuple(sorted(defaults))
+        if len(cls._fields) > 1:
+            cls._get_values = staticmethod(operator.attrgetter(*cls._fields))
+        return cls
+
 
 class ImmutableObject(object):
     """
@@ -10,24 +45,41 @@ class ImmutableObject(object):
     :type kwargs: any
     """
 
+    __metaclass__ = ImmutableObjectMeta
+    __slots__ = ('_hash',)
+
     def __init__(self, *args, **kwargs):
-        for key, value in kwargs.items():
-            if not hasattr(self, key):
-                raise TypeError(
-                    '__init__() got an unexpected keyword argument "%s"' %
-                    key)
-            self.__dict__[key] = value
+        set_field = object.__setattr__
+        for key, default in self._defaults.iteritems():
+            set_field(self, key, kwargs.pop(key, default))
+        if kwargs:
+            raise TypeError(
+                '__init__() got an unexpected keyword argument "%s"' %
+                kwargs.keys()[0])
+        object.__setattr__(self, '_hash', None)
 
     def __setattr__(self, name, value):
         if name.startswith('_'):
             return super(ImmutableObject, self).__setattr__(name, value)
         raise AttributeError('Object is immutable.')
 
+    def __getstate__(self):
+        return self._get_values(self)
+
+    def __setstate__(self, state):
+        for key, value in zip(self._fields, state):
+            object.__setattr__(self, key, value)
+        object.__setattr__(self, '_hash', None)
+
     def __repr__(self):
         kwarg_pairs = []
-        for (key, value) in sorted(self.__dict__.items()):
-            if isinstance(value, (frozenset, tuple)):
+        for key in self._fields:
+            value = getattr(self, key)
+            default = self._defaults[key]
+            if isinstance(default, (frozenset, tuple)):
                 value = list(value)
+            elif value == default:
+                continue
             kwarg_pairs.append('%s=%s' % (key, repr(value)))
         return '%(classname)s(%(kwargs)s)' % {
             'classname': self.__class__.__name__,
@@ -35,20 +87,27 @@ class ImmutableObject(object):
         }
 
     def __hash__(self):
-        hash_sum = 0
-        for key, value in self.__dict__.items():
-            hash_sum += hash(key) + hash(value)
-        return hash_sum
+        if self._hash is None:
+            self._hash = hash(self._get_values(self))
+        return self._hash
 
     def __eq__(self, other):
+        if self is other:
+            return True
+
         if not isinstance(other, self.__class__):
             return False
 
-        return self.__dict__ == other.__dict__
+        return self._get_values(self) == self._get_values(other)
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    @classmethod
+    def _get_values(cls, obj):
+        # Replaced with a faster operator.attrgetter() by the metaclass.
+        return tuple(getattr(obj, key) for key in cls._fields)
+
     def copy(self, **values):
         """
         Copy the model with ``field`` updated to new value.
@@ -65,28 +124,26 @@ class ImmutableObject(object):
         :rtype: new instance of the model being copied
         """
         data = {}
-        for key in self.__dict__.keys():
-            public_key = key.lstrip('_')
-            data[public_key] = values.pop(public_key, self.__dict__[key])
-        for key in values.keys():
-            if hasattr(self, key):
-                data[key] = values.pop(key)
+        for key in self._fields:
+            data[key] = values.pop(key, getattr(self, key))
         if values:
             raise TypeError(
-                'copy() got an unexpected keyword argument "%s"' % key)
+                'copy() got an unexpected keyword argument "%s"' %
+                values.keys()[0])
         return self.__class__(**data)
 
     def serialize(self):
         data = {}
-        for key in self.__dict__.keys():
-            public_key = key.lstrip('_')
-            value = self.__dict__[key]
+        for key in self._fields:
+            value = getattr(self, key)
             if isinstance(value, (set, frozenset, list, tuple)):
-                value = [o.serialize() for o in value]
+                value = [
+                    o.serialize() if isinstance(o, ImmutableObject) else o
+                    for o in value]
             elif isinstance(value, ImmutableObject):
                 value = value.serialize()
             if value:
-                data[public_key] = value
+                data[key] = value
         return data
 
 
@@ -145,7 +202,7 @@ class Album(ImmutableObject):
     musicbrainz_id = None
 
     def __init__(self, *args, **kwargs):
-        self.__dict__['artists'] = frozenset(kwargs.pop('artists', []))
+        kwargs['artists'] = frozenset(kwargs.pop('artists', []))
         super(Album, self).__init__(*args, **kwargs)
 
 
@@ -199,7 +256,7 @@ class Track(ImmutableObject):
     musicbrainz_id = None
 
     def __init__(self, *args, **kwargs):
-        self.__dict__['artists'] = frozenset(kwargs.pop('artists', []))
+        kwargs['artists'] = frozenset(kwargs.pop('artists', []))
         super(Track, self).__init__(*args, **kwargs)
 
 
@@ -268,7 +325,7 @@ class Playlist(ImmutableObject):
     last_modified = None
 
     def __init__(self, *args, **kwargs):
-        self.__dict__['tracks'] = tuple(kwargs.pop('tracks', []))
+        kwargs['tracks'] = tuple(kwargs.pop('tracks', []))
         super(Playlist, self).__init__(*args, **kwargs)
 
     # TODO: def insert(self, pos, track): ... ?
@@ -277,3 +334,85 @@ class Playlist(ImmutableObject):
     def length(self):
         """The number of tracks in the playlist. Read-only."""
         return len(self.tracks)
+
+
+class SearchResult(Playlist):
+    """
+    The tracks found by a library search, and the backends that did not
+    answer in time.
+
+    :param tracks: the tracks found
+    :type tracks: list of :class:`Track` elements
+    :param timed_out: URI schemes of the backends that did not answer in time
+    :type timed_out: list of strings
+    """
+
+    #: The URI schemes of the backends that did not answer in time, and whose
+    #: tracks are left out of the result. Read-only.
+    timed_out = tuple()
+
+    def __init__(self, *args, **kwargs):
+        kwargs['timed_out'] = tuple(kwargs.pop('timed_out', []))
+        super(SearchResult, self).__init__(*args, **kwargs)
+
+
+class LibraryStats(ImmutableObject):
+    """
+    Aggregates over the tracks in a library.
+
+    :param artists: number of distinct artist names
+    :type artists: int
+    :param albums: number of distinct album names
+    :type albums: int
+    :param songs: number of tracks
+    :type songs: int
+    :param playtime: total length of the tracks in milliseconds
+    :type playtime: int
+    :param last_update: time the library was last updated, in seconds since
+        the epoch
+    :type last_update: float or :class:`None`
+    """
+
+    #: The number of distinct artist names. Read-only.
+    artists = 0
+
+    #: The number of distinct album names. Read-only.
+    albums = 0
+
+    #: The number of tracks. Read-only.
+    songs = 0
+
+    #: The total length of the tracks in milliseconds. Read-only.
+    playtime = 0
+
+    #: The time the library was last updated, in seconds since the epoch, or
+    #: :class:`None` if unknown. Read-only.
+    last_update = None
+
+
+class ModelInterner(object):
+    """
+    Table of model instances used to share a single instance between all
+    equal models, e.g. the same :class:`Album` for all tracks on the album.
+
+    Since models are immutable, equal instances are interchangeable. Sharing
+    them saves memory when loading large libraries, and makes later
+    comparisons between them cheap, as identical objects are equal.
+    """
+
+    def __init__(self):
+        self._instances = {}
+
+    def __len__(self):
+        return len(self._instances)
+
+    def intern(self, model):
+        """
+        Get the shared instance equal to the given model, adding the model to
+        the table if no such instance exists.
+
+        :param model: the model to intern
+        :type model: :class:`ImmutableObject`
+        :rtype: :class:`ImmutableObject`
+        """
+        return self._instances.setdefault(model, model)
@@ -1,7 +1,12 @@
 from __future__ import unicode_literals
 
+import cPickle as pickle
 import logging
 import datetime
+import multiprocessing
+import optparse
+import os
+import sys
 
 import gobject
 gobject.threads_init()
@@ -11,31 +16,71 @@ pygst.require('0.10')
 import gst
 
 from mopidy import settings
+from mopidy.backends.local.translator import iter_mpd_tag_cache_mtimes
 from mopidy.frontends.mpd import translator as mpd_translator
-from mopidy.models import Track, Artist, Album
+from mopidy.models import Track, Artist, Album, ModelInterner
 from mopidy.utils import log, path
+from mopidy.utils.encoding import locale_decode
 
 
 def main():
+    options = parse_options()
+
     log.setup_root_logger()
     log.setup_console_logging(2)
 
-    tracks = []
+    interner = ModelInterner()
+    checkpoint = Checkpoint(
+        path.expand_path(options.checkpoint), settings.LOCAL_MUSIC_PATH)
+    tracks = checkpoint.load()
+    if tracks:
+        logging.info(
+            'Resuming scan with %d tracks already scanned', len(tracks))
+    checkpoint.open()
+
+    exclude = set(t.uri for t in tracks)
+    sizes_file = path.expand_path(options.file_sizes)
+    if options.update:
+        previous = dict(
+            (track.uri, (track, mtime)) for (track, mtime)
+            in iter_mpd_tag_cache_mtimes(
+                path.expand_path(options.update), settings.LOCAL_MUSIC_PATH))
+        unchanged = [
+            track for track in find_unchanged_tracks(
+                settings.LOCAL_MUSIC_PATH, previous,
+                load_file_sizes(sizes_file))
+            if track.uri not in exclude]
+        logging.info(
+            'Reusing %d unchanged tracks from %s, dropping %d changed or '
+            'removed tracks', len(unchanged), options.update,
+            len(previous) - len(unchanged))
+        tracks.extend(unchanged)
+        exclude.update(t.uri for t in unchanged)
 
     def store(data):
-        track = translator(data)
+        track = translator(data, interner)
         tracks.append(track)
+        checkpoint.add(track)
         logging.debug('Added %s', track.uri)
 
     def debug(uri, error, debug):
         logging.error('Failed %s: %s - %s', uri, error, debug)
 
-    logging.info('Scanning %s', settings.LOCAL_MUSIC_PATH)
-    scanner = Scanner(settings.LOCAL_MUSIC_PATH, store, debug)
+    logging.info(
+        'Scanning %s using %d workers',
+        settings.LOCAL_MUSIC_PATH, options.workers)
+    scanner = Scanner(
+        settings.LOCAL_MUSIC_PATH, store, debug, workers=options.workers,
+        exclude=exclude)
     try:
         scanner.start()
     except KeyboardInterrupt:
         scanner.stop()
+    checkpoint.close()
+
+    if not scanner.done:
+        logging.info('Scan interrupted, run again to resume it')
+        sys.exit(1)
 
     logging.info('Done')
 
@@ -45,8 +90,41 @@ def main():
         else:
             print ('%s: %s' % row).encode('utf-8')
 
+    save_file_sizes(sizes_file, tracks)
+    checkpoint.remove()
+
+
+def parse_options():
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-w', '--workers',
+        type='int', dest='workers', default=multiprocessing.cpu_count(),
+        help='number of files to scan in parallel (default: %default)')
+    parser.add_option(
+        '--checkpoint',
+        dest='checkpoint', default='$XDG_CACHE_DIR/mopidy/scan_checkpoint',
+        help='file to record progress in, so that an interrupted scan can be '
+        'resumed (default: %default)')
+    parser.add_option(
+        '-u', '--update',
+        dest='update', metavar='TAG_CACHE',
+        help='only scan files that are new or changed since TAG_CACHE was '
+        'made, reusing the tags of the other files from it')
+    parser.add_option(
+        '--file-sizes',
+        dest='file_sizes', default='$XDG_CACHE_DIR/mopidy/scan_file_sizes',
+        help='file to record the sizes of the scanned files in, used with '
+        '--update to find changed files (default: %default)')
+    options = parser.parse_args()[0]
+    if options.workers < 1:
+        parser.error('the number of workers must be at least 1')
+    return options
+
+
+def translator(data, interner=None):
+    if interner is None:
+        interner = ModelInterner()
 
-def translator(data):
     albumartist_kwargs = {}
     album_kwargs = {}
     artist_kwargs = {}
@@ -77,23 +155,249 @@ def translator(data):
         'musicbrainz-albumartistid', 'musicbrainz_id', albumartist_kwargs)
 
     if albumartist_kwargs:
-        album_kwargs['artists'] = [Artist(**albumartist_kwargs)]
+        album_kwargs['artists'] = [
+            interner.intern(Artist(**albumartist_kwargs))]
 
     track_kwargs['uri'] = data['uri']
     track_kwargs['length'] = data[gst.TAG_DURATION]
-    track_kwargs['album'] = Album(**album_kwargs)
-    track_kwargs['artists'] = [Artist(**artist_kwargs)]
+    track_kwargs['album'] = interner.intern(Album(**album_kwargs))
+    track_kwargs['artists'] = [interner.intern(Artist(**artist_kwargs))]
 
     return Track(**track_kwargs)
 
 
+def find_unchanged_tracks(folder, previous, sizes=None):
+    """
+    Get the tracks of the files in a folder that are unchanged since they were
+    last scanned. Files are considered changed if their modification time or
+    size differ from when they were scanned.
+
+    :param folder: the folder to look for files in
+    :type folder: string
+    :param previous: tracks and modification times of the files as they were
+        scanned, keyed on URI
+    :type previous: dict of string to two-tuples of
+        :class:`mopidy.models.Track` and int
+    :param sizes: sizes of the files as they were scanned, keyed on URI
+    :type sizes: dict of string to int
+    :rtype: list of :class:`mopidy.models.Track`
+    """
+    sizes = sizes or {}
+    unchanged = []
+    for filename in path.find_files(folder):
+        uri = path.path_to_uri(filename)
+        if uri not in previous:
+            continue
+        track, mtime = previous[uri]
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            continue
+        if mtime != int(stat.st_mtime):
+            continue
+        if sizes.get(uri, stat.st_size) != stat.st_size:
+            continue
+        unchanged.append(track)
+    return unchanged
+
+
+def load_file_sizes(filename):
+    """
+    Get the file sizes recorded by :func:`save_file_sizes`.
+
+    :rtype: dict of string to int
+    """
+    try:
+        with open(filename, 'rb') as sizes_file:
+            return pickle.load(sizes_file)
+    except IOError:
+        return {}
+    except Exception as error:
+        logging.warning(
+            'Could not read file sizes from %s: %s',
+            filename, locale_decode(error))
+        return {}
+
+
+def save_file_sizes(filename, tracks):
+    """Record the sizes of the files of the given tracks, keyed on URI."""
+    sizes = {}
+    for track in tracks:
+        try:
+            sizes[track.uri] = os.path.getsize(path.uri_to_path(track.uri))
+        except OSError:
+            pass
+
+    temp_file = filename + '.tmp'
+    try:
+        path.get_or_create_folder(os.path.dirname(filename))
+        with open(temp_file, 'wb') as sizes_file:
+            pickle.dump(sizes, sizes_file, pickle.HIGHEST_PROTOCOL)
+        os.rename(temp_file, filename)
+    except (IOError, OSError) as error:
+        logging.warning(
+            'Could not write file sizes to %s: %s',
+            filename, locale_decode(error))
+
+
+#: Version of the checkpoint file format.
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint(object):
+    """
+    Append only record of the tracks found by a scan, so that an interrupted
+    scan can be resumed without scanning the same files again.
+
+    :param filename: the checkpoint file
+    :type filename: string
+    :param folder: the folder being scanned, recorded so that a checkpoint
+        from a scan of another folder is not used
+    :type folder: string
+    """
+
+    def __init__(self, filename, folder):
+        self.filename = filename
+        self.folder = folder
+        self._file = None
+        self._resume = False
+
+    def load(self):
+        """
+        Get the tracks recorded by a previous, interrupted scan of the folder.
+
+        :rtype: list of :class:`mopidy.models.Track`
+        """
+        tracks = []
+        try:
+            with open(self.filename, 'rb') as checkpoint:
+                if pickle.load(checkpoint) != (
+                        CHECKPOINT_VERSION, self.folder):
+                    return tracks
+                self._resume = True
+                while True:
+                    tracks.append(pickle.load(checkpoint))
+        except IOError:
+            pass
+        except EOFError:
+            pass
+        except Exception as error:
+            # The last track may have been partially written when the scan
+            # was interrupted, so keep the tracks read until then.
+            logging.debug(
+                'Stopped reading checkpoint %s: %s',
+                self.filename, locale_decode(error))
+        return tracks
+
+    def open(self):
+        """
+        Open the checkpoint for recording tracks, continuing the previous
+        checkpoint if :meth:`load` found it usable.
+        """
+        try:
+            path.get_or_create_folder(os.path.dirname(self.filename))
+            if self._resume:
+                self._file = open(self.filename, 'ab')
+            else:
+                self._file = open(self.filename, 'wb')
+                pickle.dump(
+                    (CHECKPOINT_VERSION, self.folder), self._file,
+                    pickle.HIGHEST_PROTOCOL)
+                self._file.flush()
+        except (IOError, OSError) as error:
+            logging.warning(
+                'Could not open checkpoint %s, the scan can not be resumed '
+                'if interrupted: %s', self.filename, locale_decode(error))
+            self._file = None
+
+    def add(self, track):
+        """Record a scanned track."""
+        if self._file is None:
+            return
+        pickle.dump(track, self._file, pickle.HIGHEST_PROTOCOL)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Remove the checkpoint after the scan has completed."""
+        self.close()
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
+
+
 class Scanner(object):
-    def __init__(self, folder, data_callback, error_callback=None):
-        self.data = {}
+    """
+    Scans the files in a folder for tags and durations, using one GStreamer
+    pipeline per worker, so that several files are scanned in parallel.
+
+    :param folder: the folder to scan
+    :type folder: string
+    :param data_callback: called with the data of each scanned file
+    :type data_callback: callable
+    :param error_callback: called with the URI, error and debug message of
+        each file that could not be scanned
+    :type error_callback: callable
+    :param workers: number of files to scan in parallel
+    :type workers: int
+    :param exclude: URIs of files to skip
+    :type exclude: set of strings
+    """
+
+    def __init__(self, folder, data_callback, error_callback=None,
+                 workers=1, exclude=None):
         self.files = path.find_files(folder)
         self.data_callback = data_callback
         self.error_callback = error_callback
+        self.exclude = exclude or set()
         self.loop = gobject.MainLoop()
+        self.done = False
+
+        self.pipelines = [ScanPipeline(self) for _ in range(max(workers, 1))]
+        self._active = set()
+
+    def next_uri(self):
+        """Get the URI of the next file to scan, or :class:`None`."""
+        for filename in self.files:
+            uri = path.path_to_uri(filename)
+            if uri not in self.exclude:
+                return uri
+        return None
+
+    def pipeline_done(self, pipeline):
+        self._active.discard(pipeline)
+        if not self._active:
+            self.done = True
+            self.loop.quit()
+
+    def start(self):
+        for pipeline in self.pipelines:
+            if pipeline.next_uri():
+                self._active.add(pipeline)
+        if self._active:
+            self.loop.run()
+        else:
+            self.done = True
+
+    def stop(self):
+        for pipeline in self.pipelines:
+            pipeline.stop()
+        self.loop.quit()
+
+
+class ScanPipeline(object):
+    """
+    GStreamer pipeline scanning one file at a time for a :class:`Scanner`.
+    """
+
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.data = {}
 
         self.fakesink = gst.element_factory_make('fakesink')
         self.fakesink.set_property('signal-handoffs', True)
@@ -137,10 +441,10 @@ class Scanner(object):
         self.data[gst.TAG_DURATION] = self.get_duration()
 
         try:
-            self.data_callback(self.data)
+            self.scanner.data_callback(self.data)
             self.next_uri()
         except KeyboardInterrupt:
-            self.stop()
+            self.scanner.stop()
 
     def process_tags(self, bus, message):
         taglist = message.parse_tag()
@@ -155,10 +459,10 @@ class Scanner(object):
                 self.data[key] = taglist[key]
 
     def process_error(self, bus, message):
-        if self.error_callback:
+        if self.scanner.error_callback:
             uri = self.uribin.get_property('uri')
             error, debug = message.parse_error()
-            self.error_callback(uri, error, debug)
+            self.scanner.error_callback(uri, error, debug)
         self.next_uri()
 
     def get_duration(self):
@@ -171,20 +475,14 @@ class Scanner(object):
 
     def next_uri(self):
         self.data = {}
-        try:
-            uri = path.path_to_uri(self.files.next())
-        except StopIteration:
-            self.stop()
-            return False
+        uri = self.scanner.next_uri()
         self.pipe.set_state(gst.STATE_NULL)
+        if uri is None:
+            self.scanner.pipeline_done(self)
+            return False
         self.uribin.set_property('uri', uri)
         self.pipe.set_state(gst.STATE_PLAYING)
         return True
 
-    def start(self):
-        if self.next_uri():
-            self.loop.run()
-
     def stop(self):
         self.pipe.set_state(gst.STATE_NULL)
-        self.loop.quit()
@@ -90,6 +90,19 @@ LASTFM_USERNAME = ''
 #: Used by :mod:`mopidy.frontends.lastfm`.
 LASTFM_PASSWORD = ''
 
+#: Seconds to wait for the backends to answer a library search, after which
+#: the results of the backends that have answered are returned without the
+#: rest. The same deadline applies when listing the distinct values of a tag
+#: or the root directories of all backends.
+#:
+#: Should not be shorter than the 3 seconds the Spotify backend waits for
+#: Spotify to answer a search.
+#:
+#: Default::
+#:
+#:     LIBRARY_SEARCH_TIMEOUT = 5.0
+LIBRARY_SEARCH_TIMEOUT = 5.0
+
 #: Path to folder with local music.
 #:
 #: Used by :mod:`mopidy.backends.local`.
@@ -108,6 +121,19 @@ LOCAL_MUSIC_PATH = '$XDG_MUSIC_DIR'
 #:    LOCAL_PLAYLIST_PATH = u'$XDG_DATA_DIR/mopidy/playlists'
 LOCAL_PLAYLIST_PATH = '$XDG_DATA_DIR/mopidy/playlists'
 
+#: Path to a cache of the parsed local music library.
+#:
+#: If set, the tracks parsed from :attr:`LOCAL_TAG_CACHE_FILE` are stored in
+#: this file, and reused on startup as long as the tag cache is unchanged.
+#: Set to :class:`None` to always parse the tag cache.
+#:
+#: Used by :mod:`mopidy.backends.local`.
+#:
+#: Default::
+#:
+#:    LOCAL_LIBRARY_CACHE_FILE = None
+LOCAL_LIBRARY_CACHE_FILE = None
+
 #: Path to tag cache for local music.
 #:
 #: Used by :mod:`mopidy.backends.local`.
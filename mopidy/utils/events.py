@@ -0,0 +1,134 @@
+from __future__ import unicode_literals
+
+import logging
+import Queue
+import threading
+import time
+
+import pykka
+
+
+logger = logging.getLogger('mopidy.utils.events')
+
+#: Seconds to wait for more events after the first event of a batch, so that
+#: bursts of events are delivered together.
+COALESCE_WINDOW = 0.01
+
+
+class Listener(object):
+    """
+    Base class for listener interfaces whose events are sent through an
+    :class:`EventBus`.
+    """
+
+    def on_events(self, events):
+        """
+        Called with a batch of events from an :class:`EventBus`, in the order
+        they were sent.
+
+        Calls the listener method of each event. If a method fails, the error
+        is logged and the rest of the events are still handled.
+
+        :param events: event names and keyword arguments
+        :type events: list of two-tuples of string and dict
+        """
+        for (event, kwargs) in events:
+            try:
+                getattr(self, event)(**kwargs)
+            except Exception:
+                logger.exception(
+                    '%s failed to handle %s event',
+                    self.__class__.__name__, event)
+
+
+class EventBus(object):
+    """
+    Delivers events to the running actors that mix in a listener class.
+
+    Events are queued and delivered in batches by a background thread, with
+    one message per listener per batch. Events listed in ``coalesced_events``
+    are only delivered once per batch, however many times they were sent, in
+    the place of the last time they were sent.
+
+    Listener proxies are reused for as long as their actor is running.
+
+    :param listener_class: the listener interface to look up actors by
+    :type listener_class: subclass of :class:`Listener`
+    :param coalesced_events: names of events where sending the event again
+        before it is delivered has no further effect
+    :type coalesced_events: iterable of strings
+    """
+
+    def __init__(self, listener_class, coalesced_events=()):
+        self.listener_class = listener_class
+        self.coalesced_events = frozenset(coalesced_events)
+        self._queue = Queue.Queue()
+        self._proxies = {}
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def send(self, event, **kwargs):
+        """Queue an event for delivery to all listeners."""
+        self._queue.put((event, kwargs))
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run,
+                        name='%sEventBus' % self.listener_class.__name__)
+                    self._thread.daemon = True
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            events = self._get_batch()
+            try:
+                self._deliver(self._coalesce(events))
+            except Exception:
+                logger.exception(
+                    'Delivery of %s events failed',
+                    self.listener_class.__name__)
+
+    def _get_batch(self):
+        events = [self._queue.get()]
+        time.sleep(COALESCE_WINDOW)
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except Queue.Empty:
+                return events
+
+    def _coalesce(self, events):
+        # Keep the last occurrence of each coalesced event, so that it is
+        # still delivered after the events that were sent before it.
+        result = []
+        seen = set()
+        for (event, kwargs) in reversed(events):
+            if event in self.coalesced_events:
+                if event in seen:
+                    continue
+                seen.add(event)
+            result.append((event, kwargs))
+        result.reverse()
+        return result
+
+    def _deliver(self, events):
+        for proxy in self._get_proxies():
+            try:
+                proxy.on_events(events)
+            except pykka.ActorDeadError:
+                pass
+
+    def _get_proxies(self):
+        proxies = {}
+        for actor_ref in pykka.ActorRegistry.get_by_class(
+                self.listener_class):
+            proxy = self._proxies.get(actor_ref.actor_urn)
+            if proxy is None:
+                try:
+                    proxy = actor_ref.proxy()
+                except pykka.ActorDeadError:
+                    continue
+            proxies[actor_ref.actor_urn] = proxy
+        self._proxies = proxies
+        return proxies.values()
@@ -1,7 +1,9 @@
 from __future__ import unicode_literals
 
+import collections
 import errno
 import gobject
+import itertools
 import logging
 import re
 import socket
@@ -14,6 +16,25 @@ from mopidy.utils import encoding
 
 logger = logging.getLogger('mopidy.utils.server')
 
+#: Smallest and largest number of bytes to read from a socket at once. The
+#: read size is doubled whenever a read fills it, and halved whenever a read
+#: fills less than half of it.
+RECV_SIZE_MIN = 4 * 1024
+RECV_SIZE_MAX = 256 * 1024
+
+#: When more than this number of bytes is queued for sending to a client,
+#: :meth:`LineProtocol.send_lines` holds back the rest of the lines until the
+#: client has received some of it.
+SEND_BUFFER_MAX = 1024 * 1024
+
+#: Number of lines :meth:`LineProtocol.send_lines` joins, encodes and queues
+#: for sending at a time.
+SEND_LINES_CHUNK_SIZE = 1000
+
+#: Queued chunks smaller than this are joined together before sending, to
+#: avoid a system call per chunk.
+SEND_CHUNK_SIZE = 64 * 1024
+
 
 class ShouldRetrySocketCall(Exception):
     """Indicate that attempted socket call should be retried"""
@@ -139,8 +160,11 @@ class Connection(object):
         self.protocol_kwargs = protocol_kwargs
         self.timeout = timeout
 
+        self.recv_size = RECV_SIZE_MIN
+
         self.send_lock = threading.Lock()
-        self.send_buffer = b''
+        self.send_buffer = collections.deque()
+        self.send_buffer_full = False
 
         self.stopping = False
 
@@ -177,18 +201,66 @@ class Connection(object):
             pass
 
     def queue_send(self, data):
-        """Try to send data to client exactly as is and queue rest."""
+        """
+        Try to send data to client exactly as is and queue rest.
+
+        Returns :class:`True` if more than :attr:`SEND_BUFFER_MAX` bytes are
+        queued. The protocol actor is then sent a ``{'send_buffer_free':
+        True}`` message once the client has received enough of it, so that a
+        slow client can't make us queue responses faster than it reads them.
+        """
         self.send_lock.acquire(True)
-        self.send_buffer = self.send(self.send_buffer + data)
-        self.send_lock.release()
-        if self.send_buffer:
-            self.enable_send()
+        try:
+            self.send_buffer.append(data)
+            self.send_queued()
+            if self.send_buffer:
+                self.enable_send()
+            self.send_buffer_full = self.send_buffer_size() > SEND_BUFFER_MAX
+            return self.send_buffer_full
+        finally:
+            self.send_lock.release()
+
+    def send_buffer_size(self):
+        """Number of bytes queued for sending. Call with send lock held."""
+        return sum(len(chunk) for chunk in self.send_buffer)
+
+    def send_queued(self):
+        """
+        Send as much of the queued data as possible to client.
+
+        Must be called with the send lock held. Small chunks are joined
+        together, while the rest of partially sent chunks are kept as
+        :class:`memoryview` slices, so that the queued data is only copied
+        once no matter how many sends it takes.
+        """
+        while self.send_buffer:
+            if self.stopping:
+                self.send_buffer.clear()
+                break
+            chunks = [self.send_buffer.popleft()]
+            size = len(chunks[0])
+            while (self.send_buffer and
+                    size + len(self.send_buffer[0]) <= SEND_CHUNK_SIZE):
+                chunks.append(self.send_buffer.popleft())
+                size += len(chunks[-1])
+            if len(chunks) == 1:
+                data = chunks[0]
+            else:
+                data = b''.join(
+                    chunk.tobytes() if isinstance(chunk, memoryview)
+                    else chunk for chunk in chunks)
+            unsent = self.send(data)
+            if unsent:
+                self.send_buffer.appendleft(unsent)
+                break
 
     def send(self, data):
         """Send data to client, return any unsent data."""
         try:
             sent = self.sock.send(data)
-            return data[sent:]
+            if sent == len(data):
+                return b''
+            return memoryview(data)[sent:]
         except socket.error as e:
             if e.errno in (errno.EWOULDBLOCK, errno.EINTR):
                 return data
@@ -254,7 +326,7 @@ class Connection(object):
             return True
 
         try:
-            data = self.sock.recv(4096)
+            data = self.sock.recv(self.recv_size)
         except socket.error as e:
             if e.errno not in (errno.EWOULDBLOCK, errno.EINTR):
                 self.stop('Unexpected client error: %s' % e)
@@ -264,6 +336,11 @@ class Connection(object):
             self.stop('Client most likely disconnected.')
             return True
 
+        if len(data) == self.recv_size:
+            self.recv_size = min(self.recv_size * 2, RECV_SIZE_MAX)
+        elif len(data) < self.recv_size // 2:
+            self.recv_size = max(self.recv_size // 2, RECV_SIZE_MIN)
+
         try:
             self.actor_ref.tell({'received': data})
         except pykka.ActorDeadError:
@@ -282,14 +359,27 @@ class Connection(object):
             return True
 
         try:
-            self.send_buffer = self.send(self.send_buffer)
+            self.send_queued()
             if not self.send_buffer:
                 self.disable_send()
+            if (self.send_buffer_full and
+                    self.send_buffer_size() <= SEND_BUFFER_MAX):
+                self.send_buffer_full = False
+                self.resume_sending()
         finally:
             self.send_lock.release()
 
         return True
 
+    def resume_sending(self):
+        # The client is still receiving, so it hasn't timed out
+        if self.timeout_id is not None:
+            self.enable_timeout()
+        try:
+            self.actor_ref.tell({'send_buffer_free': True})
+        except pykka.ActorDeadError:
+            self.stop('Actor is dead.')
+
     def timeout_callback(self):
         self.stop('Client timeout out after %s seconds' % self.timeout)
         return False
@@ -317,7 +407,10 @@ class LineProtocol(pykka.ThreadingActor):
         super(LineProtocol, self).__init__()
         self.connection = connection
         self.prevent_timeout = False
-        self.recv_buffer = ''
+        self.recv_buffer = bytearray()
+        self.recv_scan_offset = 0
+        self.recv_lines = collections.deque()
+        self.send_queue = collections.deque()
 
         if self.delimiter:
             self.delimiter = re.compile(self.delimiter)
@@ -342,14 +435,19 @@ class LineProtocol(pykka.ThreadingActor):
 
     def on_receive(self, message):
         """Handle messages with new data from server."""
-        if 'received' not in message:
+        if 'received' in message:
+            self.connection.disable_timeout()
+            self.recv_buffer.extend(message['received'])
+            self.recv_lines.extend(self.parse_lines())
+        elif 'send_buffer_free' in message:
+            self.send_queued_lines()
+        else:
             return
 
-        self.connection.disable_timeout()
-        self.recv_buffer += message['received']
-
-        for line in self.parse_lines():
-            line = self.decode(line)
+        # Lines are not handled while the response to an earlier line is
+        # still waiting to be queued for sending.
+        while self.recv_lines and not self.send_queue:
+            line = self.decode(self.recv_lines.popleft())
             if line is not None:
                 self.on_line_received(line)
 
@@ -362,9 +460,20 @@ class LineProtocol(pykka.ThreadingActor):
 
     def parse_lines(self):
         """Consume new data and yield any lines found."""
-        while re.search(self.terminator, self.recv_buffer):
-            line, self.recv_buffer = self.delimiter.split(
-                self.recv_buffer, 1)
+        # Only the data received since the last call is searched for the
+        # terminator, and all complete lines are split off at once, so that
+        # the time spent is linear in the amount of data received.
+        terminator = bytes(self.terminator)
+        end = self.recv_buffer.rfind(terminator, self.recv_scan_offset)
+        if end == -1:
+            self.recv_scan_offset = max(
+                0, len(self.recv_buffer) - len(terminator) + 1)
+            return
+        end += len(terminator)
+        lines = self.delimiter.split(bytes(self.recv_buffer[:end]))
+        del self.recv_buffer[:end]
+        self.recv_scan_offset = 0
+        for line in lines[:-1]:
             yield line
 
     def encode(self, line):
@@ -404,13 +513,32 @@ class LineProtocol(pykka.ThreadingActor):
 
     def send_lines(self, lines):
         """
-        Send array of lines to client via connection.
+        Send array or iterator of lines to client via connection.
 
         Join lines using the terminator that is set for this class, encode it
-        and send it to the client.
+        and send it to the client. Many lines are sent in chunks of
+        :attr:`SEND_LINES_CHUNK_SIZE` lines, so that an iterator is consumed
+        as the data is queued. When more than :attr:`SEND_BUFFER_MAX` bytes
+        are queued, the rest of the lines are held back until the connection
+        tells us that the client has received some of it.
         """
         if not lines:
             return
 
-        data = self.join_lines(lines)
-        self.connection.queue_send(self.encode(data))
+        self.send_queue.append(iter(lines))
+        self.send_queued_lines()
+
+    def send_queued_lines(self):
+        """Queue the held back lines for sending until the buffer is full."""
+        while self.send_queue:
+            chunk = list(
+                itertools.islice(self.send_queue[0], SEND_LINES_CHUNK_SIZE))
+            if not chunk:
+                self.send_queue.popleft()
+                continue
+            data = self.encode(self.join_lines(chunk))
+            if data is None:
+                self.send_queue.clear()
+                break
+            if self.connection.queue_send(data):
+                break
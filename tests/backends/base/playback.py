@@ -268,9 +268,10 @@ class PlaybackControllerTest(object):
 
     @populate_playlist
     def test_next_track_with_random(self):
-        random.seed(1)
+        random.seed(5)  # Shuffled order: 1, 2, 0
         self.playback.random = True
-        self.assertEqual(self.playback.track_at_next, self.tracks[2])
+        self.assertEqual(self.playback.track_at_next, self.tracks[1])
+        self.assertEqual(self.playback.track_at_next, self.tracks[1])
 
     @populate_playlist
     def test_next_with_consume(self):
@@ -289,21 +290,44 @@ class PlaybackControllerTest(object):
 
     @populate_playlist
     def test_next_with_random(self):
-        # FIXME feels very fragile
-        random.seed(1)
+        random.seed(5)  # Shuffled order: 1, 2, 0
         self.playback.random = True
         self.playback.play()
         self.playback.next()
-        self.assertEqual(self.playback.current_track, self.tracks[1])
+        self.assertEqual(self.playback.current_track, self.tracks[2])
 
     @populate_playlist
     def test_next_track_with_random_after_append_playlist(self):
-        random.seed(1)
+        random.seed(5)  # Shuffled order: 1, 2, 0
         self.playback.random = True
-        self.assertEqual(self.playback.track_at_next, self.tracks[2])
+        self.assertEqual(self.playback.track_at_next, self.tracks[1])
         self.tracklist.append(self.tracks[:1])
         self.assertEqual(self.playback.track_at_next, self.tracks[1])
 
+    @populate_playlist
+    def test_next_track_with_random_after_removing_next_track(self):
+        random.seed(5)
+        self.playback.random = True
+        tl_track = self.playback.tl_track_at_next
+        self.tracklist.remove(tlid=tl_track.tlid)
+        self.assertNotEqual(self.playback.tl_track_at_next, tl_track)
+        self.assertIn(
+            self.playback.tl_track_at_next, self.tracklist.tl_tracks)
+
+    @populate_playlist
+    def test_random_plays_appended_tracks_once(self):
+        self.playback.random = True
+        self.playback.play()
+        self.playback.next()
+        tl_tracks = self.tracklist.append(self.tracks[:1])
+        played = [self.playback.current_tl_track]
+        while self.playback.tl_track_at_next is not None:
+            self.playback.next()
+            played.append(self.playback.current_tl_track)
+        self.assertEqual(len(self.tracks), len(played))
+        self.assertEqual(len(played), len(set(played)))
+        self.assertIn(tl_tracks[0], played)
+
     @populate_playlist
     def test_end_of_track(self):
         self.playback.play()
@@ -404,9 +428,10 @@ class PlaybackControllerTest(object):
 
     @populate_playlist
     def test_end_of_track_track_with_random(self):
-        random.seed(1)
+        random.seed(5)  # Shuffled order: 1, 2, 0
         self.playback.random = True
-        self.assertEqual(self.playback.track_at_next, self.tracks[2])
+        self.assertEqual(self.playback.track_at_eot, self.tracks[1])
+        self.assertEqual(self.playback.track_at_next, self.tracks[1])
 
     @populate_playlist
     def test_end_of_track_with_consume(self):
@@ -417,20 +442,19 @@ class PlaybackControllerTest(object):
 
     @populate_playlist
     def test_end_of_track_with_random(self):
-        # FIXME feels very fragile
-        random.seed(1)
+        random.seed(5)  # Shuffled order: 1, 2, 0
         self.playback.random = True
         self.playback.play()
         self.playback.on_end_of_track()
-        self.assertEqual(self.playback.current_track, self.tracks[1])
+        self.assertEqual(self.playback.current_track, self.tracks[2])
 
     @populate_playlist
     def test_end_of_track_track_with_random_after_append_playlist(self):
-        random.seed(1)
+        random.seed(5)  # Shuffled order: 1, 2, 0
         self.playback.random = True
-        self.assertEqual(self.playback.track_at_next, self.tracks[2])
+        self.assertEqual(self.playback.track_at_eot, self.tracks[1])
         self.tracklist.append(self.tracks[:1])
-        self.assertEqual(self.playback.track_at_next, self.tracks[1])
+        self.assertEqual(self.playback.track_at_eot, self.tracks[1])
 
     @populate_playlist
     def test_previous_track_before_play(self):
@@ -474,6 +498,27 @@ class PlaybackControllerTest(object):
             self.assertEqual(
                 self.playback.track_at_previous, self.playback.current_track)
 
+    @populate_playlist
+    def test_previous_track_with_random_after_play(self):
+        random.seed(5)  # Shuffled order: 1, 2, 0
+        self.playback.random = True
+        self.playback.play()
+        self.assertEqual(self.playback.track_at_previous, self.tracks[1])
+        self.playback.next()
+        self.assertEqual(self.playback.track_at_previous, self.tracks[1])
+        self.playback.next()
+        self.assertEqual(self.playback.track_at_previous, self.tracks[2])
+
+    @populate_playlist
+    def test_previous_track_with_random_after_removing_previous_track(self):
+        random.seed(5)  # Shuffled order: 1, 2, 0
+        self.playback.random = True
+        self.playback.play()
+        self.playback.next()
+        self.playback.next()
+        self.tracklist.remove(uri=self.tracks[2].uri)
+        self.assertEqual(self.playback.track_at_previous, self.tracks[1])
+
     @populate_playlist
     def test_initial_current_track(self):
         self.assertEqual(self.playback.current_track, None)
@@ -513,9 +558,9 @@ class PlaybackControllerTest(object):
     def test_on_tracklist_change_gets_called(self):
         callback = self.playback.on_tracklist_change
 
-        def wrapper():
+        def wrapper(*args, **kwargs):
             wrapper.called = True
-            return callback()
+            return callback(*args, **kwargs)
         wrapper.called = False
 
         self.playback.on_tracklist_change = wrapper
@@ -780,20 +825,34 @@ class PlaybackControllerTest(object):
 
     @populate_playlist
     def test_play_with_random(self):
-        random.seed(1)
+        random.seed(5)  # Shuffled order: 1, 2, 0
         self.playback.random = True
         self.playback.play()
-        self.assertEqual(self.playback.current_track, self.tracks[2])
+        self.assertEqual(self.playback.current_track, self.tracks[1])
 
     @populate_playlist
     def test_previous_with_random(self):
-        random.seed(1)
+        random.seed(5)  # Shuffled order: 1, 2, 0
         self.playback.random = True
         self.playback.play()
         self.playback.next()
-        current_track = self.playback.current_track
+        self.playback.next()
         self.playback.previous()
-        self.assertEqual(self.playback.current_track, current_track)
+        self.assertEqual(self.playback.current_track, self.tracks[2])
+        self.playback.previous()
+        self.assertEqual(self.playback.current_track, self.tracks[1])
+        self.playback.previous()
+        self.assertEqual(self.playback.current_track, self.tracks[1])
+
+    @populate_playlist
+    def test_next_with_random_after_previous(self):
+        random.seed(5)  # Shuffled order: 1, 2, 0
+        self.playback.random = True
+        self.playback.play()
+        self.playback.next()
+        self.playback.previous()
+        self.playback.next()
+        self.assertEqual(self.playback.current_track, self.tracks[0])
 
     @populate_playlist
     def test_end_of_song_starts_next_track(self):
@@ -832,6 +891,17 @@ class PlaybackControllerTest(object):
             self.playback.next()
         self.assertEqual(self.playback.track_at_next, None)
 
+    @populate_playlist
+    def test_random_until_end_of_playlist_and_play_again(self):
+        self.playback.random = True
+        self.playback.play()
+        for _ in self.tracks:
+            self.playback.next()
+        self.assertEqual(self.playback.state, PlaybackState.STOPPED)
+        self.assertNotEqual(self.playback.track_at_next, None)
+        self.playback.play()
+        self.assertEqual(self.playback.state, PlaybackState.PLAYING)
+
     @populate_playlist
     def test_random_until_end_of_playlist_and_play_from_start(self):
         self.playback.repeat = True
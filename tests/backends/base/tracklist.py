@@ -18,7 +18,7 @@ class TracklistControllerTest(object):
     def setUp(self):
         self.audio = mock.Mock(spec=audio.Audio)
         self.backend = self.backend_class.start(audio=self.audio).proxy()
-        self.core = core.Core(audio=audio, backends=[self.backend])
+        self.core = core.Core(audio=self.audio, backends=[self.backend])
         self.controller = self.core.tracklist
         self.playback = self.core.playback
 
@@ -158,6 +158,74 @@ class TracklistControllerTest(object):
         tl_tracks = self.controller.append(self.controller.tracks[1:2])
         self.assertEqual(tl_tracks[0].track, self.controller.tracks[1])
 
+    @populate_playlist
+    def test_append_at_position(self):
+        tl_tracks = self.controller.append(self.tracks[:2], at_position=1)
+        self.assertEqual(
+            tuple(tl_tracks), self.controller.tl_tracks[1:3])
+        self.assertEqual(5, self.controller.length)
+        self.assertEqual(1, self.controller.index(tl_tracks[0]))
+
+    @populate_playlist
+    def test_append_at_position_outside_of_playlist(self):
+        test = lambda: self.controller.append(
+            self.tracks, len(self.tracks) + 2)
+        self.assertRaises(AssertionError, test)
+
+    def test_append_increases_version_once(self):
+        version = self.controller.version
+        self.controller.append(self.tracks)
+        self.assertEqual(version + 1, self.controller.version)
+
+    def test_get_changes_with_current_version_is_empty(self):
+        self.controller.append(self.tracks)
+        self.assertEqual(
+            [], self.controller.get_changes(self.controller.version))
+
+    def test_get_changes_after_append(self):
+        tl_tracks = self.controller.append(self.tracks[:1])
+        version = self.controller.version
+        tl_tracks += self.controller.append(self.tracks[1:])
+        self.assertEqual(
+            [(1, tl_tracks[1]), (2, tl_tracks[2])],
+            self.controller.get_changes(version))
+
+    def test_get_changes_after_swap(self):
+        tl_tracks = self.controller.append(self.tracks)
+        version = self.controller.version
+        self.controller.swap(0, 2)
+        self.assertEqual(
+            [(0, tl_tracks[2]), (2, tl_tracks[0])],
+            self.controller.get_changes(version))
+
+    def test_get_changes_after_move(self):
+        tl_tracks = self.controller.append(self.tracks)
+        version = self.controller.version
+        self.controller.move(2, 3, 0)
+        self.assertEqual(
+            [(0, tl_tracks[2]), (1, tl_tracks[0]), (2, tl_tracks[1])],
+            self.controller.get_changes(version))
+
+    def test_get_changes_after_remove(self):
+        tl_tracks = self.controller.append(self.tracks)
+        version = self.controller.version
+        self.controller.remove(tlid=tl_tracks[1].tlid)
+        self.assertEqual(
+            [(1, tl_tracks[2])], self.controller.get_changes(version))
+
+    def test_get_changes_spanning_several_versions(self):
+        tl_tracks = self.controller.append(self.tracks)
+        version = self.controller.version
+        self.controller.swap(0, 1)
+        self.controller.remove(tlid=tl_tracks[2].tlid)
+        self.assertEqual(
+            [(0, tl_tracks[1]), (1, tl_tracks[0])],
+            self.controller.get_changes(version))
+
+    def test_get_changes_for_forgotten_version_is_none(self):
+        self.controller.append(self.tracks)
+        self.assertEqual(None, self.controller.get_changes(-1))
+
     def test_index_returns_index_of_track(self):
         tl_tracks = self.controller.append(self.tracks)
         self.assertEquals(0, self.controller.index(tl_tracks[0]))
@@ -168,6 +236,49 @@ class TracklistControllerTest(object):
         test = lambda: self.controller.index(TlTrack(0, Track()))
         self.assertRaises(ValueError, test)
 
+    def test_index_raises_value_error_if_track_differs(self):
+        tl_tracks = self.controller.append(self.tracks)
+        test = lambda: self.controller.index(
+            TlTrack(tl_tracks[0].tlid, Track()))
+        self.assertRaises(ValueError, test)
+
+    def test_index_after_add_at_position(self):
+        tl_tracks = self.controller.append(self.tracks)
+        tl_track = self.controller.add(self.tracks[0], 1)
+        self.assertEquals(0, self.controller.index(tl_tracks[0]))
+        self.assertEquals(1, self.controller.index(tl_track))
+        self.assertEquals(2, self.controller.index(tl_tracks[1]))
+        self.assertEquals(3, self.controller.index(tl_tracks[2]))
+
+    def test_index_after_remove(self):
+        tl_tracks = self.controller.append(self.tracks)
+        self.controller.remove(tlid=tl_tracks[0].tlid)
+        self.assertEquals(0, self.controller.index(tl_tracks[1]))
+        self.assertEquals(1, self.controller.index(tl_tracks[2]))
+        self.assertRaises(ValueError, self.controller.index, tl_tracks[0])
+
+    def test_index_after_move(self):
+        tl_tracks = self.controller.append(self.tracks)
+        self.controller.move(0, 0, 2)
+        self.assertEquals(2, self.controller.index(tl_tracks[0]))
+        self.assertEquals(0, self.controller.index(tl_tracks[1]))
+        self.controller.move(2, 3, 0)
+        self.assertEquals(0, self.controller.index(tl_tracks[0]))
+        self.assertEquals(1, self.controller.index(tl_tracks[1]))
+
+    def test_index_after_move_to_earlier_position(self):
+        tl_tracks = self.controller.append(self.tracks)
+        self.controller.index(tl_tracks[2])
+        self.controller.move(2, 2, 0)
+        self.assertEquals(0, self.controller.index(tl_tracks[2]))
+        self.assertEquals(1, self.controller.index(tl_tracks[0]))
+        self.assertEquals(2, self.controller.index(tl_tracks[1]))
+
+    def test_index_after_clear(self):
+        tl_tracks = self.controller.append(self.tracks)
+        self.controller.clear()
+        self.assertRaises(ValueError, self.controller.index, tl_tracks[0])
+
     @populate_playlist
     def test_move_single(self):
         self.controller.move(0, 0, 2)
@@ -207,9 +318,23 @@ class TracklistControllerTest(object):
         self.assertRaises(AssertionError, test)
 
     def test_tracks_attribute_is_immutable(self):
-        tracks1 = self.controller.tracks
-        tracks2 = self.controller.tracks
-        self.assertNotEqual(id(tracks1), id(tracks2))
+        tracks = self.controller.tracks
+        self.assertIsInstance(tracks, tuple)
+        self.assertIsInstance(self.controller.tl_tracks, tuple)
+
+    @populate_playlist
+    def test_tracks_attribute_is_shared_until_tracklist_changes(self):
+        tracks = self.controller.tracks
+        tl_tracks = self.controller.tl_tracks
+        self.assertIs(tracks, self.controller.tracks)
+        self.assertIs(tl_tracks, self.controller.tl_tracks)
+
+        self.controller.swap(0, 1)
+
+        self.assertIsNot(tracks, self.controller.tracks)
+        self.assertIsNot(tl_tracks, self.controller.tl_tracks)
+        self.assertEqual(tracks[1], self.controller.tracks[0])
+        self.assertEqual(tl_tracks[1], self.controller.tl_tracks[0])
 
     @populate_playlist
     def test_remove(self):
@@ -221,6 +346,50 @@ class TracklistControllerTest(object):
         self.assertNotIn(track1, self.controller.tracks)
         self.assertEqual(track2, self.controller.tracks[1])
 
+    def test_remove_by_tlid(self):
+        tl_tracks = self.controller.append(self.tracks)
+        self.controller.remove(tlid=tl_tracks[1].tlid)
+        self.assertEqual(
+            (tl_tracks[0], tl_tracks[2]), self.controller.tl_tracks)
+        self.assertRaises(
+            LookupError, self.controller.get, tlid=tl_tracks[1].tlid)
+
+    def test_remove_many(self):
+        tl_tracks = self.controller.append(self.tracks)
+        version = self.controller.version
+        removed = self.controller.remove_many(
+            [tl_tracks[2].tlid, tl_tracks[0].tlid])
+        self.assertEqual([tl_tracks[0], tl_tracks[2]], removed)
+        self.assertEqual((tl_tracks[1],), self.controller.tl_tracks)
+        self.assertEqual(0, self.controller.index(tl_tracks[1]))
+        self.assertEqual(version + 1, self.controller.version)
+
+    def test_remove_many_with_unknown_tlid_removes_nothing(self):
+        tl_tracks = self.controller.append(self.tracks)
+        test = lambda: self.controller.remove_many([tl_tracks[0].tlid, 1000])
+        self.assertRaises(LookupError, test)
+        self.assertEqual(tuple(tl_tracks), self.controller.tl_tracks)
+
+    def test_remove_many_with_no_tlids(self):
+        version = self.controller.version
+        self.assertEqual([], self.controller.remove_many([]))
+        self.assertEqual(version, self.controller.version)
+
+    def test_swap_keeps_tlids(self):
+        tl_tracks = self.controller.append(self.tracks)
+        version = self.controller.version
+        self.controller.swap(0, 2)
+        self.assertEqual(
+            (tl_tracks[2], tl_tracks[1], tl_tracks[0]),
+            self.controller.tl_tracks)
+        self.assertEqual(0, self.controller.index(tl_tracks[2]))
+        self.assertEqual(version + 1, self.controller.version)
+
+    @populate_playlist
+    def test_swap_outside_of_playlist(self):
+        test = lambda: self.controller.swap(0, len(self.tracks))
+        self.assertRaises(AssertionError, test)
+
     @populate_playlist
     def test_removing_track_that_does_not_exist(self):
         test = lambda: self.controller.remove(uri='/nonexistant')
@@ -0,0 +1,172 @@
+from __future__ import unicode_literals
+
+from mopidy.backends.local.index import DirectoryIndex, LibraryIndex
+from mopidy.models import Track, Artist, Album
+
+from tests import unittest
+
+
+class LibraryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tracks = [
+            Track(
+                uri='file:///a/one.mp3', name='One Song', length=1000,
+                artists=[Artist(name='Foo Fighters')], date='2001',
+                album=Album(name='The Colour')),
+            Track(
+                uri='file:///a/two.mp3', name='Two Song', length=2000,
+                artists=[Artist(name='Foo'), Artist(name='Bar')],
+                album=Album(name='The Colour')),
+            Track(uri='file:///b/three.mp3'),
+        ]
+        self.index = LibraryIndex(self.tracks)
+
+    def test_len(self):
+        self.assertEqual(3, len(self.index))
+
+    def test_aggregates(self):
+        self.assertEqual(3, self.index.artists)
+        self.assertEqual(1, self.index.albums)
+        self.assertEqual(3000, self.index.playtime)
+
+    def test_count_single_value(self):
+        self.assertEqual((2, 3000), self.index.count(
+            {'album': ['The Colour']}))
+        self.assertEqual((1, 2000), self.index.count({'artist': 'Bar'}))
+
+    def test_count_no_hits(self):
+        self.assertEqual((0, 0), self.index.count({'artist': ['foo']}))
+
+    def test_count_intersects_fields(self):
+        self.assertEqual((1, 1000), self.index.count(
+            {'album': ['The Colour'], 'track': ['One Song']}))
+
+    def test_count_any(self):
+        self.assertEqual((2, 3000), self.index.count(
+            {'any': ['The Colour']}))
+
+    def test_get_distinct(self):
+        self.assertEqual(
+            set(['Foo Fighters', 'Foo', 'Bar']),
+            self.index.get_distinct('artist'))
+        self.assertEqual(set(['2001']), self.index.get_distinct('date'))
+
+    def test_get_distinct_by_value_of_other_field(self):
+        self.assertEqual(
+            set(['Foo Fighters', 'Foo', 'Bar']),
+            self.index.get_distinct('artist', {'album': ['The Colour']}))
+        self.assertEqual(
+            set(['2001']),
+            self.index.get_distinct('date', {'artist': ['Foo Fighters']}))
+        self.assertEqual(
+            set(), self.index.get_distinct('date', {'artist': ['Foo']}))
+
+    def test_get_distinct_intersects_fields(self):
+        self.assertEqual(
+            set(['Foo', 'Bar']),
+            self.index.get_distinct('artist', {
+                'album': ['The Colour'], 'track': ['Two Song']}))
+
+    def test_get_distinct_invalid_field(self):
+        self.assertRaises(LookupError, self.index.get_distinct, 'wrong')
+
+    def test_lookup(self):
+        self.assertEqual(
+            self.tracks[0], self.index.lookup('file:///a/one.mp3'))
+        self.assertEqual(None, self.index.lookup('file:///unknown'))
+
+    def test_find_exact_is_case_sensitive(self):
+        self.assertEqual([self.tracks[1]], self.index.find_exact(
+            {'artist': ['Foo']}))
+        self.assertEqual([], self.index.find_exact({'artist': ['foo']}))
+
+    def test_find_exact_any(self):
+        self.assertEqual(self.tracks[:2], self.index.find_exact(
+            {'any': ['The Colour']}))
+
+    def test_find_exact_intersects_fields(self):
+        self.assertEqual([self.tracks[0]], self.index.find_exact(
+            {'album': ['The Colour'], 'track': ['One Song']}))
+
+    def test_search_short_query(self):
+        self.assertEqual(self.tracks[:2], self.index.search(
+            {'artist': ['fo']}))
+
+    def test_search_long_query(self):
+        self.assertEqual([self.tracks[0]], self.index.search(
+            {'artist': ['FIGHT']}))
+
+    def test_search_query_spanning_ngrams_must_be_contiguous(self):
+        self.assertEqual([], self.index.search({'track': ['one two']}))
+
+    def test_search_any(self):
+        self.assertEqual([self.tracks[2]], self.index.search(
+            {'any': ['three']}))
+
+    def test_search_intersects_values(self):
+        self.assertEqual([self.tracks[1]], self.index.search(
+            {'artist': ['foo', 'bar']}))
+
+    def test_search_no_hits(self):
+        self.assertEqual([], self.index.search({'uri': ['unknown']}))
+
+    def test_invalid_field(self):
+        self.assertRaises(
+            LookupError, self.index.search, {'wrong': ['test']})
+
+
+class DirectoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tracks = [
+            Track(uri='file:///music/a/one.mp3'),
+            Track(uri='file:///music/a/b/two.mp3'),
+            Track(uri='file:///music/c/d/three.mp3'),
+            Track(uri='file:///music/four.mp3'),
+            Track(uri='file:///other/five.mp3'),
+        ]
+        self.index = DirectoryIndex('file:///music/', self.tracks)
+
+    def test_browse_root(self):
+        self.assertEqual(
+            (['file:///music/a', 'file:///music/c'], [self.tracks[3]]),
+            self.index.browse())
+
+    def test_browse_directory(self):
+        self.assertEqual(
+            (['file:///music/a/b'], [self.tracks[0]]),
+            self.index.browse('file:///music/a'))
+
+    def test_browse_directory_without_tracks(self):
+        self.assertEqual(
+            (['file:///music/c/d'], []), self.index.browse('file:///music/c/'))
+
+    def test_browse_unknown_directory(self):
+        self.assertEqual(None, self.index.browse('file:///music/x'))
+        self.assertEqual(None, self.index.browse('file:///other'))
+
+    def test_browse_is_sorted_by_uri(self):
+        tracks = [
+            Track(uri='file:///music/b/one.mp3'),
+            Track(uri='file:///music/b.mp3'),
+            Track(uri='file:///music/a b/two.mp3'),
+            Track(uri='file:///music/a.mp3'),
+            Track(uri='file:///music/a/three.mp3'),
+        ]
+        index = DirectoryIndex('file:///music', tracks)
+        self.assertEqual(
+            (['file:///music/a', 'file:///music/a b', 'file:///music/b'],
+                [tracks[3], tracks[1]]),
+            index.browse())
+
+    def test_add_keeps_directories_sorted(self):
+        self.index.add(Track(uri='file:///music/a/aa/five.mp3'))
+        self.assertEqual(
+            ['file:///music/a/aa', 'file:///music/a/b'],
+            self.index.browse('file:///music/a')[0])
+
+    def test_add_keeps_tracks_sorted(self):
+        track = Track(uri='file:///music/a/b/one.mp3')
+        self.index.add(track)
+        self.assertEqual(
+            [track, self.tracks[1]],
+            self.index.browse('file:///music/a/b')[1])
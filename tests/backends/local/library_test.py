@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+import os
+
 from mopidy import settings
 from mopidy.backends.local import LocalBackend
 
@@ -21,3 +23,51 @@ class LocalLibraryControllerTest(LibraryControllerTest, unittest.TestCase):
         settings.runtime.clear()
 
         super(LocalLibraryControllerTest, self).tearDown()
+
+    def test_stats(self):
+        stats = self.library.get_stats()
+        self.assertEqual(3, stats.artists)
+        self.assertEqual(3, stats.albums)
+        self.assertEqual(3, stats.songs)
+        self.assertEqual(12000, stats.playtime)
+        self.assertEqual(
+            os.path.getmtime(settings.LOCAL_TAG_CACHE_FILE),
+            stats.last_update)
+
+    def test_browse_root(self):
+        (directories, tracks) = self.library.browse()
+        self.assertEqual([], directories)
+        self.assertEqual(self.tracks[:2], tracks[:2])
+
+    def test_browse_unknown_directory(self):
+        self.assertEqual(
+            None, self.library.browse('file://' + path_to_data_dir('x')))
+
+    def test_walk_root(self):
+        self.assertEqual(
+            [(None, [], self.library.browse()[1])], self.library.walk())
+
+    def test_refresh_replaces_index(self):
+        settings.LOCAL_TAG_CACHE_FILE = path_to_data_dir('empty_tag_cache')
+        self.library.refresh()
+        self.assertEqual(None, self.library.lookup(self.tracks[0].uri))
+        self.assertEqual(None, self.library.lookup(self.tracks[1].uri))
+
+    def test_refresh_uri_only_replaces_tracks_below_uri(self):
+        settings.LOCAL_TAG_CACHE_FILE = path_to_data_dir('empty_tag_cache')
+        self.library.refresh(self.tracks[0].uri)
+        self.assertEqual(None, self.library.lookup(self.tracks[0].uri))
+        self.assertEqual(
+            self.tracks[1], self.library.lookup(self.tracks[1].uri))
+
+    def test_refresh_path_replaces_tracks_below_music_path(self):
+        settings.LOCAL_TAG_CACHE_FILE = path_to_data_dir('empty_tag_cache')
+        self.library.refresh('uri1')
+        self.assertEqual(None, self.library.lookup(self.tracks[0].uri))
+        self.assertEqual(
+            self.tracks[1], self.library.lookup(self.tracks[1].uri))
+
+    def test_refresh_directory_uri_replaces_tracks_below_it(self):
+        settings.LOCAL_TAG_CACHE_FILE = path_to_data_dir('empty_tag_cache')
+        self.library.refresh('file://' + path_to_data_dir(''))
+        self.assertEqual(None, self.library.lookup(self.tracks[0].uri))
@@ -3,10 +3,16 @@
 from __future__ import unicode_literals
 
 import os
+import shutil
 import tempfile
 
+import mock
+
 from mopidy.utils.path import path_to_uri
-from mopidy.backends.local.translator import parse_m3u, parse_mpd_tag_cache
+from mopidy.backends.local import translator
+from mopidy.backends.local.translator import (
+    iter_mpd_tag_cache, iter_mpd_tag_cache_mtimes, parse_m3u,
+    parse_mpd_tag_cache)
 from mopidy.models import Track, Artist, Album
 
 from tests import unittest, path_to_data_dir
@@ -185,3 +191,76 @@ class MPDTagCacheToTracksTest(unittest.TestCase):
             name='trackname', artists=expected_artists, track_no=1,
             album=album, length=4000, uri=uri)
         self.assertEqual(track, list(tracks)[0])
+
+
+class IterMPDTagCacheTest(unittest.TestCase):
+    def test_returns_generator(self):
+        tracks = iter_mpd_tag_cache(
+            path_to_data_dir('advanced_tag_cache'), path_to_data_dir(''))
+        self.assertEqual(expected_tracks[7], next(tracks))
+        self.assertEqual(
+            set(expected_tracks) - set([expected_tracks[7]]), set(tracks))
+
+    def test_empty_cache(self):
+        tracks = iter_mpd_tag_cache(
+            path_to_data_dir('empty_tag_cache'), path_to_data_dir(''))
+        self.assertEqual([], list(tracks))
+
+    def test_equal_albums_are_shared(self):
+        tracks = list(iter_mpd_tag_cache(
+            path_to_data_dir('advanced_tag_cache'), path_to_data_dir('')))
+        self.assertIs(tracks[0].album, tracks[1].album)
+        self.assertIs(
+            list(tracks[0].artists)[0], list(tracks[1].artists)[0])
+
+    def test_missing_cache(self):
+        tracks = iter_mpd_tag_cache(
+            path_to_data_dir('no_such_tag_cache'), path_to_data_dir(''))
+        self.assertEqual([], list(tracks))
+
+
+class IterMPDTagCacheMtimesTest(unittest.TestCase):
+    def test_simple_cache(self):
+        tracks = list(iter_mpd_tag_cache_mtimes(
+            path_to_data_dir('simple_tag_cache'), path_to_data_dir('')))
+        self.assertEqual([(expected_tracks[0], 1272319626)], tracks)
+
+
+class LibraryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.tag_cache = os.path.join(self.temp_dir, 'tag_cache')
+        self.cache_file = os.path.join(self.temp_dir, 'cache', 'library')
+        shutil.copy(path_to_data_dir('advanced_tag_cache'), self.tag_cache)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def parse(self, music_dir=path_to_data_dir('')):
+        return parse_mpd_tag_cache(self.tag_cache, music_dir, self.cache_file)
+
+    def test_cache_is_written(self):
+        self.assertEqual(set(expected_tracks), self.parse())
+        self.assertTrue(os.path.isfile(self.cache_file))
+
+    def test_unchanged_tag_cache_is_read_from_cache(self):
+        self.parse()
+        with mock.patch.object(translator, 'iter_mpd_tag_cache') as iter_mock:
+            self.assertEqual(set(expected_tracks), self.parse())
+            self.assertFalse(iter_mock.called)
+
+    def test_changed_tag_cache_is_parsed(self):
+        self.parse()
+        shutil.copy(path_to_data_dir('simple_tag_cache'), self.tag_cache)
+        self.assertEqual(set(expected_tracks[:1]), self.parse())
+
+    def test_changed_music_dir_is_parsed(self):
+        self.parse()
+        tracks = self.parse(music_dir='/other/')
+        self.assertNotEqual(set(expected_tracks), tracks)
+
+    def test_corrupt_cache_is_ignored(self):
+        os.mkdir(os.path.dirname(self.cache_file))
+        with open(self.cache_file, 'wb') as cache:
+            cache.write(b'garbage')
+        self.assertEqual(set(expected_tracks), self.parse())
@@ -35,3 +35,22 @@ class CoreActorTest(unittest.TestCase):
             AssertionError,
             'Cannot add URI scheme dummy1 for B2, it is already handled by B1',
             Core, audio=None, backends=[self.backend1, self.backend2])
+
+    def test_about_to_finish_callback_is_set_on_audio(self):
+        audio = mock.Mock()
+        core = Core(audio=audio, backends=[self.backend1])
+
+        audio.set_about_to_finish_callback.assert_called_once_with(
+            core._on_about_to_finish)
+
+    def test_about_to_finish_calls_playback_without_building_proxy(self):
+        audio = mock.Mock()
+        core_ref = Core.start(audio=audio, backends=[self.backend1])
+        core = core_ref._actor
+        core.playback.on_about_to_finish = mock.Mock()
+
+        with mock.patch.object(pykka.ActorRef, 'proxy') as proxy:
+            core._on_about_to_finish()
+
+        self.assertFalse(proxy.called)
+        core.playback.on_about_to_finish.assert_called_once_with()
@@ -70,6 +70,13 @@ class BackendEventsTest(unittest.TestCase):
         self.core.tracklist.append([Track(uri='dummy:a')]).get()
         self.assertEqual(send.call_args[0][0], 'tracklist_changed')
 
+    def test_tracklist_append_many_sends_one_tracklist_changed_event(
+            self, send):
+        send.reset_mock()
+        self.core.tracklist.append(
+            [Track(uri='dummy:a'), Track(uri='dummy:b')]).get()
+        self.assertEqual(1, send.call_count)
+
     def test_tracklist_clear_sends_tracklist_changed_event(self, send):
         self.core.tracklist.append([Track(uri='dummy:a')]).get()
         send.reset_mock()
@@ -89,6 +96,23 @@ class BackendEventsTest(unittest.TestCase):
         self.core.tracklist.remove(uri='dummy:a').get()
         self.assertEqual(send.call_args[0][0], 'tracklist_changed')
 
+    def test_tracklist_remove_many_sends_one_tracklist_changed_event(
+            self, send):
+        tl_tracks = self.core.tracklist.append(
+            [Track(uri='dummy:a'), Track(uri='dummy:b')]).get()
+        send.reset_mock()
+        self.core.tracklist.remove_many(
+            [tl_track.tlid for tl_track in tl_tracks]).get()
+        self.assertEqual(1, send.call_count)
+        self.assertEqual(send.call_args[0][0], 'tracklist_changed')
+
+    def test_tracklist_swap_sends_tracklist_changed_event(self, send):
+        self.core.tracklist.append(
+            [Track(uri='dummy:a'), Track(uri='dummy:b')]).get()
+        send.reset_mock()
+        self.core.tracklist.swap(0, 1).get()
+        self.assertEqual(send.call_args[0][0], 'tracklist_changed')
+
     def test_tracklist_shuffle_sends_tracklist_changed_event(self, send):
         self.core.tracklist.append(
             [Track(uri='dummy:a'), Track(uri='dummy:b')]).get()
@@ -1,10 +1,14 @@
 from __future__ import unicode_literals
 
+import threading
+
 import mock
+import pykka
 
+from mopidy import settings
 from mopidy.backends import base
-from mopidy.core import Core
-from mopidy.models import Playlist, Track
+from mopidy.core import Core, CoreListener
+from mopidy.models import LibraryStats, Playlist, SearchResult, Track
 
 from tests import unittest
 
@@ -29,6 +33,9 @@ class CoreLibraryTest(unittest.TestCase):
         self.core = Core(audio=None, backends=[
             self.backend1, self.backend2, self.backend3])
 
+    def tearDown(self):
+        settings.runtime.clear()
+
     def test_lookup_selects_dummy1_backend(self):
         self.core.library.lookup('dummy1:a')
 
@@ -72,6 +79,177 @@ class CoreLibraryTest(unittest.TestCase):
         self.library1.refresh.assert_called_once_with(None)
         self.library2.refresh.assert_called_once_with(None)
 
+    def test_refresh_with_path_calls_all_backends(self):
+        self.core.library.refresh('Artist/Album')
+
+        self.library1.refresh.assert_called_once_with('Artist/Album')
+        self.library2.refresh.assert_called_once_with('Artist/Album')
+
+    def test_refresh_waits_for_background_refresh(self):
+        future = mock.Mock(spec=pykka.ThreadingFuture)
+        self.library1.refresh().get.return_value = future
+
+        self.core.library.refresh('dummy1:a')
+
+        self.assertTrue(future.get.called)
+
+    def wait_for_update_jobs(self, count):
+        finished = []
+        done = threading.Event()
+
+        def send(event, **kwargs):
+            if event == 'library_update_finished':
+                finished.append(kwargs['job'])
+                if len(finished) == count:
+                    done.set()
+
+        return finished, done, send
+
+    def test_update_returns_increasing_job_ids(self):
+        finished, done, send = self.wait_for_update_jobs(2)
+        with mock.patch.object(CoreListener, 'send', side_effect=send):
+            job1 = self.core.library.update()
+            job2 = self.core.library.update('dummy1:a')
+            done.wait(5)
+
+        self.assertGreater(job1, 0)
+        self.assertEqual(job1 + 1, job2)
+        self.assertEqual([job1, job2], finished)
+
+    def test_update_refreshes_library_in_background(self):
+        finished, done, send = self.wait_for_update_jobs(1)
+        with mock.patch.object(CoreListener, 'send', side_effect=send):
+            self.core.library.update('dummy1:a')
+            done.wait(5)
+
+        self.library1.refresh.assert_called_once_with('dummy1:a')
+        self.assertFalse(self.library2.refresh.called)
+
+    def test_update_sends_started_and_finished_events(self):
+        finished, done, send = self.wait_for_update_jobs(1)
+        with mock.patch.object(
+                CoreListener, 'send', side_effect=send) as mock_send:
+            job = self.core.library.update()
+            done.wait(5)
+
+        self.assertEqual([
+            mock.call('library_update_started', job=job),
+            mock.call('library_update_finished', job=job),
+        ], mock_send.call_args_list)
+
+    def test_updating_is_job_id_while_update_runs(self):
+        running = threading.Event()
+        release = threading.Event()
+        updating = []
+
+        def refresh(uri):
+            running.set()
+            release.wait(5)
+            return mock.Mock()
+
+        self.library1.refresh.side_effect = refresh
+        finished, done, send = self.wait_for_update_jobs(1)
+        with mock.patch.object(CoreListener, 'send', side_effect=send):
+            job = self.core.library.update('dummy1:a')
+            running.wait(5)
+            updating.append(self.core.library.updating)
+            release.set()
+            done.wait(5)
+
+        self.assertEqual([job], updating)
+
+    def test_updating_is_none_without_update(self):
+        self.assertEqual(None, self.core.library.updating)
+
+    def test_browse_with_uri_selects_dummy1_backend(self):
+        self.library1.browse().get.return_value = (['dummy1:b'], [])
+        self.library1.browse.reset_mock()
+
+        result = self.core.library.browse('dummy1:a')
+
+        self.assertEqual((['dummy1:b'], []), result)
+        self.library1.browse.assert_called_once_with('dummy1:a')
+        self.assertFalse(self.library2.browse.called)
+
+    def test_browse_fails_for_dummy3_directory(self):
+        result = self.core.library.browse('dummy3:a')
+
+        self.assertIsNone(result)
+        self.assertFalse(self.library1.browse.called)
+        self.assertFalse(self.library2.browse.called)
+
+    def test_browse_root_combines_results_from_all_backends(self):
+        track1 = Track(uri='dummy1:b')
+        track2 = Track(uri='dummy2:b')
+        self.library1.browse().get.return_value = (['dummy1:a'], [track1])
+        self.library2.browse().get.return_value = (['dummy2:a'], [track2])
+
+        result = self.core.library.browse()
+
+        self.assertEqual(
+            (['dummy1:a', 'dummy2:a'], [track1, track2]), result)
+
+    def test_walk_root_combines_results_from_all_backends(self):
+        track1 = Track(uri='dummy1:a/b')
+        track2 = Track(uri='dummy2:c')
+        self.library1.walk().get.return_value = [
+            (None, ['dummy1:a'], []), ('dummy1:a', [], [track1])]
+        self.library2.walk().get.return_value = [(None, [], [track2])]
+
+        result = self.core.library.walk()
+
+        self.assertEqual([
+            (None, ['dummy1:a'], [track2]),
+            ('dummy1:a', [], [track1]),
+        ], result)
+
+    def test_count_combines_results_from_all_backends(self):
+        self.library1.count().get.return_value = (2, 3000)
+        self.library1.count.reset_mock()
+        self.library2.count().get.return_value = (1, 1000)
+        self.library2.count.reset_mock()
+
+        result = self.core.library.count(artist=['a'])
+
+        self.assertEqual((3, 4000), result)
+        self.library1.count.assert_called_once_with(artist=['a'])
+        self.library2.count.assert_called_once_with(artist=['a'])
+
+    def test_get_distinct_combines_results_from_all_backends(self):
+        self.library1.get_distinct().get.return_value = set(['a', 'b'])
+        self.library1.get_distinct.reset_mock()
+        self.library2.get_distinct().get.return_value = set(['b', 'c'])
+        self.library2.get_distinct.reset_mock()
+
+        result = self.core.library.get_distinct('album', artist=['x'])
+
+        self.assertEqual(set(['a', 'b', 'c']), result)
+        self.library1.get_distinct.assert_called_once_with(
+            'album', artist=['x'])
+        self.library2.get_distinct.assert_called_once_with(
+            'album', artist=['x'])
+
+    def test_get_stats_combines_stats_from_all_backends(self):
+        self.library1.get_stats().get.return_value = LibraryStats(
+            artists=1, albums=2, songs=3, playtime=4000, last_update=10.0)
+        self.library2.get_stats().get.return_value = LibraryStats(
+            artists=2, albums=3, songs=4, playtime=5000, last_update=20.0)
+
+        result = self.core.library.get_stats()
+
+        self.assertEqual(LibraryStats(
+            artists=3, albums=5, songs=7, playtime=9000, last_update=20.0),
+            result)
+
+    def test_get_stats_ignores_backends_without_stats(self):
+        self.library1.get_stats().get.return_value = LibraryStats(
+            songs=3, last_update=10.0)
+        self.library2.get_stats().get.return_value = None
+
+        result = self.core.library.get_stats()
+
+        self.assertEqual(LibraryStats(songs=3, last_update=10.0), result)
+
     def test_find_exact_combines_results_from_all_backends(self):
         track1 = Track(uri='dummy1:a')
         track2 = Track(uri='dummy2:a')
@@ -101,3 +279,59 @@ class CoreLibraryTest(unittest.TestCase):
         self.assertIn(track2, result.tracks)
         self.library1.search.assert_called_once_with(any=['a'])
         self.library2.search.assert_called_once_with(any=['a'])
+
+    def test_search_leaves_out_backends_that_time_out(self):
+        track1 = Track(uri='dummy1:a')
+        self.library1.search().get.return_value = Playlist(tracks=[track1])
+        self.library2.search().get.side_effect = pykka.Timeout
+
+        result = self.core.library.search(any=['a'])
+
+        self.assertEqual(
+            SearchResult(tracks=[track1], timed_out=['dummy2']), result)
+
+    def test_find_exact_leaves_out_backends_that_time_out(self):
+        track2 = Track(uri='dummy2:a')
+        self.library1.find_exact().get.side_effect = pykka.Timeout
+        self.library2.find_exact().get.return_value = Playlist(tracks=[track2])
+
+        result = self.core.library.find_exact(any=['a'])
+
+        self.assertEqual(
+            SearchResult(tracks=[track2], timed_out=['dummy1']), result)
+
+    def test_search_without_timeouts_has_no_timed_out_backends(self):
+        self.library1.search().get.return_value = Playlist()
+        self.library2.search().get.return_value = Playlist()
+
+        result = self.core.library.search(any=['a'])
+
+        self.assertEqual((), result.timed_out)
+
+    def test_get_distinct_leaves_out_backends_that_time_out(self):
+        self.library1.get_distinct().get.return_value = set(['a'])
+        self.library2.get_distinct().get.side_effect = pykka.Timeout
+
+        result = self.core.library.get_distinct('album')
+
+        self.assertEqual(set(['a']), result)
+
+    def test_browse_root_leaves_out_backends_that_time_out(self):
+        track = Track(uri='dummy1:a')
+        self.library1.browse().get.side_effect = pykka.Timeout
+        self.library2.browse().get.return_value = (['dummy2:d'], [track])
+
+        result = self.core.library.browse()
+
+        self.assertEqual((['dummy2:d'], [track]), result)
+
+    def test_search_backends_share_one_deadline(self):
+        self.library1.search().get.return_value = Playlist()
+        self.library2.search().get.return_value = Playlist()
+
+        settings.LIBRARY_SEARCH_TIMEOUT = 0.5
+        self.core.library.search(any=['a'])
+
+        for library in (self.library1, self.library2):
+            timeout = library.search().get.call_args[1]['timeout']
+            self.assertTrue(0 <= timeout <= 0.5)
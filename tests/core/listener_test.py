@@ -43,3 +43,9 @@ class CoreListenerTest(unittest.TestCase):
 
     def test_listener_has_default_impl_for_seeked(self):
         self.listener.seeked(0)
+
+    def test_listener_has_default_impl_for_library_update_started(self):
+        self.listener.library_update_started(1)
+
+    def test_listener_has_default_impl_for_library_update_finished(self):
+        self.listener.library_update_finished(1)
@@ -3,8 +3,9 @@ from __future__ import unicode_literals
 import mock
 
 from mopidy.backends import base
-from mopidy.core import Core, PlaybackState
-from mopidy.models import Track
+from mopidy.core import Core, CoreListener, PlaybackState, PlaybackStatus
+from mopidy.core.playback import ShuffleScheduler
+from mopidy.models import TlTrack, Track
 
 from tests import unittest
 
@@ -178,3 +179,294 @@ class CorePlaybackTest(unittest.TestCase):
         self.assertEqual(result, 0)
         self.assertFalse(self.playback1.get_time_position.called)
         self.assertFalse(self.playback2.get_time_position.called)
+
+    def test_get_status_contains_playback_state(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.repeat = True
+
+        status = self.core.playback.get_status()
+
+        self.assertEqual(PlaybackState.PLAYING, status.state)
+        self.assertEqual(self.tl_tracks[0], status.current_tl_track)
+        self.assertEqual(0, status.tracklist_position)
+        self.assertEqual(4, status.tracklist_length)
+        self.assertEqual(self.core.tracklist.version, status.tracklist_version)
+        self.assertTrue(status.repeat)
+        self.assertFalse(status.random)
+
+    def test_get_status_does_not_call_backend(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.playback1.reset_mock()
+
+        status = self.core.playback.get_status()
+
+        self.assertIs(status, self.core.playback.get_status())
+        self.assertEqual([], self.playback1.method_calls)
+
+    def test_get_status_is_updated_on_state_change(self):
+        self.core.playback.play(self.tl_tracks[0])
+        status = self.core.playback.get_status()
+
+        self.core.playback.pause()
+
+        self.assertEqual(PlaybackState.PLAYING, status.state)
+        self.assertEqual(
+            PlaybackState.PAUSED, self.core.playback.get_status().state)
+
+    @mock.patch('mopidy.core.playback.time')
+    def test_get_status_time_position_starts_at_zero_on_play(self, time_mock):
+        time_mock.time.return_value = 1000.0
+        self.core.playback.play(self.tl_tracks[0])
+
+        status = self.core.playback.get_status()
+
+        self.assertEqual(0, status.time_position)
+        self.assertEqual(1000.0, status.timestamp)
+
+    def test_get_status_time_position_is_read_from_backend_on_pause(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.playback1.get_time_position().get.return_value = 1000
+
+        self.core.playback.pause()
+
+        self.assertEqual(1000, self.core.playback.get_status().time_position)
+
+    def test_get_status_time_position_is_updated_on_seek(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.playback1.seek().get.return_value = True
+
+        self.core.playback.seek(2000)
+
+        self.assertEqual(2000, self.core.playback.get_status().time_position)
+
+    @mock.patch('mopidy.core.playback.time')
+    def test_get_status_time_position_is_kept_on_option_change(
+            self, time_mock):
+        time_mock.time.return_value = 1000.0
+        self.core.playback.play(self.tl_tracks[0])
+        self.playback1.reset_mock()
+
+        time_mock.time.return_value = 1001.5
+        self.core.playback.random = True
+        status = self.core.playback.get_status()
+
+        self.assertEqual(1500, status.time_position)
+        self.assertEqual(1001.5, status.timestamp)
+        self.assertFalse(self.playback1.get_time_position.called)
+
+    def test_get_status_is_updated_on_option_change(self):
+        status = self.core.playback.get_status()
+        self.core.playback.random = True
+
+        self.assertFalse(status.random)
+        self.assertTrue(self.core.playback.get_status().random)
+
+    def test_get_status_is_updated_on_tracklist_change(self):
+        status = self.core.playback.get_status()
+        self.core.tracklist.clear()
+
+        self.assertEqual(4, status.tracklist_length)
+        self.assertEqual(0, self.core.playback.get_status().tracklist_length)
+
+    def test_about_to_finish_queues_next_track_in_its_backend(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.on_about_to_finish()
+
+        self.playback2.change_track.assert_called_once_with(self.tracks[1])
+        self.assertFalse(self.playback1.change_track.called)
+
+    def test_about_to_finish_when_not_playing_does_nothing(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.pause()
+        self.core.playback.on_about_to_finish()
+
+        self.assertFalse(self.playback2.change_track.called)
+
+    def test_stream_changed_changes_to_queued_track_without_stopping(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.on_about_to_finish()
+        self.core.playback.on_stream_changed()
+
+        self.assertEqual(
+            self.tl_tracks[1], self.core.playback.current_tl_track)
+        self.assertEqual(PlaybackState.PLAYING, self.core.playback.state)
+        self.assertFalse(self.playback1.stop.called)
+        self.assertFalse(self.playback2.play.called)
+
+    def test_stream_changed_reports_previous_track_as_played_to_end(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.on_about_to_finish()
+
+        with mock.patch.object(CoreListener, 'send') as send:
+            self.core.playback.on_stream_changed()
+
+        send.assert_any_call(
+            'track_playback_ended', track=self.tracks[0], time_position=40000)
+
+    def test_stream_changed_with_consume_removes_previous_track(self):
+        self.core.playback.consume = True
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.on_about_to_finish()
+        self.core.playback.on_stream_changed()
+
+        self.assertNotIn(self.tl_tracks[0], self.core.tracklist.tl_tracks)
+
+    def test_stream_changed_without_queued_track_does_nothing(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.on_stream_changed()
+
+        self.assertEqual(
+            self.tl_tracks[0], self.core.playback.current_tl_track)
+
+    def test_end_of_track_plays_next_track_if_queueing_failed(self):
+        self.playback2.change_track.return_value.get.return_value = False
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.on_about_to_finish()
+        self.core.playback.on_end_of_track()
+        self.core.playback.on_stream_changed()
+
+        self.playback2.play.assert_called_once_with(self.tracks[1])
+        self.assertEqual(
+            self.tl_tracks[1], self.core.playback.current_tl_track)
+
+    def test_stop_forgets_queued_track(self):
+        self.core.playback.play(self.tl_tracks[0])
+        self.core.playback.on_about_to_finish()
+        self.core.playback.stop()
+        self.core.playback.on_stream_changed()
+
+        self.assertEqual(
+            self.tl_tracks[0], self.core.playback.current_tl_track)
+        self.assertEqual(PlaybackState.STOPPED, self.core.playback.state)
+
+
+class PlaybackStatusTest(unittest.TestCase):
+    def setUp(self):
+        self.tl_track = TlTrack(1, Track(uri='dummy1:a', length=40000))
+
+    def test_get_time_position_when_playing_is_extrapolated(self):
+        status = PlaybackStatus(
+            state=PlaybackState.PLAYING, current_tl_track=self.tl_track,
+            time_position=1000, timestamp=100.0)
+
+        self.assertEqual(1000, status.get_time_position(now=100.0))
+        self.assertEqual(3500, status.get_time_position(now=102.5))
+
+    def test_get_time_position_when_playing_stops_at_track_length(self):
+        status = PlaybackStatus(
+            state=PlaybackState.PLAYING, current_tl_track=self.tl_track,
+            time_position=39000, timestamp=100.0)
+
+        self.assertEqual(40000, status.get_time_position(now=110.0))
+
+    def test_get_time_position_when_paused_is_not_extrapolated(self):
+        status = PlaybackStatus(
+            state=PlaybackState.PAUSED, current_tl_track=self.tl_track,
+            time_position=1000, timestamp=100.0)
+
+        self.assertEqual(1000, status.get_time_position(now=110.0))
+
+
+class ShuffleSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.tl_tracks = [
+            TlTrack(i, Track(uri='dummy1:%d' % i)) for i in range(5)]
+        self.shuffler = ShuffleScheduler()
+
+    def play_all(self, refill=False):
+        played = []
+        while True:
+            tl_track = self.shuffler.get_next(self.tl_tracks, refill=refill)
+            if tl_track is None or tl_track in played:
+                return played
+            played.append(tl_track)
+            self.shuffler.played(tl_track)
+
+    def test_get_next_is_stable_until_removed(self):
+        tl_track = self.shuffler.get_next(self.tl_tracks, refill=False)
+        self.assertIn(tl_track, self.tl_tracks)
+        self.assertEqual(
+            tl_track, self.shuffler.get_next(self.tl_tracks, refill=False))
+
+        self.shuffler.remove([tl_track])
+
+        self.assertNotEqual(
+            tl_track, self.shuffler.get_next(self.tl_tracks, refill=False))
+
+    def test_every_track_is_picked_once(self):
+        played = self.play_all()
+        self.assertEqual(set(self.tl_tracks), set(played))
+        self.assertEqual(
+            None, self.shuffler.get_next(self.tl_tracks, refill=False))
+
+    def test_pool_is_refilled_when_asked_to(self):
+        self.play_all()
+        self.assertIn(
+            self.shuffler.get_next(self.tl_tracks, refill=True),
+            self.tl_tracks)
+
+    def test_added_tracks_are_picked(self):
+        self.shuffler.get_next(self.tl_tracks, refill=False)
+        tl_track = TlTrack(5, Track(uri='dummy1:5'))
+        self.shuffler.add([tl_track])
+        self.tl_tracks.append(tl_track)
+
+        self.assertEqual(set(self.tl_tracks), set(self.play_all()))
+
+    def test_removed_tracks_are_not_picked(self):
+        self.shuffler.get_next(self.tl_tracks, refill=False)
+        removed = self.tl_tracks[1:3]
+        self.shuffler.remove(removed)
+        del self.tl_tracks[1:3]
+
+        self.assertEqual(set(self.tl_tracks), set(self.play_all()))
+
+    def test_reset_forgets_played_tracks(self):
+        self.play_all()
+        self.shuffler.reset()
+        self.assertEqual(set(self.tl_tracks), set(self.play_all()))
+
+    @mock.patch('random.randrange')
+    def test_picks_track_at_random_position_in_pool(self, randrange):
+        randrange.side_effect = lambda n: n - 1
+
+        self.assertEqual(self.tl_tracks[::-1], self.play_all())
+
+    def test_history_is_empty_before_playing(self):
+        self.assertEqual(None, self.shuffler.get_previous())
+        self.assertEqual(None, self.shuffler.back())
+
+    def test_back_steps_through_played_tracks(self):
+        for tl_track in self.tl_tracks[:3]:
+            self.shuffler.played(tl_track)
+
+        self.assertEqual(self.tl_tracks[1], self.shuffler.get_previous())
+        self.assertEqual(self.tl_tracks[1], self.shuffler.back())
+        self.assertEqual(self.tl_tracks[0], self.shuffler.get_previous())
+
+        # Playing the track stepped back to does not add to the history
+        self.shuffler.played(self.tl_tracks[1])
+        self.assertEqual(self.tl_tracks[0], self.shuffler.back())
+        self.assertEqual(None, self.shuffler.back())
+
+    def test_history_is_bounded(self):
+        self.shuffler = ShuffleScheduler(history_size=2)
+        for tl_track in self.tl_tracks:
+            self.shuffler.played(tl_track)
+
+        self.assertEqual(self.tl_tracks[3], self.shuffler.back())
+        self.assertEqual(self.tl_tracks[2], self.shuffler.back())
+        self.assertEqual(None, self.shuffler.back())
+
+    def test_removed_tracks_are_dropped_from_history(self):
+        for tl_track in self.tl_tracks[:4]:
+            self.shuffler.played(tl_track)
+        self.shuffler.remove(self.tl_tracks[1:3])
+
+        self.assertEqual(self.tl_tracks[0], self.shuffler.back())
+        self.assertEqual(None, self.shuffler.back())
+
+    def test_reset_forgets_history(self):
+        self.play_all()
+        self.shuffler.reset()
+        self.assertEqual(None, self.shuffler.get_previous())
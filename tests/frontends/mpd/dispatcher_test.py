@@ -6,7 +6,8 @@ from mopidy import core
 from mopidy.backends import dummy
 from mopidy.frontends.mpd.dispatcher import MpdDispatcher
 from mopidy.frontends.mpd.exceptions import MpdAckError
-from mopidy.frontends.mpd.protocol import request_handlers, handle_request
+from mopidy.frontends.mpd.protocol import (
+    RequestHandlers, request_handlers, handle_request)
 
 from tests import unittest
 
@@ -58,3 +59,87 @@ class MpdDispatcherTest(unittest.TestCase):
         result = self.dispatcher.handle_request('known request')
         self.assertIn('OK', result)
         self.assertIn(expected, result)
+
+    def test_handling_request_returning_generator(self):
+        def handler(context):
+            yield [('file', 'a'), ('Pos', 0)]
+            yield {'file': 'b'}
+            yield 'line'
+        request_handlers['generator request'] = handler
+        result = self.dispatcher.handle_request('generator request')
+        self.assertEqual(
+            ['file: a', 'Pos: 0', 'file: b', 'line', 'OK'], list(result))
+
+    def test_handling_request_returning_generator_formats_lazily(self):
+        def handler(context):
+            yield 'line'
+            self.fail('Formatted more than was asked for')
+        request_handlers['lazy generator request'] = handler
+        result = self.dispatcher.handle_request('lazy generator request')
+        self.assertEqual('line', next(result))
+
+    def test_handling_request_returning_generator_raising_error(self):
+        def handler(context):
+            yield 'line'
+            raise MpdAckError('error', command='failing')
+        request_handlers['failing generator request'] = handler
+        result = self.dispatcher.handle_request('failing generator request')
+        self.assertEqual(['line', 'ACK [0@0] {failing} error'], list(result))
+
+
+class RequestHandlersTest(unittest.TestCase):
+    def setUp(self):
+        self.handlers = RequestHandlers()
+        self.handler1 = lambda context: None
+        self.handler2 = lambda context: None
+
+    def test_find_returns_handler_and_kwargs(self):
+        self.handlers['^foo "(?P<arg>[^"]+)"$'] = self.handler1
+        self.assertEqual(
+            (self.handler1, {'arg': 'bar'}),
+            self.handlers.find('foo "bar"'))
+
+    def test_find_returns_none_if_no_pattern_matches(self):
+        self.handlers['^foo$'] = self.handler1
+        self.assertEqual(None, self.handlers.find('foo "bar"'))
+        self.assertEqual(None, self.handlers.find('bar'))
+
+    def test_find_does_not_match_longer_command_names(self):
+        self.handlers['^foo$'] = self.handler1
+        self.handlers['^foo( (?P<arg>.+))*$'] = self.handler1
+        self.assertEqual(None, self.handlers.find('foobar'))
+
+    def test_find_prefers_pattern_with_fewer_groups(self):
+        self.handlers['^foo "(?P<arg>-?\\d+)"$'] = self.handler1
+        self.handlers['^foo "-1"$'] = self.handler2
+        self.assertEqual((self.handler2, {}), self.handlers.find('foo "-1"'))
+
+    def test_find_tries_patterns_without_command_name(self):
+        self.handlers['^foo$'] = self.handler1
+        self.handlers['^[ ]*$'] = self.handler2
+        self.handlers['bar (?P<arg>.+)'] = self.handler1
+        self.assertEqual((self.handler2, {}), self.handlers.find(''))
+        self.assertEqual(
+            (self.handler1, {'arg': 'baz'}), self.handlers.find('bar baz'))
+
+    def test_find_uses_handlers_added_after_earlier_finds(self):
+        self.handlers['^foo$'] = self.handler1
+        self.assertEqual((self.handler1, {}), self.handlers.find('foo'))
+        self.handlers['^foo$'] = self.handler2
+        self.assertEqual((self.handler2, {}), self.handlers.find('foo'))
+        del self.handlers['^foo$']
+        self.assertEqual(None, self.handlers.find('foo'))
+
+    def test_find_uses_handlers_changed_through_dict_methods(self):
+        self.handlers.update({'^foo$': self.handler1})
+        self.handlers.setdefault('^bar$', self.handler2)
+        self.assertEqual((self.handler1, {}), self.handlers.find('foo'))
+        self.assertEqual((self.handler2, {}), self.handlers.find('bar'))
+        self.assertEqual(self.handler1, self.handlers.pop('^foo$'))
+        self.assertEqual(None, self.handlers.find('foo'))
+        self.assertEqual(('^bar$', self.handler2), self.handlers.popitem())
+        self.assertEqual(None, self.handlers.find('bar'))
+        self.handlers['^baz$'] = self.handler1
+        self.assertEqual((self.handler1, {}), self.handlers.find('baz'))
+        self.handlers.clear()
+        self.assertEqual(None, self.handlers.find('baz'))
@@ -38,7 +38,7 @@ class BaseTestCase(unittest.TestCase):
 
     def sendRequest(self, request):
         self.connection.response = []
-        request = '%s\n' % request.encode('utf-8')
+        request = b'%s\n' % request.encode('utf-8')
         self.session.on_receive({'received': request})
         return self.connection.response
 
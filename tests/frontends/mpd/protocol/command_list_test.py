@@ -1,5 +1,8 @@
 from __future__ import unicode_literals
 
+from mopidy import settings
+from mopidy.models import Playlist, Track
+
 from tests.frontends.mpd import protocol
 
 
@@ -60,6 +63,167 @@ class CommandListsTest(protocol.BaseTestCase):
         self.assertFalse(self.dispatcher.command_list_ok)
         self.assertEqual([], self.dispatcher.command_list)
 
+    def test_command_list_of_adds_bumps_tracklist_version_once(self):
+        self.backend.library.dummy_library = [
+            Track(uri='dummy:a'), Track(uri='dummy:b')]
+        version = self.core.tracklist.version.get()
+
+        self.sendRequest('command_list_ok_begin')
+        self.sendRequest('add "dummy:a"')
+        self.sendRequest('add ""')
+        self.sendRequest('add "dummy:b"')
+        self.sendRequest('command_list_end')
+
+        self.assertEqual(
+            ['list_OK', 'list_OK', 'list_OK', 'OK'], self.connection.response)
+        self.assertEqual(
+            ['dummy:a', 'dummy:b'],
+            [t.uri for t in self.core.tracklist.tracks.get()])
+        self.assertEqual(version + 1, self.core.tracklist.version.get())
+
+    def test_command_list_of_adds_stops_at_unknown_uri(self):
+        self.backend.library.dummy_library = [
+            Track(uri='dummy:a'), Track(uri='dummy:b')]
+
+        self.sendRequest('command_list_ok_begin')
+        self.sendRequest('add "dummy:a"')
+        self.sendRequest('add "dummy:unknown"')
+        self.sendRequest('add "dummy:b"')
+        self.sendRequest('command_list_end')
+
+        self.assertEqual(
+            ['list_OK', 'ACK [50@1] {add} directory or file not found'],
+            self.connection.response)
+        self.assertEqual(
+            ['dummy:a'], [t.uri for t in self.core.tracklist.tracks.get()])
+
+    def test_command_list_of_addids_returns_ids_in_request_order(self):
+        self.backend.library.dummy_library = [
+            Track(uri='dummy:a'), Track(uri='dummy:b'), Track(uri='dummy:c')]
+
+        self.sendRequest('command_list_ok_begin')
+        self.sendRequest('addid "dummy:a"')
+        self.sendRequest('addid "dummy:b" "0"')
+        self.sendRequest('addid "dummy:c"')
+        self.sendRequest('command_list_end')
+
+        tl_tracks = self.core.tracklist.tl_tracks.get()
+        self.assertEqual(
+            ['dummy:b', 'dummy:a', 'dummy:c'],
+            [tl_track.track.uri for tl_track in tl_tracks])
+        self.assertEqual([
+            'Id: %d' % tl_tracks[1].tlid, 'list_OK',
+            'Id: %d' % tl_tracks[0].tlid, 'list_OK',
+            'Id: %d' % tl_tracks[2].tlid, 'list_OK',
+            'OK'], self.connection.response)
+
+    def test_command_list_of_addids_stops_at_bad_song_index(self):
+        self.backend.library.dummy_library = [
+            Track(uri='dummy:a'), Track(uri='dummy:b')]
+
+        self.sendRequest('command_list_begin')
+        self.sendRequest('addid "dummy:a"')
+        self.sendRequest('addid "dummy:b" "2"')
+        self.sendRequest('addid "dummy:a"')
+        self.sendRequest('command_list_end')
+
+        tl_tracks = self.core.tracklist.tl_tracks.get()
+        self.assertEqual(1, len(tl_tracks))
+        self.assertEqual([
+            'Id: %d' % tl_tracks[0].tlid,
+            'ACK [2@1] {addid} Bad song index'], self.connection.response)
+
+    def test_command_list_of_deleteids_stops_at_unknown_id(self):
+        tl_tracks = self.core.tracklist.append(
+            [Track(uri='dummy:a'), Track(uri='dummy:b'),
+             Track(uri='dummy:c')]).get()
+        version = self.core.tracklist.version.get()
+
+        self.sendRequest('command_list_begin')
+        self.sendRequest('deleteid "%d"' % tl_tracks[0].tlid)
+        self.sendRequest('deleteid "%d"' % tl_tracks[2].tlid)
+        self.sendRequest('deleteid "%d"' % tl_tracks[0].tlid)
+        self.sendRequest('deleteid "%d"' % tl_tracks[1].tlid)
+        self.sendRequest('command_list_end')
+
+        self.assertEqualResponse('ACK [50@2] {deleteid} No such song')
+        self.assertEqual(
+            (tl_tracks[1],), self.core.tracklist.tl_tracks.get())
+        self.assertEqual(version + 1, self.core.tracklist.version.get())
+
+    def test_command_list_of_deleteids_skips_current_track(self):
+        tl_tracks = self.core.tracklist.append(
+            [Track(uri='dummy:a'), Track(uri='dummy:b'),
+             Track(uri='dummy:c')]).get()
+        self.core.playback.play(tl_tracks[0]).get()
+
+        self.sendRequest('command_list_begin')
+        self.sendRequest('deleteid "%d"' % tl_tracks[0].tlid)
+        self.sendRequest('deleteid "%d"' % tl_tracks[2].tlid)
+        self.sendRequest('command_list_end')
+
+        self.assertInResponse('OK')
+        self.assertEqual(
+            (tl_tracks[1],), self.core.tracklist.tl_tracks.get())
+        self.assertEqual(
+            tl_tracks[1], self.core.playback.current_tl_track.get())
+
+    def test_command_list_of_finds_returns_results_in_request_order(self):
+        self.backend.library.dummy_find_exact_result = Playlist(
+            tracks=[Track(uri='dummy:a')])
+
+        self.sendRequest('command_list_ok_begin')
+        self.sendRequest('find "artist" "foo"')
+        self.sendRequest('find "album" "bar"')
+        self.sendRequest('command_list_end')
+
+        response = self.connection.response
+        self.assertEqual(2, response.count('list_OK'))
+        first_list_ok = response.index('list_OK')
+        self.assertIn('file: dummy:a', response[:first_list_ok])
+        self.assertIn('file: dummy:a', response[first_list_ok + 1:])
+        self.assertEqual('OK', response[-1])
+
+    def test_command_list_of_lists_stops_at_bad_query(self):
+        self.sendRequest('command_list_begin')
+        self.sendRequest('list "artist"')
+        self.sendRequest('list "album" "artist" "foo"')
+        self.sendRequest('list "artist" "foo"')
+        self.sendRequest('list "album"')
+        self.sendRequest('command_list_end')
+
+        self.assertEqualResponse(
+            'ACK [2@2] {list} should be "Album" for 3 arguments')
+
+    def test_command_list_of_listplaylistinfos_stops_at_unknown_name(self):
+        self.backend.playlists.playlists = [
+            Playlist(name='name', tracks=[Track(uri='dummy:a')])]
+
+        self.sendRequest('command_list_ok_begin')
+        self.sendRequest('listplaylistinfo "name"')
+        self.sendRequest('listplaylistinfo "unknown"')
+        self.sendRequest('listplaylistinfo "name"')
+        self.sendRequest('command_list_end')
+
+        response = self.connection.response
+        self.assertEqual('file: dummy:a', response[0])
+        self.assertEqual('list_OK', response[-2])
+        self.assertEqual(
+            'ACK [50@1] {listplaylistinfo} No such playlist', response[-1])
+
+    def test_command_list_of_adds_requires_authentication(self):
+        settings.MPD_SERVER_PASSWORD = 'topsecret'
+        self.backend.library.dummy_library = [
+            Track(uri='dummy:a'), Track(uri='dummy:b')]
+
+        response = self.dispatcher.handle_command_list(
+            ['add "dummy:a"', 'add "dummy:b"'])
+
+        self.assertEqual(
+            ['ACK [4@0] {add} you don\'t have permission for "add"'],
+            response)
+        self.assertEqual(0, self.core.tracklist.length.get())
+
     # FIXME this should also include the special handling of idle within a
     # command list. That is that once a idle/noidle command is found inside a
     # commad list, the rest of the list seems to be ignored.
@@ -125,6 +125,15 @@ class CurrentPlaylistHandlerTest(protocol.BaseTestCase):
         self.assertEqual(len(self.core.tracklist.tracks.get()), 3)
         self.assertInResponse('OK')
 
+    def test_delete_range_increases_version_once(self):
+        self.core.tracklist.append(
+            [Track(), Track(), Track(), Track(), Track()])
+        version = self.core.tracklist.version.get()
+
+        self.sendRequest('delete "1:4"')
+        self.assertEqual(version + 1, self.core.tracklist.version.get())
+        self.assertInResponse('OK')
+
     def test_delete_range_out_of_bounds(self):
         self.core.tracklist.append(
             [Track(), Track(), Track(), Track(), Track()])
@@ -418,6 +427,20 @@ class CurrentPlaylistHandlerTest(protocol.BaseTestCase):
         self.assertInResponse('Title: c')
         self.assertInResponse('OK')
 
+    def test_plchanges_returns_only_changed_tracks(self):
+        self.core.tracklist.append(
+            [Track(name='a'), Track(name='b'), Track(name='c')])
+        version = self.core.tracklist.version.get()
+        self.core.tracklist.append([Track(name='d')])
+
+        self.sendRequest('plchanges "%d"' % version)
+        self.assertNotInResponse('Title: a')
+        self.assertNotInResponse('Title: b')
+        self.assertNotInResponse('Title: c')
+        self.assertInResponse('Title: d')
+        self.assertInResponse('Pos: 3')
+        self.assertInResponse('OK')
+
     def test_plchangesposid(self):
         self.core.tracklist.append([Track(), Track(), Track()])
 
@@ -431,6 +454,21 @@ class CurrentPlaylistHandlerTest(protocol.BaseTestCase):
         self.assertInResponse('Id: %d' % tl_tracks[2].tlid)
         self.assertInResponse('OK')
 
+    def test_plchangesposid_returns_only_changed_tracks(self):
+        self.core.tracklist.append([Track(), Track(), Track()])
+        version = self.core.tracklist.version.get()
+        self.core.tracklist.swap(0, 2)
+
+        self.sendRequest('plchangesposid "%d"' % version)
+        tl_tracks = self.core.tracklist.tl_tracks.get()
+        self.assertInResponse('cpos: 0')
+        self.assertInResponse('Id: %d' % tl_tracks[0].tlid)
+        self.assertNotInResponse('cpos: 1')
+        self.assertNotInResponse('Id: %d' % tl_tracks[1].tlid)
+        self.assertInResponse('cpos: 2')
+        self.assertInResponse('Id: %d' % tl_tracks[2].tlid)
+        self.assertInResponse('OK')
+
     def test_shuffle_without_range(self):
         self.core.tracklist.append([
             Track(name='a'), Track(name='b'), Track(name='c'),
@@ -490,6 +528,16 @@ class CurrentPlaylistHandlerTest(protocol.BaseTestCase):
         self.assertEqual(tracks[5].name, 'f')
         self.assertInResponse('OK')
 
+    def test_swap_keeps_song_ids(self):
+        tl_tracks = self.core.tracklist.append(
+            [Track(name='a'), Track(name='b')]).get()
+
+        self.sendRequest('swap "0" "1"')
+        self.assertEqual(
+            (tl_tracks[1], tl_tracks[0]),
+            self.core.tracklist.tl_tracks.get())
+        self.assertInResponse('OK')
+
     def test_swapid(self):
         self.core.tracklist.append([
             Track(name='a'), Track(name='b'), Track(name='c'),
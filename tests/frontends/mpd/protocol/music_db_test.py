@@ -1,26 +1,114 @@
 from __future__ import unicode_literals
 
+import mock
+
+from mopidy.models import Artist, Playlist, Track
+
 from tests.frontends.mpd import protocol
 
 
 class MusicDatabaseHandlerTest(protocol.BaseTestCase):
     def test_count(self):
-        self.sendRequest('count "tag" "needle"')
+        self.sendRequest('count "artist" "needle"')
         self.assertInResponse('songs: 0')
         self.assertInResponse('playtime: 0')
         self.assertInResponse('OK')
 
+    def test_count_with_matches(self):
+        self.backend.library.dummy_find_exact_result = Playlist(tracks=[
+            Track(uri='dummy:a', length=60000),
+            Track(uri='dummy:b', length=30000)])
+        self.sendRequest('count "artist" "needle"')
+        self.assertInResponse('songs: 2')
+        self.assertInResponse('playtime: 90')
+        self.assertInResponse('OK')
+
+    def test_count_date(self):
+        self.backend.library.dummy_find_exact_result = Playlist(tracks=[
+            Track(uri='dummy:a', date='2009', length=60000)])
+        self.sendRequest('count "date" "2009"')
+        self.assertInResponse('songs: 1')
+        self.assertInResponse('playtime: 60')
+        self.assertInResponse('OK')
+
+    def test_count_passes_tag_as_mopidy_field(self):
+        self.context.core = mock.Mock()
+        self.context.core.library.count.return_value.get.return_value = (
+            0, 0)
+        self.sendRequest('count "Title" "needle"')
+        self.context.core.library.count.assert_called_once_with(
+            track=['needle'])
+
+    def test_count_with_unknown_tag(self):
+        self.sendRequest('count "composer" "needle"')
+        self.assertEqualResponse('ACK [2@0] {count} incorrect arguments')
+
     def test_findadd(self):
         self.sendRequest('findadd "album" "what"')
         self.assertInResponse('OK')
 
+    def set_dummy_directories(self):
+        self.backend.library.dummy_directories = {
+            None: (['dummy:a'], [Track(uri='dummy:x', name='X')]),
+            'dummy:a': (['dummy:a/b'], [Track(uri='dummy:a/y', name='Y')]),
+            'dummy:a/b': ([], [Track(uri='dummy:a/b/z', name='Z')]),
+        }
+
     def test_listall(self):
+        self.set_dummy_directories()
+        response = self.sendRequest('listall "dummy:a"')
+        self.assertEqual([
+            'file: dummy:a/y', 'directory: dummy:a/b', 'file: dummy:a/b/z',
+            'OK'], response)
+
+    def test_listall_without_uri(self):
+        self.set_dummy_directories()
+        response = self.sendRequest('listall')
+        self.assertEqual([
+            'file: dummy:x', 'directory: dummy:a', 'file: dummy:a/y',
+            'directory: dummy:a/b', 'file: dummy:a/b/z', 'OK'], response)
+
+    def test_listall_unknown_directory(self):
         self.sendRequest('listall "file:///dev/urandom"')
-        self.assertEqualResponse('ACK [0@0] {} Not implemented')
+        self.assertEqualResponse(
+            'ACK [50@0] {listall} directory or file not found')
 
     def test_listallinfo(self):
+        self.set_dummy_directories()
+        self.sendRequest('listallinfo "dummy:a"')
+        self.assertInResponse('file: dummy:a/y')
+        self.assertInResponse('Title: Y')
+        self.assertInResponse('directory: dummy:a/b')
+        self.assertInResponse('file: dummy:a/b/z')
+        self.assertInResponse('Title: Z')
+        self.assertNotInResponse('file: dummy:x')
+        self.assertInResponse('OK')
+
+    def test_listallinfo_unknown_directory(self):
         self.sendRequest('listallinfo "file:///dev/urandom"')
-        self.assertEqualResponse('ACK [0@0] {} Not implemented')
+        self.assertEqualResponse(
+            'ACK [50@0] {listallinfo} directory or file not found')
+
+    def test_lsinfo_with_directory(self):
+        self.set_dummy_directories()
+        self.sendRequest('lsinfo "dummy:a"')
+        self.assertInResponse('directory: dummy:a/b')
+        self.assertInResponse('file: dummy:a/y')
+        self.assertInResponse('Title: Y')
+        self.assertNotInResponse('file: dummy:a/b/z')
+        self.assertInResponse('OK')
+
+    def test_lsinfo_for_root_includes_directories_and_tracks(self):
+        self.set_dummy_directories()
+        self.sendRequest('lsinfo "/"')
+        self.assertInResponse('directory: dummy:a')
+        self.assertInResponse('file: dummy:x')
+        self.assertInResponse('OK')
+
+    def test_lsinfo_unknown_directory(self):
+        self.sendRequest('lsinfo "dummy:unknown"')
+        self.assertEqualResponse(
+            'ACK [50@0] {lsinfo} directory or file not found')
 
     def test_lsinfo_without_path_returns_same_as_listplaylists(self):
         lsinfo_response = self.sendRequest('lsinfo')
@@ -39,24 +127,46 @@ class MusicDatabaseHandlerTest(protocol.BaseTestCase):
 
     def test_update_without_uri(self):
         self.sendRequest('update')
-        self.assertInResponse('updating_db: 0')
+        self.assertInResponse('updating_db: 1')
         self.assertInResponse('OK')
 
     def test_update_with_uri(self):
         self.sendRequest('update "file:///dev/urandom"')
-        self.assertInResponse('updating_db: 0')
+        self.assertInResponse('updating_db: 1')
+        self.assertInResponse('OK')
+
+    def test_update_with_relative_path_passes_path_to_core(self):
+        self.context.core = mock.Mock()
+        self.context.core.library.update.return_value.get.return_value = 1
+        self.sendRequest('update "Artist/Album"')
+        self.context.core.library.update.assert_called_once_with(
+            'Artist/Album')
+        self.assertInResponse('updating_db: 1')
         self.assertInResponse('OK')
 
+    def test_update_returns_new_job_id_each_time(self):
+        self.sendRequest('update')
+        self.assertInResponse('updating_db: 1')
+        self.sendRequest('update')
+        self.assertInResponse('updating_db: 2')
+
     def test_rescan_without_uri(self):
         self.sendRequest('rescan')
-        self.assertInResponse('updating_db: 0')
+        self.assertInResponse('updating_db: 1')
         self.assertInResponse('OK')
 
     def test_rescan_with_uri(self):
         self.sendRequest('rescan "file:///dev/urandom"')
-        self.assertInResponse('updating_db: 0')
+        self.assertInResponse('updating_db: 1')
         self.assertInResponse('OK')
 
+    def test_rescan_with_relative_path_passes_path_to_core(self):
+        self.context.core = mock.Mock()
+        self.context.core.library.update.return_value.get.return_value = 1
+        self.sendRequest('rescan "Artist/Album"')
+        self.context.core.library.update.assert_called_once_with(
+            'Artist/Album')
+
 
 class MusicDatabaseFindTest(protocol.BaseTestCase):
     def test_find_album(self):
@@ -173,6 +283,16 @@ class MusicDatabaseListTest(protocol.BaseTestCase):
             'list "artist" "artist" "anartist" "album" "analbum"')
         self.assertInResponse('OK')
 
+    def test_list_artist_returns_distinct_artists(self):
+        self.backend.library.dummy_find_exact_result = Playlist(tracks=[
+            Track(uri='dummy:a', artists=[Artist(name='A')]),
+            Track(uri='dummy:b', artists=[Artist(name='A')]),
+            Track(uri='dummy:c', artists=[Artist(name='B')])])
+        self.sendRequest('list "artist"')
+        self.assertInResponse('Artist: A')
+        self.assertInResponse('Artist: B')
+        self.assertEqual(3, len(self.connection.response))
+
     ### Album
 
     def test_list_album_with_quotes(self):
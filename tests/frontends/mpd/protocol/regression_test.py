@@ -26,7 +26,7 @@ class IssueGH17RegressionTest(protocol.BaseTestCase):
             Track(uri='dummy:e'),
             Track(uri='dummy:f'),
         ])
-        random.seed(1)  # Playlist order: abcfde
+        random.seed(3)  # Shuffled order: b, error, f, d, e, a
 
         self.sendRequest('play')
         self.assertEquals('dummy:a',
@@ -36,7 +36,8 @@ class IssueGH17RegressionTest(protocol.BaseTestCase):
         self.assertEquals('dummy:b',
             self.core.playback.current_track.get().uri)
         self.sendRequest('next')
-        # Should now be at track 'c', but playback fails and it skips ahead
+        # Should now be at track 'error', but playback fails and it skips
+        # ahead
         self.assertEquals('dummy:f',
             self.core.playback.current_track.get().uri)
         self.sendRequest('next')
@@ -11,11 +11,11 @@ class StatusHandlerTest(protocol.BaseTestCase):
         self.assertEqualResponse('ACK [0@0] {} Not implemented')
 
     def test_currentsong(self):
-        track = Track()
+        track = Track(uri='dummy:a')
         self.core.tracklist.append([track])
         self.core.playback.play()
         self.sendRequest('currentsong')
-        self.assertInResponse('file: ')
+        self.assertInResponse('file: dummy:a')
         self.assertInResponse('Time: 0')
         self.assertInResponse('Artist: ')
         self.assertInResponse('Title: ')
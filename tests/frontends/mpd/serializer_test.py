@@ -95,6 +95,31 @@ class TrackMpdFormatTest(unittest.TestCase):
         result = translator.track_to_mpd_format(track)
         self.assertIn(('MUSICBRAINZ_ARTISTID', 'foo'), result)
 
+    def test_track_to_mpd_format_caches_formatted_track(self):
+        translator.track_cache.clear()
+        result1 = translator.track_to_mpd_format(self.track)
+        result2 = translator.track_to_mpd_format(self.track.copy())
+        self.assertEqual(result1, result2)
+        self.assertIsNot(result1, result2)
+        self.assertEqual(1, len(translator.track_cache))
+
+    def test_track_to_mpd_format_adds_position_to_cached_track(self):
+        track = self.track.copy(musicbrainz_id='foo')
+        translator.track_to_mpd_format(track)
+        result = translator.track_to_mpd_format(
+            TlTrack(2, track), position=1)
+        self.assertEqual(
+            [('Pos', 1), ('Id', 2), ('MUSICBRAINZ_TRACKID', 'foo')],
+            result[-3:])
+
+    def test_track_to_mpd_format_does_not_cache_track_subclasses(self):
+        class TrackSubclass(Track):
+            pass
+
+        translator.track_cache.clear()
+        translator.track_to_mpd_format(TrackSubclass(uri='a uri'))
+        self.assertEqual(0, len(translator.track_cache))
+
     def test_artists_to_mpd_format(self):
         artists = [Artist(name='ABBA'), Artist(name='Beatles')]
         translated = translator.artists_to_mpd_format(artists)
@@ -121,6 +146,58 @@ class PlaylistMpdFormatTest(unittest.TestCase):
         self.assertEqual(dict(result[0])['Track'], 2)
 
 
+class TracksMpdFormatTest(unittest.TestCase):
+    def test_iter_tracks_to_mpd_format_is_lazy(self):
+        tracks = [Track(track_no=1), Track(track_no=2), Track(track_no=3)]
+        result = translator.iter_tracks_to_mpd_format(tracks, 1)
+        self.assertEqual(2, dict(result.next())['Track'])
+        self.assertEqual(3, dict(result.next())['Track'])
+        self.assertRaises(StopIteration, result.next)
+
+    def test_iter_tracks_to_mpd_format_includes_positions(self):
+        tl_tracks = [TlTrack(5, Track()), TlTrack(7, Track())]
+        result = list(translator.iter_tracks_to_mpd_format(tl_tracks))
+        self.assertEqual(0, dict(result[0])['Pos'])
+        self.assertEqual(5, dict(result[0])['Id'])
+        self.assertEqual(1, dict(result[1])['Pos'])
+        self.assertEqual(7, dict(result[1])['Id'])
+
+
+class TrackCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = translator.TrackCache(4)
+
+    def test_get_missing_track(self):
+        self.assertEqual(None, self.cache.get(Track(uri='a')))
+
+    def test_set_and_get(self):
+        self.cache.set(Track(uri='a'), 1)
+        self.assertEqual(1, self.cache.get(Track(uri='a')))
+
+    def test_evicts_least_recently_used_track(self):
+        self.cache.set(Track(uri='a'), 1)
+        self.cache.set(Track(uri='b'), 2)
+        self.cache.set(Track(uri='c'), 3)
+        self.cache.get(Track(uri='a'))
+        self.cache.set(Track(uri='d'), 4)
+        self.assertEqual(3, len(self.cache))
+        self.assertEqual(1, self.cache.get(Track(uri='a')))
+        self.assertEqual(None, self.cache.get(Track(uri='b')))
+        self.assertEqual(3, self.cache.get(Track(uri='c')))
+        self.assertEqual(4, self.cache.get(Track(uri='d')))
+
+    def test_never_holds_more_than_size_tracks(self):
+        for i in range(10):
+            self.cache.set(Track(uri='%d' % i), i)
+            self.cache.get(Track(uri='%d' % (i - 1)))
+            self.assertLessEqual(len(self.cache), 4)
+
+    def test_clear(self):
+        self.cache.set(Track(uri='a'), 1)
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+
+
 class TracksToTagCacheFormatTest(unittest.TestCase):
     def setUp(self):
         settings.LOCAL_MUSIC_PATH = '/dir/subdir'
@@ -1,5 +1,6 @@
 from __future__ import unicode_literals
 
+import mock
 import pykka
 
 from mopidy import core
@@ -7,7 +8,7 @@ from mopidy.backends import dummy
 from mopidy.core import PlaybackState
 from mopidy.frontends.mpd import dispatcher
 from mopidy.frontends.mpd.protocol import status
-from mopidy.models import Track
+from mopidy.models import LibraryStats, Track
 
 from tests import unittest
 
@@ -47,6 +48,19 @@ class StatusHandlerTest(unittest.TestCase):
         self.assertIn('playtime', result)
         self.assertGreaterEqual(int(result['playtime']), 0)
 
+    def test_stats_method_contains_library_stats(self):
+        stats = LibraryStats(
+            artists=1, albums=2, songs=3, playtime=4500, last_update=10.5)
+        with mock.patch.object(
+                core.LibraryController, 'get_stats', autospec=True,
+                return_value=stats):
+            result = status.stats(self.context)
+        self.assertEqual(1, result['artists'])
+        self.assertEqual(2, result['albums'])
+        self.assertEqual(3, result['songs'])
+        self.assertEqual(4, result['db_playtime'])
+        self.assertEqual(10, result['db_update'])
+
     def test_status_method_contains_volume_with_na_value(self):
         result = dict(status.status(self.context))
         self.assertIn('volume', result)
@@ -187,3 +201,15 @@ class StatusHandlerTest(unittest.TestCase):
         result = dict(status.status(self.context))
         self.assertIn('bitrate', result)
         self.assertEqual(int(result['bitrate']), 320)
+
+    def test_status_method_when_not_updating_lacks_updating_db(self):
+        result = dict(status.status(self.context))
+        self.assertNotIn('updating_db', result)
+
+    def test_status_method_when_updating_contains_updating_db(self):
+        with mock.patch.object(
+                core.LibraryController, 'updating',
+                new_callable=mock.PropertyMock, return_value=3):
+            result = dict(status.status(self.context))
+        self.assertIn('updating_db', result)
+        self.assertEqual(int(result['updating_db']), 3)
@@ -1,8 +1,10 @@
 from __future__ import unicode_literals
 
+import cPickle as pickle
 import datetime
 
-from mopidy.models import Artist, Album, TlTrack, Track, Playlist
+from mopidy.models import (
+    Artist, Album, ModelInterner, TlTrack, Track, Playlist, SearchResult)
 
 from tests import unittest
 
@@ -52,6 +54,28 @@ class GenericCopyTest(unittest.TestCase):
         self.assertRaises(TypeError, test)
 
 
+class ImmutableObjectTest(unittest.TestCase):
+    def test_models_have_no_instance_dict(self):
+        for model in (Artist(), Album(), Track(), TlTrack(), Playlist()):
+            self.assertFalse(hasattr(model, '__dict__'))
+
+    def test_explicit_default_value_is_equal_to_missing_value(self):
+        self.assertEqual(Artist(), Artist(name=None))
+        self.assertEqual(hash(Artist()), hash(Artist(name=None)))
+
+    def test_hash_is_cached(self):
+        track = Track(uri='uri')
+        self.assertEqual(hash(track), track._hash)
+
+    def test_pickle(self):
+        track = Track(
+            uri='uri', name='name', artists=[Artist(name='foo')],
+            album=Album(name='bar'))
+        copy = pickle.loads(pickle.dumps(track, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(track, copy)
+        self.assertEqual(hash(track), hash(copy))
+
+
 class ArtistTest(unittest.TestCase):
     def test_uri(self):
         uri = 'an_uri'
@@ -801,3 +825,58 @@ class PlaylistTest(unittest.TestCase):
             last_modified=2)
         self.assertNotEqual(playlist1, playlist2)
         self.assertNotEqual(hash(playlist1), hash(playlist2))
+
+
+class SearchResultTest(unittest.TestCase):
+    def test_tracks(self):
+        tracks = [Track(), Track(), Track()]
+        result = SearchResult(tracks=tracks)
+        self.assertEqual(list(result.tracks), tracks)
+        self.assertEqual(3, result.length)
+
+    def test_timed_out(self):
+        result = SearchResult(timed_out=['spotify'])
+        self.assertEqual(('spotify',), result.timed_out)
+        self.assertRaises(AttributeError, setattr, result, 'timed_out', None)
+
+    def test_is_a_playlist(self):
+        self.assertIsInstance(SearchResult(), Playlist)
+
+    def test_serialize_with_timed_out(self):
+        track = Track(name='foo')
+        self.assertDictEqual(
+            {'tracks': [track.serialize()], 'timed_out': ['spotify']},
+            SearchResult(tracks=[track], timed_out=['spotify']).serialize())
+
+    def test_eq(self):
+        result1 = SearchResult(tracks=[Track()], timed_out=['spotify'])
+        result2 = SearchResult(tracks=[Track()], timed_out=['spotify'])
+        self.assertEqual(result1, result2)
+        self.assertEqual(hash(result1), hash(result2))
+
+    def test_ne_timed_out(self):
+        self.assertNotEqual(
+            SearchResult(timed_out=['spotify']), SearchResult())
+
+
+class ModelInternerTest(unittest.TestCase):
+    def setUp(self):
+        self.interner = ModelInterner()
+
+    def test_intern_returns_first_equal_instance(self):
+        artist1 = Artist(name='name')
+        artist2 = Artist(name='name')
+        self.assertIs(artist1, self.interner.intern(artist1))
+        self.assertIs(artist1, self.interner.intern(artist2))
+
+    def test_intern_keeps_different_instances(self):
+        album1 = Album(name='name1')
+        album2 = Album(name='name2')
+        self.assertIs(album1, self.interner.intern(album1))
+        self.assertIs(album2, self.interner.intern(album2))
+        self.assertEqual(2, len(self.interner))
+
+    def test_intern_distinguishes_model_types(self):
+        self.interner.intern(Artist())
+        self.interner.intern(Album())
+        self.assertEqual(2, len(self.interner))
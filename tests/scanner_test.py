@@ -1,9 +1,15 @@
 from __future__ import unicode_literals
 
 from datetime import date
+import os
+import shutil
+import tempfile
 
-from mopidy.scanner import Scanner, translator
+from mopidy.scanner import (
+    Checkpoint, Scanner, find_unchanged_tracks, load_file_sizes,
+    save_file_sizes, translator)
 from mopidy.models import Track, Artist, Album
+from mopidy.utils.path import path_to_uri
 
 from tests import unittest, path_to_data_dir
 
@@ -135,10 +141,12 @@ class ScannerTest(unittest.TestCase):
         self.errors = {}
         self.data = {}
 
-    def scan(self, path):
+    def scan(self, path, **kwargs):
         scanner = Scanner(
-            path_to_data_dir(path), self.data_callback, self.error_callback)
+            path_to_data_dir(path), self.data_callback, self.error_callback,
+            **kwargs)
         scanner.start()
+        return scanner
 
     def check(self, name, key, value):
         name = path_to_data_dir(name)
@@ -193,3 +201,138 @@ class ScannerTest(unittest.TestCase):
     @unittest.SkipTest
     def test_song_without_time_is_handeled(self):
         pass
+
+    def test_scan_with_several_workers_finds_all_files(self):
+        self.scan('scanner/advanced')
+        data = self.data
+        self.data = {}
+        scanner = self.scan('scanner/advanced', workers=3)
+        self.assertTrue(scanner.done)
+        self.assertEqual(sorted(data.keys()), sorted(self.data.keys()))
+
+    def test_excluded_files_are_not_scanned(self):
+        uri = 'file://%s' % path_to_data_dir('scanner/advanced/song1.mp3')
+        self.scan('scanner/advanced', exclude=set([uri]))
+        self.assertNotIn(
+            path_to_data_dir('scanner/advanced/song1.mp3'), self.data)
+        self.assertIn(
+            path_to_data_dir('scanner/advanced/song2.mp3'), self.data)
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'checkpoint')
+        self.tracks = [Track(uri='file:///a/%d.mp3' % i) for i in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def record(self, folder, tracks):
+        checkpoint = Checkpoint(self.filename, folder)
+        checkpoint.load()
+        checkpoint.open()
+        for track in tracks:
+            checkpoint.add(track)
+        checkpoint.close()
+        return checkpoint
+
+    def test_load_without_checkpoint_is_empty(self):
+        self.assertEqual([], Checkpoint(self.filename, '/a').load())
+
+    def test_load_returns_recorded_tracks(self):
+        self.record('/a', self.tracks)
+        self.assertEqual(self.tracks, Checkpoint(self.filename, '/a').load())
+
+    def test_resumed_checkpoint_keeps_recorded_tracks(self):
+        self.record('/a', self.tracks[:2])
+        self.record('/a', self.tracks[2:])
+        self.assertEqual(self.tracks, Checkpoint(self.filename, '/a').load())
+
+    def test_checkpoint_for_other_folder_is_ignored(self):
+        self.record('/a', self.tracks[:2])
+        self.assertEqual([], Checkpoint(self.filename, '/b').load())
+        self.record('/b', self.tracks[2:])
+        self.assertEqual(
+            self.tracks[2:], Checkpoint(self.filename, '/b').load())
+
+    def test_partially_written_track_is_ignored(self):
+        self.record('/a', self.tracks)
+        with open(self.filename, 'r+b') as checkpoint:
+            checkpoint.truncate(os.path.getsize(self.filename) - 5)
+        self.assertEqual(
+            self.tracks[:2], Checkpoint(self.filename, '/a').load())
+
+    def test_remove_deletes_checkpoint(self):
+        self.record('/a', self.tracks).remove()
+        self.assertFalse(os.path.exists(self.filename))
+
+
+class FindUnchangedTracksTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.previous = {}
+        self.sizes = {}
+        for name in ('song1.mp3', 'song2.mp3'):
+            filename = os.path.join(self.temp_dir, name)
+            with open(filename, 'wb') as song:
+                song.write(b'data')
+            uri = path_to_uri(filename)
+            self.previous[uri] = (
+                Track(uri=uri), int(os.stat(filename).st_mtime))
+            self.sizes[uri] = 4
+        self.song1 = path_to_uri(os.path.join(self.temp_dir, 'song1.mp3'))
+        self.song2 = path_to_uri(os.path.join(self.temp_dir, 'song2.mp3'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def find(self, sizes=None):
+        tracks = find_unchanged_tracks(self.temp_dir, self.previous, sizes)
+        return sorted(track.uri for track in tracks)
+
+    def test_unchanged_files_are_found(self):
+        self.assertEqual([self.song1, self.song2], self.find(self.sizes))
+
+    def test_new_files_are_not_found(self):
+        del self.previous[self.song2]
+        self.assertEqual([self.song1], self.find(self.sizes))
+
+    def test_removed_files_are_not_found(self):
+        os.remove(os.path.join(self.temp_dir, 'song2.mp3'))
+        self.assertEqual([self.song1], self.find(self.sizes))
+
+    def test_files_with_other_mtime_are_not_found(self):
+        track, mtime = self.previous[self.song2]
+        self.previous[self.song2] = (track, mtime - 10)
+        self.assertEqual([self.song1], self.find(self.sizes))
+
+    def test_files_with_other_size_are_not_found(self):
+        self.sizes[self.song2] = 5
+        self.assertEqual([self.song1], self.find(self.sizes))
+
+    def test_files_without_known_size_are_compared_on_mtime(self):
+        self.assertEqual([self.song1, self.song2], self.find())
+
+
+class FileSizesTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'sizes')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_missing_file_sizes(self):
+        self.assertEqual({}, load_file_sizes(self.filename))
+
+    def test_saved_file_sizes_are_loaded(self):
+        song = os.path.join(self.temp_dir, 'song.mp3')
+        with open(song, 'wb') as song_file:
+            song_file.write(b'data')
+        tracks = [
+            Track(uri=path_to_uri(song)),
+            Track(uri=path_to_uri(self.temp_dir, 'missing.mp3'))]
+        save_file_sizes(self.filename, tracks)
+        self.assertEqual(
+            {path_to_uri(song): 4}, load_file_sizes(self.filename))
@@ -0,0 +1,116 @@
+from __future__ import unicode_literals
+
+import threading
+
+import pykka
+
+from mopidy.utils import events
+
+from tests import unittest
+
+
+class DummyListener(events.Listener):
+    def changed(self):
+        pass
+
+    def played(self, position):
+        pass
+
+
+class DummyListenerActor(pykka.ThreadingActor, DummyListener):
+    def __init__(self):
+        super(DummyListenerActor, self).__init__()
+        self.batches = []
+        self.received = threading.Event()
+
+    def on_events(self, events):
+        self.batches.append(events)
+        self.received.set()
+
+
+class ListenerTest(unittest.TestCase):
+    def test_on_events_calls_event_methods_in_order(self):
+        calls = []
+
+        class RecordingListener(DummyListener):
+            def changed(self):
+                calls.append('changed')
+
+            def played(self, position):
+                calls.append(position)
+
+        RecordingListener().on_events([
+            ('played', {'position': 1}), ('changed', {}),
+            ('played', {'position': 2})])
+
+        self.assertEqual([1, 'changed', 2], calls)
+
+    def test_on_events_calls_remaining_event_methods_if_one_fails(self):
+        calls = []
+
+        class FailingListener(DummyListener):
+            def changed(self):
+                raise ValueError('failed')
+
+            def played(self, position):
+                calls.append(position)
+
+        FailingListener().on_events([
+            ('played', {'position': 1}), ('changed', {}),
+            ('played', {'position': 2})])
+
+        self.assertEqual([1, 2], calls)
+
+
+class EventBusTest(unittest.TestCase):
+    def setUp(self):
+        self.bus = events.EventBus(
+            DummyListener, coalesced_events=['changed'])
+        self.actor_ref = DummyListenerActor.start()
+        self.actor = self.actor_ref._actor
+
+    def tearDown(self):
+        pykka.ActorRegistry.stop_all()
+
+    def test_send_delivers_events_in_one_batch(self):
+        self.bus.send('played', position=1)
+        self.bus.send('played', position=2)
+        self.actor.received.wait(5)
+
+        self.assertEqual(
+            [[('played', {'position': 1}), ('played', {'position': 2})]],
+            self.actor.batches)
+
+    def test_coalesced_events_are_delivered_once_per_batch(self):
+        result = self.bus._coalesce([
+            ('changed', {}), ('played', {'position': 1}), ('changed', {}),
+            ('played', {'position': 1})])
+
+        self.assertEqual([
+            ('played', {'position': 1}), ('changed', {}),
+            ('played', {'position': 1})], result)
+
+    def test_coalesced_event_is_delivered_after_events_sent_before_it(self):
+        result = self.bus._coalesce([
+            ('changed', {}), ('played', {'position': 1}), ('changed', {})])
+
+        self.assertEqual(
+            [('played', {'position': 1}), ('changed', {})], result)
+
+    def test_proxies_are_reused(self):
+        proxies = self.bus._get_proxies()
+
+        self.assertEqual(1, len(proxies))
+        self.assertIs(proxies[0], self.bus._get_proxies()[0])
+
+    def test_proxies_of_stopped_actors_are_dropped(self):
+        self.bus._get_proxies()
+        self.actor_ref.stop()
+
+        self.assertEqual([], self.bus._get_proxies())
+
+    def test_proxies_of_started_actors_are_added(self):
+        self.bus._get_proxies()
+        DummyListenerActor.start()
+
+        self.assertEqual(2, len(self.bus._get_proxies()))
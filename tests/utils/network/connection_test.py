@@ -1,5 +1,6 @@
 from __future__ import unicode_literals
 
+import collections
 import errno
 import gobject
 import logging
@@ -15,6 +16,8 @@ from tests import unittest, any_int, any_unicode
 class ConnectionTest(unittest.TestCase):
     def setUp(self):
         self.mock = Mock(spec=network.Connection)
+        self.mock.recv_size = network.RECV_SIZE_MIN
+        self.mock.send_buffer_full = False
 
     def test_init_ensure_nonblocking_io(self):
         sock = Mock(spec=socket.SocketType)
@@ -326,41 +329,105 @@ class ConnectionTest(unittest.TestCase):
 
     def test_queue_send_acquires_and_releases_lock(self):
         self.mock.send_lock = Mock()
-        self.mock.send_buffer = ''
+        self.mock.send_buffer = collections.deque()
 
-        network.Connection.queue_send(self.mock, 'data')
+        network.Connection.queue_send(self.mock, b'data')
         self.mock.send_lock.acquire.assert_called_once_with(True)
         self.mock.send_lock.release.assert_called_once_with()
 
-    def test_queue_send_calls_send(self):
-        self.mock.send_buffer = ''
+    def test_queue_send_calls_send_queued(self):
+        self.mock.send_buffer = collections.deque()
         self.mock.send_lock = Mock()
-        self.mock.send.return_value = ''
+        self.mock.send_queued.side_effect = self.mock.send_buffer.clear
 
-        network.Connection.queue_send(self.mock, 'data')
-        self.mock.send.assert_called_once_with('data')
+        network.Connection.queue_send(self.mock, b'data')
+        self.mock.send_queued.assert_called_once_with()
         self.assertEqual(0, self.mock.enable_send.call_count)
-        self.assertEqual('', self.mock.send_buffer)
 
     def test_queue_send_calls_enable_send_for_partial_send(self):
-        self.mock.send_buffer = ''
+        self.mock.send_buffer = collections.deque()
         self.mock.send_lock = Mock()
-        self.mock.send.return_value = 'ta'
 
-        network.Connection.queue_send(self.mock, 'data')
-        self.mock.send.assert_called_once_with('data')
+        network.Connection.queue_send(self.mock, b'data')
         self.mock.enable_send.assert_called_once_with()
-        self.assertEqual('ta', self.mock.send_buffer)
+        self.assertEqual([b'data'], list(self.mock.send_buffer))
 
-    def test_queue_send_calls_send_with_existing_buffer(self):
-        self.mock.send_buffer = 'foo'
+    def test_queue_send_appends_to_existing_buffer(self):
+        self.mock.send_buffer = collections.deque([b'foo'])
         self.mock.send_lock = Mock()
-        self.mock.send.return_value = ''
 
-        network.Connection.queue_send(self.mock, 'bar')
-        self.mock.send.assert_called_once_with('foobar')
-        self.assertEqual(0, self.mock.enable_send.call_count)
-        self.assertEqual('', self.mock.send_buffer)
+        network.Connection.queue_send(self.mock, b'bar')
+        self.assertEqual([b'foo', b'bar'], list(self.mock.send_buffer))
+
+    def test_queue_send_returns_false_if_little_is_queued(self):
+        self.mock.send_buffer = collections.deque()
+        self.mock.send_lock = Mock()
+        self.mock.send_buffer_size.return_value = network.SEND_BUFFER_MAX
+
+        self.assertFalse(network.Connection.queue_send(self.mock, b'data'))
+        self.assertFalse(self.mock.send_buffer_full)
+
+    def test_queue_send_returns_true_if_send_buffer_is_full(self):
+        self.mock.send_buffer = collections.deque()
+        self.mock.send_lock = Mock()
+        self.mock.send_buffer_size.return_value = network.SEND_BUFFER_MAX + 1
+
+        self.assertTrue(network.Connection.queue_send(self.mock, b'data'))
+        self.assertTrue(self.mock.send_buffer_full)
+
+    def test_send_buffer_size(self):
+        self.mock.send_buffer = collections.deque(
+            [b'foo', memoryview(b'barbaz')[3:]])
+
+        self.assertEqual(6, network.Connection.send_buffer_size(self.mock))
+
+    def test_send_queued_joins_small_chunks(self):
+        self.mock.stopping = False
+        self.mock.send_buffer = collections.deque([b'foo', b'bar'])
+        self.mock.send.return_value = b''
+
+        network.Connection.send_queued(self.mock)
+        self.mock.send.assert_called_once_with(b'foobar')
+        self.assertEqual(0, len(self.mock.send_buffer))
+
+    def test_send_queued_joins_rest_of_partially_sent_chunk(self):
+        self.mock.stopping = False
+        self.mock.send_buffer = collections.deque(
+            [memoryview(b'foo')[1:], b'bar'])
+        self.mock.send.return_value = b''
+
+        network.Connection.send_queued(self.mock)
+        self.mock.send.assert_called_once_with(b'oobar')
+
+    def test_send_queued_does_not_join_large_chunks(self):
+        large_chunk = b'x' * network.SEND_CHUNK_SIZE
+        self.mock.stopping = False
+        self.mock.send_buffer = collections.deque([b'foo', large_chunk])
+        self.mock.send.return_value = b''
+
+        network.Connection.send_queued(self.mock)
+        self.assertEqual(
+            [((b'foo',), {}), ((large_chunk,), {})],
+            self.mock.send.call_args_list)
+        self.assertEqual(0, len(self.mock.send_buffer))
+
+    def test_send_queued_keeps_unsent_data_and_stops_sending(self):
+        large_chunk = b'x' * network.SEND_CHUNK_SIZE
+        self.mock.stopping = False
+        self.mock.send_buffer = collections.deque([large_chunk, b'foo'])
+        self.mock.send.return_value = b'xx'
+
+        network.Connection.send_queued(self.mock)
+        self.mock.send.assert_called_once_with(large_chunk)
+        self.assertEqual([b'xx', b'foo'], list(self.mock.send_buffer))
+
+    def test_send_queued_drops_data_when_stopping(self):
+        self.mock.stopping = True
+        self.mock.send_buffer = collections.deque([b'foo'])
+
+        network.Connection.send_queued(self.mock)
+        self.assertEqual(0, self.mock.send.call_count)
+        self.assertEqual(0, len(self.mock.send_buffer))
 
     def test_recv_callback_respects_io_err(self):
         self.mock.sock = Mock(spec=socket.SocketType)
@@ -397,6 +464,36 @@ class ConnectionTest(unittest.TestCase):
         self.mock.actor_ref.tell.assert_called_once_with(
             {'received': 'data'})
 
+    def test_recv_callback_grows_recv_size_when_filled(self):
+        self.mock.sock = Mock(spec=socket.SocketType)
+        self.mock.sock.recv.return_value = b'x' * network.RECV_SIZE_MIN
+        self.mock.actor_ref = Mock()
+
+        self.assertTrue(network.Connection.recv_callback(
+            self.mock, sentinel.fd, gobject.IO_IN))
+        self.mock.sock.recv.assert_called_once_with(network.RECV_SIZE_MIN)
+        self.assertEqual(2 * network.RECV_SIZE_MIN, self.mock.recv_size)
+
+    def test_recv_callback_does_not_grow_recv_size_above_max(self):
+        self.mock.recv_size = network.RECV_SIZE_MAX
+        self.mock.sock = Mock(spec=socket.SocketType)
+        self.mock.sock.recv.return_value = b'x' * network.RECV_SIZE_MAX
+        self.mock.actor_ref = Mock()
+
+        self.assertTrue(network.Connection.recv_callback(
+            self.mock, sentinel.fd, gobject.IO_IN))
+        self.assertEqual(network.RECV_SIZE_MAX, self.mock.recv_size)
+
+    def test_recv_callback_shrinks_recv_size_when_mostly_empty(self):
+        self.mock.recv_size = 4 * network.RECV_SIZE_MIN
+        self.mock.sock = Mock(spec=socket.SocketType)
+        self.mock.sock.recv.return_value = b'data'
+        self.mock.actor_ref = Mock()
+
+        self.assertTrue(network.Connection.recv_callback(
+            self.mock, sentinel.fd, gobject.IO_IN))
+        self.assertEqual(2 * network.RECV_SIZE_MIN, self.mock.recv_size)
+
     def test_recv_callback_handles_dead_actors(self):
         self.mock.sock = Mock(spec=socket.SocketType)
         self.mock.sock.recv.return_value = 'data'
@@ -438,7 +535,7 @@ class ConnectionTest(unittest.TestCase):
         self.mock.sock.send.return_value = 1
         self.mock.send_lock = Mock()
         self.mock.actor_ref = Mock()
-        self.mock.send_buffer = ''
+        self.mock.send_buffer = collections.deque()
 
         self.assertTrue(network.Connection.send_callback(
             self.mock, sentinel.fd, gobject.IO_IN | gobject.IO_ERR))
@@ -449,7 +546,7 @@ class ConnectionTest(unittest.TestCase):
         self.mock.sock.send.return_value = 1
         self.mock.send_lock = Mock()
         self.mock.actor_ref = Mock()
-        self.mock.send_buffer = ''
+        self.mock.send_buffer = collections.deque()
 
         self.assertTrue(network.Connection.send_callback(
             self.mock, sentinel.fd, gobject.IO_IN | gobject.IO_HUP))
@@ -460,7 +557,7 @@ class ConnectionTest(unittest.TestCase):
         self.mock.sock.send.return_value = 1
         self.mock.send_lock = Mock()
         self.mock.actor_ref = Mock()
-        self.mock.send_buffer = ''
+        self.mock.send_buffer = collections.deque()
 
         self.assertTrue(network.Connection.send_callback(
             self.mock, sentinel.fd,
@@ -470,7 +567,7 @@ class ConnectionTest(unittest.TestCase):
     def test_send_callback_acquires_and_releases_lock(self):
         self.mock.send_lock = Mock()
         self.mock.send_lock.acquire.return_value = True
-        self.mock.send_buffer = ''
+        self.mock.send_buffer = collections.deque()
         self.mock.sock = Mock(spec=socket.SocketType)
         self.mock.sock.send.return_value = 0
 
@@ -482,7 +579,7 @@ class ConnectionTest(unittest.TestCase):
     def test_send_callback_fails_to_acquire_lock(self):
         self.mock.send_lock = Mock()
         self.mock.send_lock.acquire.return_value = False
-        self.mock.send_buffer = ''
+        self.mock.send_buffer = collections.deque()
         self.mock.sock = Mock(spec=socket.SocketType)
         self.mock.sock.send.return_value = 0
 
@@ -494,25 +591,65 @@ class ConnectionTest(unittest.TestCase):
     def test_send_callback_sends_all_data(self):
         self.mock.send_lock = Mock()
         self.mock.send_lock.acquire.return_value = True
-        self.mock.send_buffer = 'data'
-        self.mock.send.return_value = ''
+        self.mock.send_buffer = collections.deque([b'data'])
+        self.mock.send_queued.side_effect = self.mock.send_buffer.clear
 
         self.assertTrue(network.Connection.send_callback(
             self.mock, sentinel.fd, gobject.IO_IN))
+        self.mock.send_queued.assert_called_once_with()
         self.mock.disable_send.assert_called_once_with()
-        self.mock.send.assert_called_once_with('data')
-        self.assertEqual('', self.mock.send_buffer)
 
     def test_send_callback_sends_partial_data(self):
         self.mock.send_lock = Mock()
         self.mock.send_lock.acquire.return_value = True
-        self.mock.send_buffer = 'data'
-        self.mock.send.return_value = 'ta'
+        self.mock.send_buffer = collections.deque([b'data'])
 
         self.assertTrue(network.Connection.send_callback(
             self.mock, sentinel.fd, gobject.IO_IN))
-        self.mock.send.assert_called_once_with('data')
-        self.assertEqual('ta', self.mock.send_buffer)
+        self.mock.send_queued.assert_called_once_with()
+        self.assertEqual(0, self.mock.disable_send.call_count)
+
+    def test_send_callback_resumes_sending_when_send_buffer_is_free(self):
+        self.mock.send_lock = Mock()
+        self.mock.send_lock.acquire.return_value = True
+        self.mock.send_buffer = collections.deque([b'data'])
+        self.mock.send_buffer_full = True
+        self.mock.send_buffer_size.return_value = network.SEND_BUFFER_MAX
+
+        self.assertTrue(network.Connection.send_callback(
+            self.mock, sentinel.fd, gobject.IO_IN))
+        self.assertFalse(self.mock.send_buffer_full)
+        self.mock.resume_sending.assert_called_once_with()
+
+    def test_send_callback_does_not_resume_sending_while_buffer_is_full(self):
+        self.mock.send_lock = Mock()
+        self.mock.send_lock.acquire.return_value = True
+        self.mock.send_buffer = collections.deque([b'data'])
+        self.mock.send_buffer_full = True
+        self.mock.send_buffer_size.return_value = network.SEND_BUFFER_MAX + 1
+
+        self.assertTrue(network.Connection.send_callback(
+            self.mock, sentinel.fd, gobject.IO_IN))
+        self.assertTrue(self.mock.send_buffer_full)
+        self.assertEqual(0, self.mock.resume_sending.call_count)
+
+    def test_resume_sending_tells_actor_and_restarts_timeout(self):
+        self.mock.actor_ref = Mock()
+        self.mock.timeout_id = sentinel.timeout_id
+
+        network.Connection.resume_sending(self.mock)
+        self.mock.enable_timeout.assert_called_once_with()
+        self.mock.actor_ref.tell.assert_called_once_with(
+            {'send_buffer_free': True})
+
+    def test_resume_sending_stops_if_actor_is_dead(self):
+        self.mock.actor_ref = Mock()
+        self.mock.actor_ref.tell.side_effect = pykka.ActorDeadError()
+        self.mock.timeout_id = None
+
+        network.Connection.resume_sending(self.mock)
+        self.assertEqual(0, self.mock.enable_timeout.call_count)
+        self.mock.stop.assert_called_once_with(any_unicode)
 
     def test_send_recoverable_error(self):
         self.mock.sock = Mock(spec=socket.SocketType)
@@ -534,8 +671,10 @@ class ConnectionTest(unittest.TestCase):
         self.mock.sock = Mock(spec=socket.SocketType)
         self.mock.sock.send.return_value = 2
 
-        self.assertEqual('ta', network.Connection.send(self.mock, 'data'))
-        self.mock.sock.send.assert_called_once_with('data')
+        unsent = network.Connection.send(self.mock, b'data')
+        self.assertIsInstance(unsent, memoryview)
+        self.assertEqual(b'ta', unsent.tobytes())
+        self.mock.sock.send.assert_called_once_with(b'data')
 
     def test_send_unrecoverable_error(self):
         self.mock.sock = Mock(spec=socket.SocketType)
@@ -2,6 +2,7 @@
 
 from __future__ import unicode_literals
 
+import collections
 import re
 from mock import sentinel, Mock
 
@@ -18,12 +19,20 @@ class LineProtocolTest(unittest.TestCase):
         self.mock.encoding = network.LineProtocol.encoding
         self.mock.delimiter = network.LineProtocol.delimiter
         self.mock.prevent_timeout = False
+        self.mock.recv_scan_offset = 0
+        self.mock.recv_lines = collections.deque()
+        self.mock.send_queue = collections.deque()
+        self.mock.send_queued_lines.side_effect = (
+            lambda: network.LineProtocol.send_queued_lines(self.mock))
 
     def test_init_stores_values_in_attributes(self):
         delimiter = re.compile(network.LineProtocol.terminator)
         network.LineProtocol.__init__(self.mock, sentinel.connection)
         self.assertEqual(sentinel.connection, self.mock.connection)
-        self.assertEqual('', self.mock.recv_buffer)
+        self.assertEqual(bytearray(), self.mock.recv_buffer)
+        self.assertEqual(0, self.mock.recv_scan_offset)
+        self.assertEqual(collections.deque(), self.mock.recv_lines)
+        self.assertEqual(collections.deque(), self.mock.send_queue)
         self.assertEqual(delimiter, self.mock.delimiter)
         self.assertFalse(self.mock.prevent_timeout)
 
@@ -36,163 +45,207 @@ class LineProtocolTest(unittest.TestCase):
 
     def test_on_receive_no_new_lines_adds_to_recv_buffer(self):
         self.mock.connection = Mock(spec=network.Connection)
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
         self.mock.parse_lines.return_value = []
 
-        network.LineProtocol.on_receive(self.mock, {'received': 'data'})
-        self.assertEqual('data', self.mock.recv_buffer)
+        network.LineProtocol.on_receive(self.mock, {'received': b'data'})
+        self.assertEqual(b'data', self.mock.recv_buffer)
         self.mock.parse_lines.assert_called_once_with()
         self.assertEqual(0, self.mock.on_line_received.call_count)
 
     def test_on_receive_toggles_timeout(self):
         self.mock.connection = Mock(spec=network.Connection)
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
         self.mock.parse_lines.return_value = []
 
-        network.LineProtocol.on_receive(self.mock, {'received': 'data'})
+        network.LineProtocol.on_receive(self.mock, {'received': b'data'})
         self.mock.connection.disable_timeout.assert_called_once_with()
         self.mock.connection.enable_timeout.assert_called_once_with()
 
     def test_on_receive_toggles_unless_prevent_timeout_is_set(self):
         self.mock.connection = Mock(spec=network.Connection)
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
         self.mock.parse_lines.return_value = []
         self.mock.prevent_timeout = True
 
-        network.LineProtocol.on_receive(self.mock, {'received': 'data'})
+        network.LineProtocol.on_receive(self.mock, {'received': b'data'})
         self.mock.connection.disable_timeout.assert_called_once_with()
         self.assertEqual(0, self.mock.connection.enable_timeout.call_count)
 
     def test_on_receive_no_new_lines_calls_parse_lines(self):
         self.mock.connection = Mock(spec=network.Connection)
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
         self.mock.parse_lines.return_value = []
 
-        network.LineProtocol.on_receive(self.mock, {'received': 'data'})
+        network.LineProtocol.on_receive(self.mock, {'received': b'data'})
         self.mock.parse_lines.assert_called_once_with()
         self.assertEqual(0, self.mock.on_line_received.call_count)
 
     def test_on_receive_with_new_line_calls_decode(self):
         self.mock.connection = Mock(spec=network.Connection)
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
         self.mock.parse_lines.return_value = [sentinel.line]
 
-        network.LineProtocol.on_receive(self.mock, {'received': 'data\n'})
+        network.LineProtocol.on_receive(self.mock, {'received': b'data\n'})
         self.mock.parse_lines.assert_called_once_with()
         self.mock.decode.assert_called_once_with(sentinel.line)
 
     def test_on_receive_with_new_line_calls_on_recieve(self):
         self.mock.connection = Mock(spec=network.Connection)
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
         self.mock.parse_lines.return_value = [sentinel.line]
         self.mock.decode.return_value = sentinel.decoded
 
-        network.LineProtocol.on_receive(self.mock, {'received': 'data\n'})
+        network.LineProtocol.on_receive(self.mock, {'received': b'data\n'})
         self.mock.on_line_received.assert_called_once_with(sentinel.decoded)
 
     def test_on_receive_with_new_line_with_failed_decode(self):
         self.mock.connection = Mock(spec=network.Connection)
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
         self.mock.parse_lines.return_value = [sentinel.line]
         self.mock.decode.return_value = None
 
-        network.LineProtocol.on_receive(self.mock, {'received': 'data\n'})
+        network.LineProtocol.on_receive(self.mock, {'received': b'data\n'})
         self.assertEqual(0, self.mock.on_line_received.call_count)
 
     def test_on_receive_with_new_lines_calls_on_recieve(self):
         self.mock.connection = Mock(spec=network.Connection)
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
         self.mock.parse_lines.return_value = ['line1', 'line2']
         self.mock.decode.return_value = sentinel.decoded
 
         network.LineProtocol.on_receive(
-            self.mock, {'received': 'line1\nline2\n'})
+            self.mock, {'received': b'line1\nline2\n'})
         self.assertEqual(2, self.mock.on_line_received.call_count)
 
+    def test_on_receive_holds_lines_while_sending_is_held_back(self):
+        self.mock.connection = Mock(spec=network.Connection)
+        self.mock.recv_buffer = bytearray()
+        self.mock.parse_lines.return_value = ['line1', 'line2']
+        self.mock.decode.side_effect = lambda line: line
+        self.mock.on_line_received.side_effect = (
+            lambda line: self.mock.send_queue.append(iter([line])))
+
+        network.LineProtocol.on_receive(
+            self.mock, {'received': b'line1\nline2\n'})
+        self.mock.on_line_received.assert_called_once_with('line1')
+        self.assertEqual(['line2'], list(self.mock.recv_lines))
+
+    def test_on_receive_send_buffer_free_sends_and_handles_held_lines(self):
+        self.mock.connection = Mock(spec=network.Connection)
+        self.mock.connection.queue_send.return_value = False
+        self.mock.join_lines.side_effect = lambda lines: ''.join(lines)
+        self.mock.encode.side_effect = lambda data: data
+        self.mock.decode.side_effect = lambda line: line
+        self.mock.send_queue.append(iter(['response']))
+        self.mock.recv_lines.append('line')
+
+        network.LineProtocol.on_receive(self.mock, {'send_buffer_free': True})
+        self.mock.connection.queue_send.assert_called_once_with('response')
+        self.mock.on_line_received.assert_called_once_with('line')
+        self.assertEqual(0, len(self.mock.send_queue))
+
     def test_parse_lines_emtpy_buffer(self):
         self.mock.delimiter = re.compile(r'\n')
-        self.mock.recv_buffer = ''
+        self.mock.recv_buffer = bytearray()
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertRaises(StopIteration, lines.next)
 
     def test_parse_lines_no_terminator(self):
         self.mock.delimiter = re.compile(r'\n')
-        self.mock.recv_buffer = 'data'
+        self.mock.recv_buffer = bytearray(b'data')
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertRaises(StopIteration, lines.next)
 
     def test_parse_lines_termintor(self):
         self.mock.delimiter = re.compile(r'\n')
-        self.mock.recv_buffer = 'data\n'
+        self.mock.recv_buffer = bytearray(b'data\n')
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertEqual('data', lines.next())
         self.assertRaises(StopIteration, lines.next)
-        self.assertEqual('', self.mock.recv_buffer)
+        self.assertEqual(b'', self.mock.recv_buffer)
 
     def test_parse_lines_termintor_with_carriage_return(self):
         self.mock.delimiter = re.compile(r'\r?\n')
-        self.mock.recv_buffer = 'data\r\n'
+        self.mock.recv_buffer = bytearray(b'data\r\n')
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertEqual('data', lines.next())
         self.assertRaises(StopIteration, lines.next)
-        self.assertEqual('', self.mock.recv_buffer)
+        self.assertEqual(b'', self.mock.recv_buffer)
 
     def test_parse_lines_no_data_before_terminator(self):
         self.mock.delimiter = re.compile(r'\n')
-        self.mock.recv_buffer = '\n'
+        self.mock.recv_buffer = bytearray(b'\n')
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertEqual('', lines.next())
         self.assertRaises(StopIteration, lines.next)
-        self.assertEqual('', self.mock.recv_buffer)
+        self.assertEqual(b'', self.mock.recv_buffer)
 
     def test_parse_lines_extra_data_after_terminator(self):
         self.mock.delimiter = re.compile(r'\n')
-        self.mock.recv_buffer = 'data1\ndata2'
+        self.mock.recv_buffer = bytearray(b'data1\ndata2')
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertEqual('data1', lines.next())
         self.assertRaises(StopIteration, lines.next)
-        self.assertEqual('data2', self.mock.recv_buffer)
+        self.assertEqual(b'data2', self.mock.recv_buffer)
 
     def test_parse_lines_unicode(self):
         self.mock.delimiter = re.compile(r'\n')
-        self.mock.recv_buffer = 'æøå\n'.encode('utf-8')
+        self.mock.recv_buffer = bytearray('æøå\n'.encode('utf-8'))
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertEqual('æøå'.encode('utf-8'), lines.next())
         self.assertRaises(StopIteration, lines.next)
-        self.assertEqual('', self.mock.recv_buffer)
+        self.assertEqual(b'', self.mock.recv_buffer)
 
     def test_parse_lines_multiple_lines(self):
         self.mock.delimiter = re.compile(r'\n')
-        self.mock.recv_buffer = 'abc\ndef\nghi\njkl'
+        self.mock.recv_buffer = bytearray(b'abc\ndef\nghi\njkl')
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertEqual('abc', lines.next())
         self.assertEqual('def', lines.next())
         self.assertEqual('ghi', lines.next())
         self.assertRaises(StopIteration, lines.next)
-        self.assertEqual('jkl', self.mock.recv_buffer)
+        self.assertEqual(b'jkl', self.mock.recv_buffer)
 
     def test_parse_lines_multiple_calls(self):
         self.mock.delimiter = re.compile(r'\n')
-        self.mock.recv_buffer = 'data1'
+        self.mock.recv_buffer = bytearray(b'data1')
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertRaises(StopIteration, lines.next)
-        self.assertEqual('data1', self.mock.recv_buffer)
+        self.assertEqual(b'data1', self.mock.recv_buffer)
 
-        self.mock.recv_buffer += '\ndata2'
+        self.mock.recv_buffer += b'\ndata2'
 
         lines = network.LineProtocol.parse_lines(self.mock)
         self.assertEqual('data1', lines.next())
         self.assertRaises(StopIteration, lines.next)
-        self.assertEqual('data2', self.mock.recv_buffer)
+        self.assertEqual(b'data2', self.mock.recv_buffer)
+
+    def test_parse_lines_remembers_where_to_continue_search(self):
+        self.mock.delimiter = re.compile(r'\n')
+        self.mock.terminator = '\r\n'
+        self.mock.recv_buffer = bytearray(b'data1\r')
+
+        lines = network.LineProtocol.parse_lines(self.mock)
+        self.assertRaises(StopIteration, lines.next)
+        self.assertEqual(5, self.mock.recv_scan_offset)
+
+        self.mock.recv_buffer += b'\ndata2'
+
+        lines = network.LineProtocol.parse_lines(self.mock)
+        self.assertEqual('data1\r', lines.next())
+        self.assertRaises(StopIteration, lines.next)
+        self.assertEqual(b'data2', self.mock.recv_buffer)
+        self.assertEqual(0, self.mock.recv_scan_offset)
 
     def test_send_lines_called_with_no_lines(self):
         self.mock.connection = Mock(spec=network.Connection)
@@ -205,14 +258,14 @@ class LineProtocolTest(unittest.TestCase):
         self.mock.connection = Mock(spec=network.Connection)
         self.mock.join_lines.return_value = 'lines'
 
-        network.LineProtocol.send_lines(self.mock, sentinel.lines)
-        self.mock.join_lines.assert_called_once_with(sentinel.lines)
+        network.LineProtocol.send_lines(self.mock, ['line1', 'line2'])
+        self.mock.join_lines.assert_called_once_with(['line1', 'line2'])
 
     def test_send_line_encodes_joined_lines_with_final_terminator(self):
         self.mock.connection = Mock(spec=network.Connection)
         self.mock.join_lines.return_value = 'lines\n'
 
-        network.LineProtocol.send_lines(self.mock, sentinel.lines)
+        network.LineProtocol.send_lines(self.mock, ['lines'])
         self.mock.encode.assert_called_once_with('lines\n')
 
     def test_send_lines_sends_encoded_string(self):
@@ -220,9 +273,49 @@ class LineProtocolTest(unittest.TestCase):
         self.mock.join_lines.return_value = 'lines'
         self.mock.encode.return_value = sentinel.data
 
-        network.LineProtocol.send_lines(self.mock, sentinel.lines)
+        network.LineProtocol.send_lines(self.mock, ['lines'])
         self.mock.connection.queue_send.assert_called_once_with(sentinel.data)
 
+    def test_send_lines_sends_many_lines_in_chunks(self):
+        self.mock.connection = Mock(spec=network.Connection)
+        self.mock.connection.queue_send.return_value = False
+        self.mock.join_lines.side_effect = len
+        self.mock.encode.side_effect = lambda data: data
+
+        lines = ('line' for _ in xrange(network.SEND_LINES_CHUNK_SIZE + 1))
+        network.LineProtocol.send_lines(self.mock, lines)
+        self.assertEqual(
+            [((network.SEND_LINES_CHUNK_SIZE,), {}), ((1,), {})],
+            self.mock.connection.queue_send.call_args_list)
+
+    def test_send_lines_holds_back_lines_while_send_buffer_is_full(self):
+        self.mock.connection = Mock(spec=network.Connection)
+        self.mock.connection.queue_send.return_value = True
+        self.mock.join_lines.side_effect = len
+        self.mock.encode.side_effect = lambda data: data
+
+        lines = ('line' for _ in xrange(network.SEND_LINES_CHUNK_SIZE + 1))
+        network.LineProtocol.send_lines(self.mock, lines)
+        self.mock.connection.queue_send.assert_called_once_with(
+            network.SEND_LINES_CHUNK_SIZE)
+        self.assertEqual(1, len(self.mock.send_queue))
+
+        self.mock.connection.queue_send.return_value = False
+        network.LineProtocol.send_queued_lines(self.mock)
+        self.assertEqual(
+            ((1,), {}), self.mock.connection.queue_send.call_args)
+        self.assertEqual(0, len(self.mock.send_queue))
+
+    def test_send_lines_stops_on_encode_error(self):
+        self.mock.connection = Mock(spec=network.Connection)
+        self.mock.join_lines.return_value = 'lines'
+        self.mock.encode.return_value = None
+
+        lines = ['line'] * (network.SEND_LINES_CHUNK_SIZE + 1)
+        network.LineProtocol.send_lines(self.mock, lines)
+        self.mock.encode.assert_called_once_with('lines')
+        self.assertEqual(0, self.mock.connection.queue_send.call_count)
+
     def test_join_lines_returns_empty_string_for_no_lines(self):
         self.assertEqual('', network.LineProtocol.join_lines(self.mock, []))
 
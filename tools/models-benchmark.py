@@ -0,0 +1,148 @@
+#! /usr/bin/env python
+
+# This script compares the memory use and speed of the slots based models in
+# mopidy.models with the dict based models used up to Mopidy 0.8. It is simply
+# provided as a quick hack, expect nothing more.
+
+from __future__ import unicode_literals
+
+import argparse
+import sys
+import time
+
+from mopidy import models
+
+
+class DictImmutableObject(object):
+    def __init__(self, *args, **kwargs):
+        for key, value in kwargs.items():
+            if not hasattr(self, key):
+                raise TypeError(
+                    '__init__() got an unexpected keyword argument "%s"' %
+                    key)
+            self.__dict__[key] = value
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            return super(DictImmutableObject, self).__setattr__(name, value)
+        raise AttributeError('Object is immutable.')
+
+    def __hash__(self):
+        hash_sum = 0
+        for key, value in self.__dict__.items():
+            hash_sum += hash(key) + hash(value)
+        return hash_sum
+
+    def __eq__(self, other):
+        if not isinstance(other, self.__class__):
+            return False
+        return self.__dict__ == other.__dict__
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def copy(self, **values):
+        data = {}
+        for key in self.__dict__.keys():
+            public_key = key.lstrip('_')
+            data[public_key] = values.pop(public_key, self.__dict__[key])
+        for key in values.keys():
+            if hasattr(self, key):
+                data[key] = values.pop(key)
+        return self.__class__(**data)
+
+
+class DictArtist(DictImmutableObject):
+    uri = None
+    name = None
+    musicbrainz_id = None
+
+
+class DictAlbum(DictImmutableObject):
+    uri = None
+    name = None
+    artists = frozenset()
+    num_tracks = 0
+    date = None
+    musicbrainz_id = None
+
+    def __init__(self, *args, **kwargs):
+        self.__dict__['artists'] = frozenset(kwargs.pop('artists', []))
+        super(DictAlbum, self).__init__(*args, **kwargs)
+
+
+class DictTrack(DictImmutableObject):
+    uri = None
+    name = None
+    artists = frozenset()
+    album = None
+    track_no = 0
+    date = None
+    length = None
+    bitrate = None
+    musicbrainz_id = None
+
+    def __init__(self, *args, **kwargs):
+        self.__dict__['artists'] = frozenset(kwargs.pop('artists', []))
+        super(DictTrack, self).__init__(*args, **kwargs)
+
+
+def build_tracks(artist_class, album_class, track_class, count):
+    tracks = []
+    for i in xrange(count):
+        artist = artist_class(name='Artist %d' % (i // 100))
+        album = album_class(
+            name='Album %d' % (i // 10), artists=[artist], num_tracks=10)
+        tracks.append(track_class(
+            uri='file:///music/%d.ogg' % i, name='Track %d' % i,
+            artists=[artist], album=album, track_no=i % 10, length=180000))
+    return tracks
+
+
+def object_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def timed(func, *args):
+    start = time.time()
+    result = func(*args)
+    return result, time.time() - start
+
+
+def benchmark(name, artist_class, album_class, track_class, count):
+    tracks, build_time = timed(
+        build_tracks, artist_class, album_class, track_class, count)
+    others = build_tracks(artist_class, album_class, track_class, count)
+
+    size = sum(object_size(t) for t in tracks)
+    _, hash_time = timed(lambda: [hash(t) for t in tracks for _ in range(5)])
+    _, eq_time = timed(lambda: [a == b for (a, b) in zip(tracks, others)])
+    _, copy_time = timed(lambda: [t.copy(name='copy') for t in tracks])
+
+    print '%s:' % name
+    print '  track objects: %.1f MiB' % (size / 1024.0 / 1024.0)
+    print '  construct:     %.3f s' % build_time
+    print '  hash (5x):     %.3f s' % hash_time
+    print '  eq:            %.3f s' % eq_time
+    print '  copy:          %.3f s' % copy_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-n', '--tracks', type=int, default=100000,
+        help='number of tracks to create (default: %(default)s)')
+    args = parser.parse_args()
+
+    benchmark(
+        'dict based models', DictArtist, DictAlbum, DictTrack, args.tracks)
+    benchmark(
+        'slots based models', models.Artist, models.Album, models.Track,
+        args.tracks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+
+# This script measures how many MPD commands per second the MPD dispatcher
+# can handle, using the dummy backend. It is simply provided as a quick hack,
+# expect nothing more.
+
+from __future__ import unicode_literals
+
+import argparse
+import time
+
+import pykka
+
+from mopidy import core
+from mopidy.backends import dummy
+from mopidy.frontends.mpd.dispatcher import MpdDispatcher
+from mopidy.models import Track
+
+# Mix of commands typically sent by polling clients, including a few that
+# are matched late and some unknown commands.
+requests = [
+    'status',
+    'currentsong',
+    'ping',
+    'playlistinfo "-1"',
+    'plchanges "0"',
+    'setvol "50"',
+    'random "0"',
+    'outputs',
+    'sticker list "song" "dummy:a"',
+    'an_unknown_command',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-n', '--requests', type=int, default=10000,
+        help='number of requests to send (default: %(default)s)')
+    args = parser.parse_args()
+
+    backend = dummy.DummyBackend.start(audio=None).proxy()
+    core_proxy = core.Core.start(backends=[backend]).proxy()
+    core_proxy.tracklist.append([Track(uri='dummy:a', name='a')]).get()
+    dispatcher = MpdDispatcher(core=core_proxy)
+
+    try:
+        start = time.time()
+        for i in xrange(args.requests):
+            dispatcher.handle_request(requests[i % len(requests)])
+        duration = time.time() - start
+    finally:
+        pykka.ActorRegistry.stop_all()
+
+    print '%d requests in %.2f s, %.0f requests/s' % (
+        args.requests, duration, args.requests / duration)
+
+
+if __name__ == '__main__':
+    main()